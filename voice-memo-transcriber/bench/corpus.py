@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark corpus: a fixed set of recordings with reference transcripts.
+The default corpus is synthesized with the system's text-to-speech engine
+from the scripts below, with pauses and a low noise floor laid in
+deterministically, so every machine benchmarks the same material. A folder
+of real recordings with same-named .txt references can be used instead.
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from preprocess import SAMPLE_RATE, decode_audio, encode_audio
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+AUDIO_EXTENSIONS = ('.m4a', '.mp3', '.wav', '.flac', '.ogg', '.opus', '.aiff')
+
+# Bump when the scripts or synthesis change so stale corpora are rebuilt
+CORPUS_VERSION = 1
+
+SENTENCES = [
+    "The quarterly review is moved to Thursday afternoon at three o'clock.",
+    "Please send the updated budget to the finance team before the meeting.",
+    "I think we should test the new onboarding flow with five real customers.",
+    "Remember to renew the domain name and the certificate next month.",
+    "The delivery truck arrived two hours late because of the snow storm.",
+    "We agreed to hire one more engineer for the mobile application.",
+    "Call the dentist tomorrow morning and reschedule the appointment.",
+    "The first draft of the report needs a clearer summary and fewer charts.",
+    "Buy milk, eggs, coffee and a loaf of bread on the way home.",
+    "Our server costs dropped by a third after we moved the batch jobs.",
+    "Ask Jordan whether the conference talk can be shortened to twenty minutes.",
+    "The garden needs watering twice a week while the weather stays dry.",
+]
+
+# name -> (sentence indices, seconds of silence after each sentence)
+RECORDINGS = {
+    'short_note': ([0, 1, 2], 0.6),
+    'paused_memo': ([3, 4, 5, 6, 7], 4.0),
+    'long_dictation': (list(range(len(SENTENCES))) * 3, 1.2),
+}
+
+NOISE_DBFS = -60.0
+
+
+def find_tts() -> list:
+    """Command prefix of an installed text-to-speech engine, writing to the path appended last."""
+    if shutil.which('say'):
+        return ['say', '-o']
+    for engine in ('espeak-ng', 'espeak'):
+        if shutil.which(engine):
+            return [engine, '-s', '160', '-w']
+    raise RuntimeError("No text-to-speech engine found (install espeak-ng, or pass --corpus with real recordings)")
+
+
+def speak(text: str, tts: list):
+    """Synthesize one sentence to float32 samples at SAMPLE_RATE."""
+    suffix = '.aiff' if tts[0] == 'say' else '.wav'
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"sentence{suffix}"
+        subprocess.run(tts + [str(path), text], check=True, capture_output=True)
+        audio, _ = decode_audio(str(path), remove_silence_enabled=False)
+    return audio
+
+
+def synthesize(corpus_dir: Path = CORPUS_DIR) -> Path:
+    """
+    Build the synthetic corpus (once per CORPUS_VERSION) as M4A files like
+    the voice memos the app transcribes, each with a .txt reference.
+
+    Returns:
+        The corpus directory
+    """
+    import numpy as np
+
+    marker = corpus_dir / f".version-{CORPUS_VERSION}"
+    if marker.exists():
+        return corpus_dir
+
+    tts = find_tts()
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(0)
+    noise_level = 10 ** (NOISE_DBFS / 20)
+    cache = {}
+
+    for name, (indices, pause) in RECORDINGS.items():
+        gap = np.zeros(int(pause * SAMPLE_RATE), dtype=np.float32)
+        parts = []
+        for i in indices:
+            if i not in cache:
+                cache[i] = speak(SENTENCES[i], tts)
+            parts.extend([cache[i], gap])
+        audio = np.concatenate(parts)
+        audio = audio + rng.normal(0, noise_level, len(audio)).astype(np.float32)
+
+        encode_audio(audio, str(corpus_dir / f"{name}.m4a"), bitrate="96k")
+        (corpus_dir / f"{name}.txt").write_text(' '.join(SENTENCES[i] for i in indices) + '\n')
+        print(f"  Synthesized {name}: {len(audio) / SAMPLE_RATE:.0f}s")
+
+    for old in corpus_dir.glob('.version-*'):
+        old.unlink()
+    marker.touch()
+    return corpus_dir
+
+
+def load_corpus(corpus_dir: Path) -> list:
+    """
+    Recordings in a corpus directory that have a reference transcript.
+
+    Returns:
+        List of {'name', 'path', 'reference'} sorted by name
+    """
+    items = []
+    for path in sorted(Path(corpus_dir).iterdir()):
+        reference = path.with_suffix('.txt')
+        if path.suffix.lower() in AUDIO_EXTENSIONS and reference.exists():
+            items.append({'name': path.stem, 'path': str(path), 'reference': reference.read_text().strip()})
+    if not items:
+        raise RuntimeError(f"No audio files with .txt references in {corpus_dir}")
+    return items
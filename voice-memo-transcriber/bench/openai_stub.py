@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI transcription endpoint.
+Accepts the same upload the real API gets and answers with a canned
+verbose_json transcript, so the client side of the OpenAI path (encoding,
+upload, response handling) can be benchmarked offline and for free.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class OpenAIStub:
+    """
+    Stub server on 127.0.0.1; point the OpenAI client at base_url.
+
+    The transcript returned is whatever `transcript` is set to, so the
+    benchmark sets it to the reference text of the recording being sent.
+    """
+
+    def __init__(self, port: int = 0):
+        self.transcript = ''
+        self.requests = 0
+        self.bytes_received = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.rstrip('/').endswith('/audio/transcriptions'):
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                remaining = length
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, 64 * 1024))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                stub.requests += 1
+                stub.bytes_received += length - remaining
+
+                words = stub.transcript.split()
+                body = json.dumps({
+                    'task': 'transcribe',
+                    'language': 'english',
+                    'duration': 0.0,
+                    'text': stub.transcript,
+                    'segments': [{'id': 0, 'start': 0.0, 'end': 0.0, 'text': ' '.join(words)}] if words else [],
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def start(self) -> 'OpenAIStub':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
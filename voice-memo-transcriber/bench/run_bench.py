@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Transcription benchmark.
+Runs the preprocessing pipeline and every available backend over a fixed
+corpus and records wall time, real-time factor, peak memory and word error
+rate per case. Results are written as JSON and compared against a stored
+baseline; the exit status is non-zero when a case got slower, hungrier or
+less accurate than the baseline allows.
+
+Usage:
+    python bench/run_bench.py                       # synthesize corpus, run, compare
+    python bench/run_bench.py --models tiny,small --repeat 3
+    python bench/run_bench.py --save-baseline       # accept the current numbers
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent / "scripts"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from corpus import CORPUS_DIR, load_corpus, synthesize
+
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+RESULTS_DIR = BENCH_DIR / "results"
+
+BACKENDS = ('preprocess', 'faster-whisper', 'mlx', 'openai-stub')
+
+# Allowed drift before a case counts as a regression
+DEFAULT_TOLERANCE = 0.15     # relative, for RTF and peak memory
+WER_TOLERANCE = 0.02         # absolute
+RTF_FLOOR = 0.005            # ignore RTF changes smaller than this
+
+
+def word_error_rate(reference: str, hypothesis: str) -> tuple[int, int]:
+    """
+    Word-level edit distance after normalization.
+
+    Returns:
+        Tuple of (errors, reference word count)
+    """
+    from chunked import _normalize
+
+    ref = _normalize(reference).split()
+    hyp = _normalize(hypothesis).split()
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB, or None if unavailable."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
+def prepare(path: str):
+    """Decode and cut silence exactly as the server does for local backends."""
+    from preprocess import decode_audio
+    from vad import apply_vad
+
+    audio, _ = decode_audio(path, remove_silence_enabled=False)
+    speech, _ = apply_vad(audio)
+    return audio, speech
+
+
+def make_transcriber(case: dict):
+    """
+    Load the case's model.
+
+    Returns:
+        Callable(speech samples, reference text) -> transcript text
+    """
+    backend = case['backend']
+
+    if backend == 'faster-whisper':
+        from faster_whisper import WhisperModel
+        model = WhisperModel(case['model'], device=case['device'], compute_type=case['compute_type'])
+
+        def run(speech, reference):
+            segments, _ = model.transcribe(speech, beam_size=5)
+            return ' '.join(s.text.strip() for s in segments)
+        return run
+
+    if backend == 'mlx':
+        import mlx_whisper
+        from transcribe import MLX_MODELS
+        repo = MLX_MODELS.get(case['model'], case['model'])
+
+        def run(speech, reference):
+            return mlx_whisper.transcribe(speech, path_or_hf_repo=repo)['text']
+        return run
+
+    if backend == 'openai-stub':
+        import tempfile
+        from openai_stub import OpenAIStub
+        from preprocess import encode_audio
+
+        stub = OpenAIStub().start()
+        os.environ['OPENAI_BASE_URL'] = stub.base_url
+        os.environ['OPENAI_API_KEY'] = 'bench-stub'
+        from openai import OpenAI
+        client = OpenAI()
+
+        def run(speech, reference):
+            # Same client work as the server's OpenAI path: encode, upload, parse
+            stub.transcript = reference
+            with tempfile.TemporaryDirectory() as tmp:
+                path = encode_audio(speech, str(Path(tmp) / 'speech.mp3'))
+                with open(path, 'rb') as f:
+                    response = client.audio.transcriptions.create(
+                        model='whisper-1', file=f, response_format='verbose_json')
+            return response.text
+        return run
+
+    return None  # preprocess only
+
+
+def run_case(case: dict, items: list, repeat: int, results):
+    """
+    Benchmark one case in its own process, so model loading starts cold and
+    peak memory belongs to this case alone. Puts a result dict on the queue.
+    """
+    from preprocess import SAMPLE_RATE
+
+    try:
+        load_start = time.time()
+        transcribe = make_transcriber(case)
+        load_seconds = time.time() - load_start
+
+        files = []
+        for item in items:
+            prep_times, asr_times = [], []
+            for _ in range(repeat):
+                start = time.time()
+                audio, speech = prepare(item['path'])
+                prep_times.append(time.time() - start)
+                if transcribe is not None:
+                    start = time.time()
+                    text = transcribe(speech, item['reference'])
+                    asr_times.append(time.time() - start)
+
+            entry = {
+                'name': item['name'],
+                'audio_seconds': round(len(audio) / SAMPLE_RATE, 2),
+                'speech_seconds': round(len(speech) / SAMPLE_RATE, 2),
+                'preprocess_seconds': round(statistics.median(prep_times), 3),
+            }
+            if transcribe is not None:
+                errors, words = word_error_rate(item['reference'], text)
+                entry.update({
+                    'transcribe_seconds': round(statistics.median(asr_times), 3),
+                    'errors': errors,
+                    'reference_words': words,
+                })
+            files.append(entry)
+
+        results.put({**case, 'load_seconds': round(load_seconds, 2), 'files': files,
+                     'peak_rss_mb': peak_rss_mb()})
+    except Exception as e:
+        results.put({**case, 'error': f"{type(e).__name__}: {e}"})
+
+
+def wait_for_result(process, queue, case: dict) -> dict:
+    """Result of a case process, or an error entry if it died without one."""
+    import queue as queue_module
+
+    while True:
+        try:
+            result = queue.get(timeout=1)
+            break
+        except queue_module.Empty:
+            if not process.is_alive():
+                result = {**case, 'error': f"process exited with code {process.exitcode}"}
+                break
+    process.join()
+    return result
+
+
+def summarize(result: dict) -> dict:
+    """Totals across the corpus for one case."""
+    if 'error' in result:
+        return result
+    files = result['files']
+    audio = sum(f['audio_seconds'] for f in files)
+    wall = sum(f['preprocess_seconds'] + f.get('transcribe_seconds', 0) for f in files)
+    summary = {
+        **result,
+        'audio_seconds': round(audio, 2),
+        'wall_seconds': round(wall, 3),
+        'rtf': round(wall / audio, 4) if audio else None,
+        'peak_rss_mb': round(result['peak_rss_mb'], 1) if result['peak_rss_mb'] is not None else None,
+    }
+    words = sum(f.get('reference_words', 0) for f in files)
+    if words:
+        summary['wer'] = round(sum(f['errors'] for f in files) / words, 4)
+    return summary
+
+
+def plan_cases(backends: list, models: list, compute_types: list, device: str) -> list:
+    """Cases to run, skipping backends that are not installed here."""
+    import importlib.util
+
+    cases = []
+    for backend in backends:
+        if backend == 'preprocess':
+            cases.append({'case': 'preprocess', 'backend': backend})
+        elif backend == 'faster-whisper':
+            if importlib.util.find_spec('faster_whisper') is None:
+                print("  Skipping faster-whisper (not installed)")
+                continue
+            for model in models:
+                for compute_type in compute_types:
+                    cases.append({'case': f'faster-whisper/{model}/{device}/{compute_type}', 'backend': backend,
+                                  'model': model, 'device': device, 'compute_type': compute_type})
+        elif backend == 'mlx':
+            if importlib.util.find_spec('mlx_whisper') is None:
+                continue
+            for model in models:
+                cases.append({'case': f'mlx/{model}', 'backend': backend, 'model': model})
+        elif backend == 'openai-stub':
+            if importlib.util.find_spec('openai') is None:
+                print("  Skipping openai-stub (openai not installed)")
+                continue
+            cases.append({'case': 'openai-stub', 'backend': backend})
+    return cases
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """
+    Regressions of results against a baseline run.
+
+    Returns:
+        List of human-readable regression descriptions (empty if none)
+    """
+    previous = {r['case']: r for r in baseline.get('results', []) if 'error' not in r}
+    regressions = []
+    for result in results:
+        base = previous.get(result['case'])
+        if base is None:
+            continue
+        if 'error' in result:
+            regressions.append(f"{result['case']}: failed ({result['error']})")
+            continue
+        if result.get('rtf') and base.get('rtf') and result['rtf'] > base['rtf'] * (1 + tolerance) \
+                and result['rtf'] - base['rtf'] > RTF_FLOOR:
+            regressions.append(f"{result['case']}: RTF {base['rtf']:.4f} -> {result['rtf']:.4f}")
+        if result.get('peak_rss_mb') and base.get('peak_rss_mb') \
+                and result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{result['case']}: peak RSS {base['peak_rss_mb']:.0f} MB -> "
+                               f"{result['peak_rss_mb']:.0f} MB")
+        if result.get('wer') is not None and base.get('wer') is not None \
+                and result['wer'] > base['wer'] + WER_TOLERANCE:
+            regressions.append(f"{result['case']}: WER {base['wer']:.1%} -> {result['wer']:.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing and transcription backends")
+    parser.add_argument("--corpus", type=Path,
+                        help="Folder of recordings with .txt references (default: synthesized corpus)")
+    parser.add_argument("--backends", default=','.join(BACKENDS),
+                        help=f"Comma-separated backends (default: {','.join(BACKENDS)})")
+    parser.add_argument("--models", default="tiny,small", help="Comma-separated model sizes (default: tiny,small)")
+    parser.add_argument("--compute-types", default="int8,float32",
+                        help="faster-whisper compute types (default: int8,float32)")
+    parser.add_argument("--device", default="cpu", help="faster-whisper device (default: cpu)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per file; the median is kept (default: 1)")
+    parser.add_argument("--output", type=Path, help="Results file (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed relative slowdown / memory growth (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus or synthesize(CORPUS_DIR)
+    items = load_corpus(corpus_dir)
+    print(f"Corpus: {len(items)} recordings from {corpus_dir}")
+
+    cases = plan_cases([b.strip() for b in args.backends.split(',') if b.strip()],
+                       [m.strip() for m in args.models.split(',') if m.strip()],
+                       [c.strip() for c in args.compute_types.split(',') if c.strip()],
+                       args.device)
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for case in cases:
+        print(f"\n== {case['case']} ==")
+        queue = context.Queue()
+        process = context.Process(target=run_case, args=(case, items, args.repeat, queue))
+        process.start()
+        result = summarize(wait_for_result(process, queue, case))
+        results.append(result)
+
+        if 'error' in result:
+            print(f"  Failed: {result['error']}")
+            continue
+        line = f"  {result['wall_seconds']:.1f}s for {result['audio_seconds']/60:.1f} min, RTF {result['rtf']:.3f}"
+        if result.get('peak_rss_mb'):
+            line += f", peak {result['peak_rss_mb']:.0f} MB"
+        if 'wer' in result:
+            line += f", WER {result['wer']:.1%}, load {result['load_seconds']:.1f}s"
+        print(line)
+
+    report = {
+        'host': platform.node(),
+        'platform': f"{platform.system()} {platform.machine()}",
+        'python': platform.python_version(),
+        'timestamp': datetime.now().isoformat(),
+        'corpus': str(corpus_dir),
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults: {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("No baseline yet; run with --save-baseline to store one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('host') != report['host']:
+        print(f"Warning: baseline is from {baseline.get('host')}, this is {report['host']}")
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Hardware-aware tuning of faster-whisper settings.
+Times candidate compute types, CPU thread counts and worker counts on a
+short speech clip, keeps the fastest configuration that transcribes as well
+as the most precise one, and remembers it per host, model and device so the
+model loader can apply it on every later start.
+"""
+
+import functools
+import gc
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from estimator import local_host
+from preprocess import SAMPLE_RATE
+
+DEFAULT_PATH = Path(__file__).parent.parent / "data" / "autotune.json"
+# Short speech recording with its transcript alongside (probe_clip.txt)
+PROBE_CLIP = Path(__file__).parent.parent / "bench" / "probe" / "probe_clip.wav"
+
+# Candidates in order of preference when timings tie (most precise first)
+CPU_COMPUTE_TYPES = ('float32', 'int8_float32', 'int8', 'bfloat16', 'int8_bfloat16')
+CUDA_COMPUTE_TYPES = ('float16', 'bfloat16', 'int8_float16', 'int8_bfloat16', 'int8')
+WORKER_COUNTS = (1, 2, 4)
+
+QUALITY_TOLERANCE = 0.05  # word error rate a faster compute type may add
+WORKER_GAIN = 1.15        # throughput gain needed before decoding jobs in parallel
+PROBE_REPEATS = 2
+
+
+@functools.lru_cache(maxsize=None)
+def cpu_info() -> dict:
+    """
+    Core counts and the SIMD extensions CTranslate2 dispatches on.
+    Read once per process; treat the returned dict as read-only.
+    """
+    logical = os.cpu_count() or 1
+    physical = None
+    try:
+        import psutil
+        physical = psutil.cpu_count(logical=False)
+    except ImportError:
+        pass
+
+    flags = set()
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    flags = set(line.split(':', 1)[1].split())
+                    break
+    except OSError:
+        pass
+
+    return {
+        'processor': platform.processor() or platform.machine(),
+        'logical_cores': logical,
+        'physical_cores': physical or logical,
+        'simd': sorted(flags & {'avx', 'avx2', 'avx512f', 'avx512_vnni', 'avx512_bf16', 'amx_int8', 'fma'}),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def runtime_versions() -> dict:
+    """Installed CTranslate2 / faster-whisper versions, looked up once per process."""
+    versions = {}
+    for package in ('ctranslate2', 'faster_whisper'):
+        try:
+            versions[package] = __import__(package).__version__
+        except (ImportError, AttributeError):
+            versions[package] = None
+    return versions
+
+
+def candidate_compute_types(device: str) -> list:
+    """Compute types this build of CTranslate2 supports on the device."""
+    import ctranslate2
+
+    supported = ctranslate2.get_supported_compute_types(device)
+    preferred = CUDA_COMPUTE_TYPES if device == 'cuda' else CPU_COMPUTE_TYPES
+    return [c for c in preferred if c in supported]
+
+
+def thread_candidates(info: dict) -> list:
+    """Half the physical cores, all of them, and every logical core."""
+    physical, logical = info['physical_cores'], info['logical_cores']
+    return sorted({max(1, physical // 2), physical, logical})
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance over the reference length."""
+    ref = [w.strip('.,!?;:"').lower() for w in reference.split()]
+    hyp = [w.strip('.,!?;:"').lower() for w in hypothesis.split()]
+    if not ref:
+        return float(bool(hyp))
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (r != h))
+    return row[-1] / len(ref)
+
+
+def load_probe_clip(clip: Optional[str] = None) -> tuple:
+    """
+    Decode the clip used for timing.
+
+    Defaults to the bundled PROBE_CLIP, so every host is tuned on the same
+    recording without needing a text-to-speech engine.
+
+    Returns:
+        Tuple of (float32 samples, reference transcript or None, clip path)
+    """
+    from preprocess import decode_audio
+
+    clip = str(clip or PROBE_CLIP)
+    audio, _ = decode_audio(clip, remove_silence_enabled=False)
+    reference = Path(clip).with_suffix('.txt')
+    return audio, reference.read_text().strip() if reference.exists() else None, clip
+
+
+def time_config(audio, model: str, device: str, compute_type: str,
+                cpu_threads: int, num_workers: int, repeats: int = PROBE_REPEATS) -> dict:
+    """
+    Load a model with one configuration and time transcriptions of audio.
+
+    With several workers, that many transcriptions run at once and the
+    time reported is wall time per clip, i.e. inverse throughput.
+    """
+    from faster_whisper import WhisperModel
+
+    whisper_model = WhisperModel(model, device=device, compute_type=compute_type,
+                                 cpu_threads=cpu_threads, num_workers=num_workers)
+    duration = len(audio) / SAMPLE_RATE
+
+    def run() -> str:
+        segments, _ = whisper_model.transcribe(audio, beam_size=5)
+        return ' '.join(s.text.strip() for s in segments)
+
+    try:
+        text = run()  # warm-up: first call allocates buffers
+        if num_workers == 1:
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - start)
+            seconds = statistics.median(times)
+        else:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(num_workers) as executor:
+                list(executor.map(lambda _: run(), range(num_workers * repeats)))
+            seconds = (time.perf_counter() - start) / (num_workers * repeats)
+    finally:
+        del whisper_model
+        gc.collect()
+
+    return {'seconds': round(seconds, 3), 'rtf': round(seconds / duration, 4), 'text': text}
+
+
+def tune(model: str, device: str, clip: Optional[str] = None, repeats: int = PROBE_REPEATS,
+         log: Callable[[str], None] = print) -> dict:
+    """
+    Find the fastest configuration for a model on this machine.
+
+    Compute types are timed first (a type whose transcript is more than
+    QUALITY_TOLERANCE worse than the best is ruled out), then CPU thread
+    counts, then whether decoding several jobs at once raises throughput
+    by at least WORKER_GAIN.
+
+    Returns:
+        Configuration dict with compute_type, cpu_threads, num_workers, rtf
+        and every trial that was timed
+    """
+    audio, reference, clip = load_probe_clip(clip)
+    info = cpu_info()
+    trials = []
+
+    def trial(compute_type, cpu_threads, num_workers):
+        label = f"{compute_type}, {cpu_threads or 'default'} threads, {num_workers} workers"
+        try:
+            result = time_config(audio, model, device, compute_type, cpu_threads, num_workers, repeats)
+        except (RuntimeError, ValueError) as e:
+            log(f"  {label}: failed ({e})")
+            return None
+        result.update(compute_type=compute_type, cpu_threads=cpu_threads, num_workers=num_workers)
+        trials.append(result)
+        log(f"  {label}: {result['seconds']:.2f}s (RTF {result['rtf']:.3f})")
+        return result
+
+    # GPU decoding barely uses the CPU; leave CTranslate2's thread default there
+    threads = info['physical_cores'] if device == 'cpu' else 0
+
+    log(f"Tuning {model} on {device} ({info['processor']}, {info['physical_cores']} cores) with {clip}")
+    by_type = [r for r in (trial(c, threads, 1) for c in candidate_compute_types(device)) if r]
+    if not by_type:
+        raise RuntimeError(f"No compute type could run {model} on {device}")
+
+    # Judge accuracy against the reference, or against the most precise type's output
+    truth = reference or by_type[0]['text']
+    for result in by_type:
+        result['wer'] = round(word_error_rate(truth, result['text']), 4)
+    best_wer = min(r['wer'] for r in by_type)
+    best = min((r for r in by_type if r['wer'] <= best_wer + QUALITY_TOLERANCE), key=lambda r: r['seconds'])
+
+    if device == 'cpu':
+        for count in thread_candidates(info):
+            if count != best['cpu_threads']:
+                result = trial(best['compute_type'], count, 1)
+                if result and result['seconds'] < best['seconds']:
+                    best = result
+
+    single = best
+    for workers in WORKER_COUNTS[1:]:
+        if device == 'cpu' and single['cpu_threads'] < workers:
+            break
+        # Workers split the cores rather than oversubscribing them
+        per_worker = single['cpu_threads'] // workers if device == 'cpu' else 0
+        result = trial(single['compute_type'], per_worker, workers)
+        if result and result['seconds'] * WORKER_GAIN <= best['seconds']:
+            best = result
+
+    for result in trials:
+        result.pop('text', None)
+    return {
+        'compute_type': best['compute_type'],
+        'cpu_threads': best['cpu_threads'],
+        'num_workers': best['num_workers'],
+        'rtf': best['rtf'],
+        'clip': Path(clip).name,
+        'cpu': dict(info),
+        'versions': dict(runtime_versions()),
+        'tuned_at': time.time(),
+        'trials': trials,
+    }
+
+
+class TuningStore:
+    """
+    Tuned configurations on disk, keyed by host, model and device.
+
+    A configuration is only applied while the CPU and the CTranslate2 /
+    faster-whisper versions match those it was measured with.
+    """
+
+    def __init__(self, path: Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._configs = {}
+        self.running = None  # model being tuned right now
+        if self.path.exists():
+            try:
+                self._configs = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                self._configs = {}
+
+    @staticmethod
+    def _key(model: str, device: str, host: Optional[str] = None) -> str:
+        return f"{host or local_host()}/{model}/{device}"
+
+    def get(self, model: str, device: str, host: Optional[str] = None) -> Optional[dict]:
+        """Configuration for this machine, or None if untuned or stale."""
+        with self._lock:
+            config = self._configs.get(self._key(model, device, host))
+        if config is None:
+            return None
+        if host is None and (config.get('versions') != runtime_versions()
+                             or config.get('cpu', {}).get('processor') != cpu_info()['processor']):
+            return None
+        return config
+
+    def put(self, model: str, device: str, config: dict, host: Optional[str] = None):
+        with self._lock:
+            self._configs[self._key(model, device, host)] = config
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self._configs, indent=2))
+            tmp.replace(self.path)
+
+    def run(self, model: str, device: str, clip: Optional[str] = None,
+            log: Callable[[str], None] = print) -> dict:
+        """Tune a model now and store the result."""
+        self.running = model
+        try:
+            config = tune(model, device, clip, log=log)
+        finally:
+            self.running = None
+        self.put(model, device, config)
+        return config
+
+    def describe(self, device: str) -> dict:
+        """Configurations in effect on this host, for status endpoints."""
+        prefix = f"{local_host()}/"
+        with self._lock:
+            keys = [k for k in self._configs if k.startswith(prefix) and k.endswith(f"/{device}")]
+        applied = {}
+        for key in keys:
+            model = key[len(prefix):-len(device) - 1]
+            config = self.get(model, device)
+            if config is not None:
+                applied[model] = {k: config[k] for k in ('compute_type', 'cpu_threads', 'num_workers', 'rtf', 'tuned_at')}
+        return {'device': device, 'running': self.running, 'applied': applied}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find the fastest faster-whisper settings for this machine")
+    parser.add_argument("--model", default="large-v3", help="Model to tune (default: large-v3)")
+    parser.add_argument("--device", choices=["cpu", "cuda"], help="Device (default: cuda if available)")
+    parser.add_argument("--clip", help="Speech clip to time (default: bench/probe/probe_clip.wav)")
+    parser.add_argument("--path", type=Path, default=DEFAULT_PATH, help="Where tuned settings are stored")
+    parser.add_argument("--dry-run", action="store_true", help="Print the result without saving it")
+    args = parser.parse_args()
+
+    device = args.device
+    if device is None:
+        import ctranslate2
+        device = 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+
+    store = TuningStore(args.path)
+    if args.dry_run:
+        config = tune(args.model, device, args.clip)
+    else:
+        config = store.run(args.model, device, args.clip)
+    print(f"\nBest: {config['compute_type']}, {config['cpu_threads'] or 'default'} threads, "
+          f"{config['num_workers']} workers (RTF {config['rtf']:.3f})")
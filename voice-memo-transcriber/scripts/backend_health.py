@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Cached, concurrent health checks of transcription backends.
+Probes run in parallel, recent results are kept on disk for a short time so
+back-to-back CLI runs skip the network, and a backend whose probe failed is
+skipped (its circuit is open) for a back-off period that doubles with every
+further failure.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+HEALTHY_TTL = 30      # seconds a successful probe is trusted
+BREAKER_BASE = 30     # seconds a backend is skipped after its first failure
+BREAKER_MAX = 600     # longest back-off
+
+
+class HealthCache:
+    """
+    Probe results on disk, keyed by an arbitrary string (e.g. "http <url>").
+
+    Each entry keeps the last result, when it was taken, how long the probe
+    took, and the circuit breaker state: consecutive failures and the time
+    until which the backend is not probed again.
+    """
+
+    def __init__(self, path: Path, ttl: float = HEALTHY_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        try:
+            self._entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def check(self, probes: dict, refresh: bool = False) -> dict:
+        """
+        Results for several probes, running the ones not answered from cache at once.
+
+        Args:
+            probes: key -> zero-argument callable returning a dict with an
+                'available' flag
+            refresh: Probe everything, ignoring cached results and open circuits
+
+        Returns:
+            key -> result dict, plus 'latency_ms', 'age' (seconds since the
+            probe ran) and 'circuit_open' (skipped because of recent failures)
+        """
+        now = time.time()
+        results, pending = {}, {}
+        for key, probe in probes.items():
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry and not refresh:
+                fresh = entry['result'].get('available') and now - entry['checked_at'] < self.ttl
+                if fresh or entry.get('open_until', 0) > now:
+                    results[key] = self._describe(entry, now)
+                    continue
+            pending[key] = probe
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                futures = {key: executor.submit(self._timed, probe) for key, probe in pending.items()}
+            for key, future in futures.items():
+                result, latency = future.result()
+                entry = self._record(key, result, latency)
+                results[key] = self._describe(entry, time.time())
+            self._save()
+
+        return results
+
+    def record_failure(self, key: str):
+        """Trip the breaker for a backend that failed outside a probe (e.g. mid-upload)."""
+        self._record(key, {'available': False}, None)
+        self._save()
+
+    @staticmethod
+    def _timed(probe: Callable[[], dict]) -> tuple:
+        start = time.perf_counter()
+        try:
+            result = probe()
+        except Exception as e:
+            result = {'available': False, 'error': str(e)}
+        return result, (time.perf_counter() - start) * 1000
+
+    def _record(self, key: str, result: dict, latency) -> dict:
+        now = time.time()
+        with self._lock:
+            failures = self._entries.get(key, {}).get('failures', 0)
+            entry = {'result': result, 'checked_at': now,
+                     'latency_ms': round(latency, 1) if latency is not None else None}
+            if result.get('available'):
+                entry['failures'] = 0
+            else:
+                entry['failures'] = failures + 1
+                entry['open_until'] = now + min(BREAKER_MAX, BREAKER_BASE * 2 ** failures)
+            self._entries[key] = entry
+            return entry
+
+    @staticmethod
+    def _describe(entry: dict, now: float) -> dict:
+        return {
+            **entry['result'],
+            'latency_ms': entry.get('latency_ms'),
+            'age': round(now - entry['checked_at'], 1),
+            'circuit_open': not entry['result'].get('available') and entry.get('open_until', 0) > now,
+        }
+
+    def _save(self):
+        with self._lock:
+            try:
+                tmp = self.path.with_suffix('.tmp')
+                tmp.write_text(json.dumps(self._entries, indent=2))
+                tmp.replace(self.path)
+            except OSError:
+                pass  # the cache is only an optimisation
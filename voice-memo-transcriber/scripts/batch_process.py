@@ -4,8 +4,16 @@ Batch processing for voice memo transcription.
 Process all pending files from inbox folder or Supabase queue.
 """
 
+import asyncio
+import importlib.util
 import os
+import queue
 import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import List, Optional
@@ -14,12 +22,18 @@ from dotenv import load_dotenv
 from tqdm import tqdm
 
 # Local imports
-from transcribe import transcribe_file, compute_file_hash, estimate_cost_and_time, MLX_MODELS
+from transcribe import (
+    transcribe_file, transcribe_with_mlx, finish_transcription, record_transcription_time,
+    compute_file_hash, estimate_cost_and_time, MLX_MODELS
+)
 from sync_to_supabase import (
-    get_supabase_client, list_memos, get_memo_by_hash,
+    get_supabase_client, list_memos, get_memo_by_hash, get_memos_by_hashes,
     create_memo, update_memo_status, sync_transcription_result, get_stats
 )
-from preprocess import get_audio_duration
+from preprocess import get_audio_duration, preprocess_audio, estimate_transcription_time
+from pipeline import Pipeline, Stage
+from inbox_manifest import get_manifest
+from inbox_watcher import POLL_INTERVAL, StabilityTracker, open_watcher
 
 # Load environment variables
 load_dotenv()
@@ -33,6 +47,16 @@ TRANSCRIPTS_DIR = PROJECT_DIR / "transcripts"
 # Supported audio formats
 AUDIO_EXTENSIONS = {'.mp3', '.m4a', '.wav', '.ogg', '.flac', '.aac', '.wma', '.opus'}
 
+# Pipeline concurrency
+REGISTER_WORKERS = 4
+PREPROCESS_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))  # leave a core for the model
+SYNC_WORKERS = 4
+PIPELINE_QUEUE_SIZE = 2
+
+# Watch mode
+WATCH_RESCAN_SECONDS = 300   # full inbox scan, catching anything the watcher missed
+WATCH_IGNORED_MAX = 1000     # failed or skipped files remembered so they are not retried
+
 
 def scan_inbox() -> List[Path]:
     """
@@ -53,30 +77,34 @@ def scan_inbox() -> List[Path]:
     return sorted(files, key=lambda f: f.stat().st_mtime)
 
 
-def get_new_files() -> List[dict]:
+def get_new_files(allow_stale: bool = False) -> List[dict]:
     """
-    Get files from inbox that haven't been processed yet.
-    Checks against Supabase by file hash.
+    Get files from inbox with their processing status.
+    Hashes and durations come from the local manifest, so only new or
+    changed files are read and probed; Supabase is asked about all files
+    with one bulk query.
+
+    Args:
+        allow_stale: Fall back to the last known status if Supabase cannot be reached
 
     Returns:
         List of dicts with file info
     """
-    files = scan_inbox()
-    new_files = []
-
-    for file_path in files:
-        file_hash = compute_file_hash(str(file_path))
-        existing = get_memo_by_hash(file_hash)
-
-        file_info = {
-            'path': file_path,
-            'filename': file_path.name,
-            'hash': file_hash,
-            'duration': get_audio_duration(str(file_path)),
-            'size': file_path.stat().st_size,
-            'existing': existing
-        }
+    manifest = get_manifest()
+    files = manifest.scan(scan_inbox(), compute_file_hash, get_audio_duration)
 
+    try:
+        manifest.refresh_remote(files, get_memos_by_hashes)
+    except Exception as e:
+        if not allow_stale:
+            raise
+        print(f"Warning: could not reach Supabase ({e}), showing last known status")
+        for file_info in files:
+            file_info['existing'] = ({'id': file_info['memo_id'], 'status': file_info['remote_status']}
+                                     if file_info['memo_id'] else None)
+
+    for file_info in files:
+        existing = file_info['existing']
         if existing and existing.get('status') == 'completed':
             file_info['status'] = 'already_completed'
         elif existing and existing.get('status') == 'processing':
@@ -86,39 +114,46 @@ def get_new_files() -> List[dict]:
         else:
             file_info['status'] = 'new'
 
-        new_files.append(file_info)
+    return files
 
-    return new_files
 
+def describe_file(file_path: Path) -> dict:
+    """Hash and duration of a single file, from the manifest while it is unchanged."""
+    described = get_manifest().scan([file_path], compute_file_hash, get_audio_duration, prune=False)
+    if not described:
+        raise FileNotFoundError(f"Audio file not found: {file_path}")
+    return described[0]
 
-def add_to_queue(file_path: Path, preprocess: bool = True) -> dict:
+
+def add_to_queue(file_path: Path, preprocess: bool = True, file_info: Optional[dict] = None) -> dict:
     """
     Add a file to the processing queue in Supabase.
 
     Args:
         file_path: Path to audio file
         preprocess: Whether preprocessing will be applied
+        file_info: Entry from get_new_files(), saving another lookup
 
     Returns:
         Created memo record
     """
-    file_hash = compute_file_hash(str(file_path))
-    duration = get_audio_duration(str(file_path))
+    if file_info is None:
+        file_info = describe_file(file_path)
+        file_info['existing'] = get_memo_by_hash(file_info['hash'])
 
     # Check if already exists
-    existing = get_memo_by_hash(file_hash)
-    if existing:
-        return existing
+    if file_info.get('existing'):
+        return file_info['existing']
 
     # Estimate time
-    estimate = estimate_cost_and_time(str(file_path), use_openai=False, preprocess=preprocess)
+    estimate = estimate_transcription_time(file_info['duration'], "large-v3", preprocessed=preprocess)
 
     memo = create_memo(
-        file_hash=file_hash,
+        file_hash=file_info['hash'],
         filename=file_path.name,
-        duration_seconds=duration,
+        duration_seconds=file_info['duration'],
         preprocessing_applied=preprocess,
-        estimated_seconds=estimate['estimated_time_seconds']
+        estimated_seconds=estimate
     )
 
     return memo
@@ -145,14 +180,15 @@ def process_file(
         Transcription result dict
     """
     # Mark as processing in Supabase
-    file_hash = compute_file_hash(str(file_path))
-    existing = get_memo_by_hash(file_hash)
+    file_info = describe_file(file_path)
+    existing = get_memo_by_hash(file_info['hash'])
 
     if existing:
         update_memo_status(existing['id'], 'processing')
     else:
         # Add to queue first
-        memo = add_to_queue(file_path, preprocess)
+        file_info['existing'] = None
+        memo = add_to_queue(file_path, preprocess, file_info)
         update_memo_status(memo['id'], 'processing')
 
     try:
@@ -183,16 +219,32 @@ def batch_process(
     model: str = "mlx-community/whisper-large-v3-mlx",
     preprocess: bool = True,
     limit: Optional[int] = None,
-    skip_completed: bool = True
+    skip_completed: bool = True,
+    register_workers: int = REGISTER_WORKERS,
+    preprocess_workers: int = PREPROCESS_WORKERS,
+    sync_workers: int = SYNC_WORKERS
 ) -> List[dict]:
     """
-    Process all files in inbox.
+    Process all files in inbox as a staged pipeline.
+
+    The inbox is described from the local manifest (hashing only new files)
+    and checked against Supabase in one bulk query. The files to process
+    then flow through four stages joined by bounded queues, so the work of
+    different files overlaps instead of running strictly one after another:
+
+        register    create the memo or mark it processing (threads)
+        preprocess  FFmpeg silence removal and compression (process pool)
+        transcribe  one worker, which owns the loaded model
+        sync        Supabase writes, several in flight (asyncio)
 
     Args:
         model: MLX Whisper model to use
         preprocess: Apply preprocessing
         limit: Maximum number of files to process
         skip_completed: Skip files that have already been transcribed
+        register_workers: Memos created or updated at once
+        preprocess_workers: FFmpeg processes run at once
+        sync_workers: Supabase syncs in flight at once
 
     Returns:
         List of transcription results
@@ -209,12 +261,15 @@ def batch_process(
         print("No files to process.")
         return []
 
+    # transcribe_with_mlx exits when the package is missing, which would only end its worker thread
+    if importlib.util.find_spec('mlx_whisper') is None:
+        print("Error: mlx-whisper not installed. Run: pip install mlx-whisper")
+        sys.exit(1)
+
     # Calculate totals
     total_duration = sum(f['duration'] for f in files)
-    total_estimate = sum(
-        estimate_cost_and_time(str(f['path']), preprocess=preprocess)['estimated_time_seconds']
-        for f in files
-    )
+    total_estimate = sum(estimate_transcription_time(f['duration'], "large-v3", preprocessed=preprocess)
+                         for f in files)
 
     print(f"\n{'='*60}")
     print(f"Batch Processing: {len(files)} files")
@@ -223,32 +278,80 @@ def batch_process(
     print(f"Estimated processing time: {total_estimate/60:.1f} minutes")
     print(f"Model: {model}")
     print(f"Preprocessing: {'enabled' if preprocess else 'disabled'}")
+    print(f"Workers: {register_workers} register, {preprocess_workers if preprocess else 0} preprocess, "
+          f"1 transcribe, {sync_workers} sync")
     print(f"{'='*60}\n")
 
-    results = []
-
-    for i, file_info in enumerate(files, 1):
-        print(f"\n[{i}/{len(files)}] Processing: {file_info['filename']}")
-        print(f"Duration: {file_info['duration']/60:.1f} min")
+    def register(item: dict) -> dict:
+        memo = item['existing'] or add_to_queue(item['path'], preprocess, item)
+        item['memo_id'] = memo['id']
+        update_memo_status(item['memo_id'], 'processing')
+        item['audio'] = str(item['path'])
+        return item
+
+    def preprocess_stage(item: dict) -> dict:
+        start = time.perf_counter()
+        temp_preprocessed = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
+        temp_preprocessed.close()
+        try:
+            item['audio'], item['preprocess_stats'] = pool.submit(
+                preprocess_audio, str(item['path']), temp_preprocessed.name,
+                remove_silence_enabled=True, compress_enabled=True
+            ).result()
+        except Exception as e:
+            print(f"  Preprocessing failed for {item['filename']}: {e}, using original file")
+            os.unlink(temp_preprocessed.name)
+        item['preprocess_time'] = time.perf_counter() - start
+        return item
 
+    def transcribe(item: dict) -> dict:
+        print(f"\nTranscribing: {item['filename']} ({item['duration']/60:.1f} min)")
         try:
-            result = process_file(
-                file_info['path'],
-                model=model,
-                preprocess=preprocess,
-                sync_to_db=True,
-                move_completed=True
-            )
-            results.append(result)
-            print(f"Completed: {result['word_count']} words in {result['transcription_time']:.1f}s")
+            result = transcribe_with_mlx(item['audio'], model)
+        finally:
+            discard_preprocessed(item)
+        record_transcription_time(result, item['duration'], item.get('preprocess_stats'),
+                                  item.get('preprocess_time', 0.0))
+        item.update(finish_transcription(item['path'], result, item['hash'], item['duration'],
+                                         preprocess=preprocess, preprocess_stats=item.get('preprocess_stats'),
+                                         move_completed=True))
+        print(f"Completed: {item['word_count']} words in {item['transcription_time']:.1f}s")
+        return item
+
+    async def sync(item: dict) -> dict:
+        # The Supabase client is synchronous; each sync runs on its own thread
+        sync_result = await asyncio.to_thread(sync_transcription_result, item)
+        item['memo_id'] = sync_result['memo_id']
+        item['transcript_id'] = sync_result['transcript_id']
+        return item
+
+    def on_error(item: dict, error: Exception):
+        print(f"Error ({item['failed_stage']}) {item['filename']}: {error}")
+        discard_preprocessed(item)
+        if item.get('memo_id'):
+            update_memo_status(item['memo_id'], 'failed')
+
+    stages = [Stage('register', register, workers=register_workers, queue_size=register_workers * 2)]
+    if preprocess:
+        stages.append(Stage('preprocess', preprocess_stage, workers=preprocess_workers,
+                            queue_size=preprocess_workers))
+    stages += [
+        # Small queues: each waiting item holds a preprocessed temp file
+        Stage('transcribe', transcribe, workers=1, queue_size=PIPELINE_QUEUE_SIZE),
+        Stage('sync', sync, workers=sync_workers, queue_size=PIPELINE_QUEUE_SIZE),
+    ]
+    pipeline = Pipeline(stages, on_error=on_error)
+
+    pool = ProcessPoolExecutor(max_workers=preprocess_workers) if preprocess else None
+    try:
+        results = pipeline.run(files)
+    finally:
+        if pool:
+            pool.shutdown()
 
-        except Exception as e:
-            print(f"Error: {e}")
-            results.append({
-                'filename': file_info['filename'],
-                'error': str(e),
-                'status': 'failed'
-            })
+    for result in results:
+        for key in ('audio', 'existing'):
+            result.pop(key, None)
 
     # Summary
     print(f"\n{'='*60}")
@@ -264,18 +367,191 @@ def batch_process(
         for f in failed:
             print(f"  - {f['filename']}: {f['error']}")
 
+    total_audio = sum(r['duration_seconds'] for r in successful)
     if successful:
         total_time = sum(r['transcription_time'] for r in successful)
         total_words = sum(r['word_count'] for r in successful)
+        print(f"Total audio duration: {total_audio/60:.1f} minutes")
         print(f"Total transcription time: {total_time/60:.1f} minutes")
         print(f"Total words: {total_words}")
 
+    print_pipeline_report(pipeline.report(audio_seconds=total_audio))
+
     return results
 
 
+def discard_preprocessed(item: dict):
+    """Delete an item's preprocessed temp file, if it has one."""
+    audio = item.get('audio')
+    if audio and audio != str(item['path']):
+        try:
+            os.unlink(audio)
+        except OSError:
+            pass
+        item['audio'] = str(item['path'])
+
+
+def print_pipeline_report(report: dict):
+    """Print per-stage utilization and end-to-end throughput of a pipeline run."""
+    print(f"\nPipeline ({report['wall_seconds']/60:.1f} min wall clock):")
+    print(f"  {'Stage':<12} {'Workers':>7} {'Files':>6} {'Busy':>9} {'Blocked':>9} {'Util':>6}")
+    for stage in report['stages']:
+        print(f"  {stage['name']:<12} {stage['workers']:>7} {stage['processed']:>6} "
+              f"{stage['busy_seconds']:>8.1f}s {stage['blocked_seconds']:>8.1f}s {stage['utilization']:>6.0%}")
+    busiest = max(report['stages'], key=lambda s: s['utilization'])
+    print(f"  Bottleneck: {busiest['name']}")
+    print(f"Throughput: {report['items_per_minute']:.1f} files/min, "
+          f"{report['audio_seconds_per_second']:.1f}x real-time")
+
+
+def watch_inbox(
+    model: str = "mlx-community/whisper-large-v3-mlx",
+    preprocess: bool = True,
+    skip_completed: bool = True,
+    poll_interval: float = POLL_INTERVAL
+):
+    """
+    Process files as they arrive in the inbox, until interrupted.
+
+    Files are picked up through inotify (or polling where it is not
+    available) once their size has settled, registered in Supabase straight
+    away, and transcribed one at a time by a worker thread through
+    process_file(). The process stays up, so the model stays loaded
+    between files. Files that fail or are already transcribed are not
+    retried until they change.
+
+    Args:
+        model: MLX Whisper model to use
+        preprocess: Apply preprocessing
+        skip_completed: Skip files that have already been transcribed
+        poll_interval: Seconds between inbox scans when polling
+    """
+    # transcribe_with_mlx exits when the package is missing, which would only end the worker thread
+    if importlib.util.find_spec('mlx_whisper') is None:
+        print("Error: mlx-whisper not installed. Run: pip install mlx-whisper")
+        sys.exit(1)
+
+    AUDIO_INBOX.mkdir(parents=True, exist_ok=True)
+    watcher = open_watcher(AUDIO_INBOX, poll_interval)
+    tracker = StabilityTracker()
+    work = queue.Queue()   # registered paths waiting for the model; None stops the worker
+    queued = set()         # paths waiting or being transcribed
+    ignored = OrderedDict()  # path -> (size, mtime_ns) of files not to retry until they change
+    lock = threading.Lock()
+
+    def signature(path: Path) -> Optional[tuple]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def ignore(path: Path):
+        with lock:
+            ignored[path] = signature(path)
+            ignored.move_to_end(path)
+            while len(ignored) > WATCH_IGNORED_MAX:
+                ignored.popitem(last=False)
+
+    def worker():
+        while True:
+            path = work.get()
+            if path is None:
+                break
+            try:
+                result = process_file(path, model=model, preprocess=preprocess,
+                                      sync_to_db=True, move_completed=True)
+                get_manifest().forget(path)
+                print(f"Completed: {result['word_count']} words in {result['transcription_time']:.1f}s")
+            except Exception as e:
+                print(f"Error: {path.name}: {e}")
+                ignore(path)
+            finally:
+                with lock:
+                    queued.discard(path)
+
+    def admit(path: Path):
+        """Register a settled file in Supabase and queue it for transcription."""
+        with lock:
+            sig = signature(path)
+            if path in queued or sig is None or ignored.get(path) == sig:
+                return
+        file_info = describe_file(path)
+        existing = get_memo_by_hash(file_info['hash'])
+        status = existing.get('status') if existing else None
+        if skip_completed and status in ('completed', 'processing'):
+            print(f"Skipping {path.name}: already {status}")
+            ignore(path)
+            return
+        if not existing:
+            file_info['existing'] = None
+            add_to_queue(path, preprocess, file_info)
+        with lock:
+            queued.add(path)
+        work.put(path)
+        print(f"Queued: {path.name} ({file_info['duration']/60:.1f} min, {work.qsize()} waiting)")
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+
+    print(f"\n{'='*60}")
+    print(f"Watching {AUDIO_INBOX} ({watcher.name})")
+    print(f"{'='*60}")
+    print(f"Model: {model}")
+    print(f"Preprocessing: {'enabled' if preprocess else 'disabled'}")
+    print("Press Ctrl-C to stop.")
+    print(f"{'='*60}\n")
+
+    rescan_at = 0.0
+    try:
+        while True:
+            # Short waits while files are settling, so they are picked up promptly
+            timeout = 0.5 if len(tracker) else max(0.0, rescan_at - time.monotonic())
+            changed = watcher.wait(timeout) if time.monotonic() < rescan_at else None
+
+            if changed is None:
+                # First pass, periodic reconciliation, or the watcher lost events
+                changed = {path.name for path in scan_inbox()}
+                rescan_at = time.monotonic() + WATCH_RESCAN_SECONDS
+                with lock:
+                    for path in [p for p in ignored if p.name not in changed]:
+                        del ignored[path]
+
+            for name in changed:
+                path = AUDIO_INBOX / name
+                if path.suffix.lower() in AUDIO_EXTENSIONS and not name.startswith('.'):
+                    tracker.observe(path)
+
+            for path in tracker.ready():
+                try:
+                    admit(path)
+                except Exception as e:
+                    # Picked up again by the next rescan
+                    print(f"Could not register {path.name}: {e}")
+
+    except KeyboardInterrupt:
+        print("\nStopping watch...")
+    finally:
+        watcher.close()
+
+    # Leave queued files pending; only the one being transcribed is finished
+    while True:
+        try:
+            work.get_nowait()
+        except queue.Empty:
+            break
+    work.put(None)
+    if queued:
+        print("Waiting for the current file to finish (Ctrl-C again to abort)...")
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        pass
+
+
 def show_queue_status():
     """Display current queue status."""
-    files = get_new_files()
+    files = get_new_files(allow_stale=True)
 
     print(f"\n{'='*60}")
     print("Inbox Status")
@@ -292,8 +568,8 @@ def show_queue_status():
 
     print(f"\nNew files (not in database): {len(new_files)}")
     for f in new_files:
-        est = estimate_cost_and_time(str(f['path']))
-        print(f"  - {f['filename']} ({f['duration']/60:.1f} min, ~{est['estimated_time_minutes']:.1f} min to process)")
+        est = estimate_transcription_time(f['duration'], "large-v3", preprocessed=True)
+        print(f"  - {f['filename']} ({f['duration']/60:.1f} min, ~{est/60:.1f} min to process)")
 
     if pending:
         print(f"\nPending in queue: {len(pending)}")
@@ -336,6 +612,12 @@ if __name__ == "__main__":
                         help="Re-process files that were already completed")
     parser.add_argument("--add-only", action="store_true",
                         help="Only add files to queue, don't process")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and transcribe files as they arrive in the inbox")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between inbox scans in --watch mode without inotify (default: {POLL_INTERVAL:g})")
+    parser.add_argument("--preprocess-workers", type=int, default=PREPROCESS_WORKERS,
+                        help=f"FFmpeg preprocessing processes run at once (default: {PREPROCESS_WORKERS})")
 
     args = parser.parse_args()
 
@@ -353,18 +635,28 @@ if __name__ == "__main__":
 
         print(f"Adding {len(new_files)} files to queue...")
         for f in new_files:
-            memo = add_to_queue(f['path'], preprocess=not args.no_preprocess)
+            memo = add_to_queue(f['path'], preprocess=not args.no_preprocess, file_info=f)
             print(f"  Added: {f['filename']}")
 
         print("Done.")
         sys.exit(0)
 
-    # Full batch processing
     model = MLX_MODELS.get(args.model, args.model)
 
+    if args.watch:
+        watch_inbox(
+            model=model,
+            preprocess=not args.no_preprocess,
+            skip_completed=not args.include_completed,
+            poll_interval=args.poll_interval
+        )
+        sys.exit(0)
+
+    # Full batch processing
     results = batch_process(
         model=model,
         preprocess=not args.no_preprocess,
         limit=args.limit,
-        skip_completed=not args.include_completed
+        skip_completed=not args.include_completed,
+        preprocess_workers=args.preprocess_workers
     )
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Batched transcription of many short clips.
+Clips are packed onto one timeline separated by short silences, cut into
+windows that never cross a clip boundary, and decoded together by
+faster-whisper's BatchedInferencePipeline. Segments are then mapped back to
+the clip they came from with clip-local timestamps.
+"""
+
+import bisect
+import os
+import sys
+import time
+from typing import Callable, Optional
+
+from chunked import find_split_points
+from preprocess import SAMPLE_RATE
+
+# Whisper decodes at most 30 s per window
+MAX_WINDOW_SECONDS = 28.0
+
+# Silence inserted between packed clips
+GAP_SECONDS = 1.0
+
+
+def plan_groups(durations: list, max_clip_seconds: float = 180,
+                max_group_seconds: float = 600) -> tuple[list, list]:
+    """
+    Group short clips for batched decoding.
+
+    Args:
+        durations: Clip durations in seconds, in submission order
+        max_clip_seconds: Longer clips are not batched
+        max_group_seconds: Total audio per group
+
+    Returns:
+        Tuple of (groups of clip indices, indices of clips to run on their own)
+    """
+    groups, singles = [], []
+    current, current_seconds = [], 0.0
+
+    for i, duration in enumerate(durations):
+        if not duration or duration > max_clip_seconds:
+            singles.append(i)
+            continue
+        if current and current_seconds + duration > max_group_seconds:
+            groups.append(current)
+            current, current_seconds = [], 0.0
+        current.append(i)
+        current_seconds += duration
+
+    if current:
+        groups.append(current)
+
+    # A group of one gains nothing from batching
+    singles.extend(g[0] for g in groups if len(g) == 1)
+    return [g for g in groups if len(g) > 1], sorted(singles)
+
+
+def pack_clips(clips: list, sample_rate: int = SAMPLE_RATE, gap_seconds: float = GAP_SECONDS) -> tuple:
+    """
+    Concatenate clips with a silence gap after each one.
+
+    Returns:
+        Tuple of (packed float32 samples, list of (start, end) sample spans)
+    """
+    import numpy as np
+
+    gap = np.zeros(int(gap_seconds * sample_rate), dtype=np.float32)
+    parts, spans = [], []
+    offset = 0
+    for clip in clips:
+        spans.append((offset, offset + len(clip)))
+        parts.extend([clip.astype(np.float32, copy=False), gap])
+        offset += len(clip) + len(gap)
+    audio = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    return audio, spans
+
+
+def clip_windows(clip, offset: int, sample_rate: int = SAMPLE_RATE,
+                 max_seconds: float = MAX_WINDOW_SECONDS, gap_seconds: float = GAP_SECONDS) -> list:
+    """
+    Decoding windows for one packed clip, cut at quiet points.
+
+    The trailing silence gap is included in the last window so a clip's final
+    words are never glued to the next clip's first ones.
+
+    Returns:
+        List of {'start', 'end'} sample offsets on the packed timeline
+    """
+    limit = int(max_seconds * sample_rate)
+    cuts = find_split_points(clip, sample_rate, chunk_seconds=max_seconds - 4, search_seconds=4)
+    bounds = [0] + cuts + [len(clip)]
+
+    windows = []
+    for start, end in zip(bounds, bounds[1:]):
+        # Hard split anything the quiet-point search left too long
+        pieces = max(1, -(-(end - start) // limit))
+        step = (end - start) / pieces
+        for k in range(pieces):
+            windows.append({'start': offset + int(start + k * step), 'end': offset + int(start + (k + 1) * step)})
+
+    gap = int(gap_seconds * sample_rate)
+    last = windows[-1]
+    last['end'] = min(last['end'] + gap, last['start'] + int(30 * sample_rate))
+    return windows
+
+
+def _load_batched_pipeline(model):
+    """BatchedInferencePipeline around a loaded WhisperModel, or None if unsupported."""
+    try:
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:
+        return None
+    return BatchedInferencePipeline(model=model)
+
+
+def transcribe_clips(model, clips: list, batch_size: int = 8, beam_size: int = 5,
+                     language: Optional[str] = None,
+                     on_segment: Optional[Callable[[int, dict], None]] = None) -> list:
+    """
+    Transcribe many short clips as shared batches.
+
+    Falls back to one decode per clip with the same model when the installed
+    faster-whisper has no BatchedInferencePipeline.
+
+    Args:
+        model: Loaded faster-whisper WhisperModel
+        clips: float32 mono samples at 16 kHz, one array per clip
+        batch_size: Windows decoded per forward pass
+        beam_size: Beam size for decoding
+        language: Force a language (otherwise detected once for the batch)
+        on_segment: Called with (clip index, segment) in timeline order,
+            timestamps relative to the start of the clip
+
+    Returns:
+        One dict per clip with 'text', 'segments', 'language'
+    """
+    results = [{'text': '', 'segments': [], 'language': language or 'en'} for _ in clips]
+
+    def emit(index, segment):
+        results[index]['segments'].append(segment)
+        if on_segment:
+            on_segment(index, segment)
+
+    pipeline = _load_batched_pipeline(model)
+    if pipeline is None:
+        for i, clip in enumerate(clips):
+            segments, info = model.transcribe(clip, beam_size=beam_size, language=language)
+            results[i]['language'] = info.language
+            for s in segments:
+                emit(i, {'start': s.start, 'end': s.end, 'text': s.text})
+    else:
+        audio, spans = pack_clips(clips)
+        windows = []
+        for clip, (start, _) in zip(clips, spans):
+            windows.extend(clip_windows(clip, start))
+
+        starts = [start / SAMPLE_RATE for start, _ in spans]
+        segments, info = pipeline.transcribe(
+            audio,
+            batch_size=batch_size,
+            beam_size=beam_size,
+            language=language,
+            clip_timestamps=windows,
+            without_timestamps=False
+        )
+        for s in segments:
+            # A segment belongs to the clip its midpoint falls in
+            index = max(0, bisect.bisect_right(starts, (s.start + s.end) / 2) - 1)
+            offset = starts[index]
+            length = (spans[index][1] - spans[index][0]) / SAMPLE_RATE
+            emit(index, {
+                'start': max(0.0, s.start - offset),
+                'end': min(length, s.end - offset),
+                'text': s.text
+            })
+        for result in results:
+            result['language'] = info.language
+
+    for result in results:
+        result['text'] = ' '.join(s['text'].strip() for s in result['segments'])
+    return results
+
+
+def benchmark(file_paths: list, model: str = 'small', device: str = 'cpu',
+              compute_type: str = 'int8', batch_size: int = 8) -> dict:
+    """
+    Compare one decode per file against batched decoding of all files.
+
+    Returns:
+        dict with timings and throughput for both paths
+    """
+    from faster_whisper import WhisperModel
+    from preprocess import decode_audio
+
+    clips = [decode_audio(path, remove_silence_enabled=False)[0] for path in file_paths]
+    total = sum(len(c) for c in clips) / SAMPLE_RATE
+    print(f"{len(clips)} files, {total/60:.1f} min of audio, model: {model} ({device}, {compute_type})")
+
+    whisper_model = WhisperModel(model, device=device, compute_type=compute_type)
+
+    start = time.time()
+    for clip in clips:
+        segments, _ = whisper_model.transcribe(clip, beam_size=5)
+        list(segments)
+    sequential_time = time.time() - start
+    print(f"  One call per file: {sequential_time:.1f}s ({total/sequential_time:.1f}x real-time)")
+
+    start = time.time()
+    transcribe_clips(whisper_model, clips, batch_size=batch_size)
+    batched_time = time.time() - start
+    print(f"  Batched (batch_size={batch_size}): {batched_time:.1f}s ({total/batched_time:.1f}x real-time)")
+
+    speedup = sequential_time / batched_time if batched_time else 0
+    print(f"  Speedup: {speedup:.2f}x")
+    return {
+        'files': len(clips),
+        'audio_seconds': total,
+        'sequential_seconds': sequential_time,
+        'batched_seconds': batched_time,
+        'speedup': speedup,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batched transcription of many short clips")
+    parser.add_argument("files", nargs="+", help="Audio files to transcribe")
+    parser.add_argument("--model", default="small", help="faster-whisper model (default: small)")
+    parser.add_argument("--device", default="cpu", help="cpu or cuda (default: cpu)")
+    parser.add_argument("--compute-type", default="int8", help="CTranslate2 compute type (default: int8)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Windows per forward pass (default: 8)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare against one decode per file and report the speedup")
+
+    args = parser.parse_args()
+
+    missing = [f for f in args.files if not os.path.exists(f)]
+    if missing:
+        print(f"Error: File not found: {missing[0]}")
+        sys.exit(1)
+
+    if args.benchmark:
+        benchmark(args.files, args.model, args.device, args.compute_type, args.batch_size)
+    else:
+        from faster_whisper import WhisperModel
+        from preprocess import decode_audio
+
+        clips = [decode_audio(f)[0] for f in args.files]
+        whisper_model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type)
+        start = time.time()
+        results = transcribe_clips(whisper_model, clips, batch_size=args.batch_size)
+        for path, result in zip(args.files, results):
+            print(f"\n== {os.path.basename(path)} ==\n{result['text']}")
+        print(f"\n{len(clips)} files in {time.time() - start:.1f}s")
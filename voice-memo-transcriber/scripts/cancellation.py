@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Cooperative cancellation for transcription jobs.
+A CancelToken is checked between units of work (segments, chunks) and
+kills any FFmpeg subprocess registered with it the moment it is cancelled,
+so a stopped job releases the CPU right away instead of at its next
+checkpoint.
+"""
+
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's worker when its token has been cancelled."""
+
+    def __init__(self, reason: str = 'cancelled'):
+        super().__init__(f"Job {reason}")
+        self.reason = reason
+
+
+class CancelToken:
+    """Cancellation flag shared between a job's worker and whoever stops it."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+        self.reason = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = 'cancelled'):
+        """Flag the job and kill its running subprocesses. Later calls keep the first reason."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            processes = list(self._processes)
+        for process in processes:
+            _kill(process)
+
+    def check(self):
+        """Raise JobCancelled if the job has been cancelled."""
+        if self._event.is_set():
+            raise JobCancelled(self.reason)
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds, waking early on cancellation. Returns cancelled."""
+        return self._event.wait(timeout)
+
+    @contextmanager
+    def track(self, process: subprocess.Popen):
+        """Kill process if the token is cancelled while the block runs."""
+        with self._lock:
+            self._processes.add(process)
+            cancelled = self._event.is_set()
+        if cancelled:
+            _kill(process)
+        try:
+            yield process
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+
+
+def _kill(process: subprocess.Popen):
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def run_process(cmd: list, input: Optional[bytes] = None,
+                cancel: Optional[CancelToken] = None) -> subprocess.CompletedProcess:
+    """
+    subprocess.run(cmd, input=input, capture_output=True) that a CancelToken can kill.
+
+    Raises:
+        JobCancelled: The token was cancelled while the process ran
+    """
+    if cancel is None:
+        return subprocess.run(cmd, input=input, capture_output=True)
+
+    cancel.check()
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with cancel.track(process):
+        try:
+            stdout, stderr = process.communicate(input)
+        except (BrokenPipeError, OSError):
+            # Killed while we were still writing its input
+            stdout, stderr = b'', b''
+            process.wait()
+    cancel.check()
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
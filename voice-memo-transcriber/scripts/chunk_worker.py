@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Model replica process for parallel chunked transcription.
+Started by chunked.py as a script of its own, so it loads faster-whisper
+and nothing else: not server.py with its job store, uploads and Flask app.
+Reads pickled (audio, language, beam_size) requests from stdin and answers
+each with a pickled (ok, payload) tuple on stdout, keeping the model loaded
+until stdin is closed.
+"""
+
+import os
+import pickle
+import sys
+
+
+def main(model: str, compute_type: str, cpu_threads: int):
+    requests = sys.stdin.buffer
+    # Results get their own copy of stdout; anything a library prints goes to stderr
+    results = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    from faster_whisper import WhisperModel
+    whisper_model = WhisperModel(model, device='cpu', compute_type=compute_type, cpu_threads=cpu_threads)
+
+    while True:
+        try:
+            audio, language, beam_size = pickle.load(requests)
+        except EOFError:
+            break
+        try:
+            segments, info = whisper_model.transcribe(audio, beam_size=beam_size, language=language)
+            reply = (True, ([{'start': s.start, 'end': s.end, 'text': s.text} for s in segments], info.language))
+        except Exception as e:
+            reply = (False, f"{type(e).__name__}: {e}")
+        pickle.dump(reply, results, protocol=pickle.HIGHEST_PROTOCOL)
+        results.flush()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2], int(sys.argv[3]))
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Parallel chunked transcription for long recordings on CPU.
+Splits decoded audio at quiet points, transcribes chunks concurrently on
+a pool of worker processes (one faster-whisper replica each, running
+chunk_worker.py), then stitches the segments back together with correct
+timestamps and overlap de-duplication.
+"""
+
+import os
+import pickle
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Optional
+
+from cancellation import CancelToken
+from model_pool import ModelPool, estimate_model_memory_mb
+from preprocess import SAMPLE_RATE
+
+WORKER_SCRIPT = Path(__file__).parent / "chunk_worker.py"
+WORKER_IDLE_SECONDS = 300  # replicas unused this long are shut down, freeing their memory
+
+# Resident worker pools keyed by (model, compute_type, workers)
+_pools = {}
+_pools_lock = threading.Lock()
+_reaper = None
+
+
+def frame_energy(audio, sample_rate: int = SAMPLE_RATE, frame_ms: int = 30):
+    """RMS energy per frame."""
+    import numpy as np
+
+    frame = int(sample_rate * frame_ms / 1000)
+    usable = len(audio) - len(audio) % frame
+    if usable == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:usable].reshape(-1, frame)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def find_split_points(audio, sample_rate: int = SAMPLE_RATE,
+                      chunk_seconds: float = 300, search_seconds: float = 20,
+                      frame_ms: int = 30) -> list:
+    """
+    Pick chunk boundaries near every chunk_seconds, snapped to the quietest
+    frame within +/- search_seconds so cuts land in pauses, not mid-word.
+
+    Returns:
+        Sample offsets of the cut points (excluding 0 and len(audio))
+    """
+    import numpy as np
+
+    energy = frame_energy(audio, sample_rate, frame_ms)
+    frame = int(sample_rate * frame_ms / 1000)
+    total = len(audio) / sample_rate
+    cuts = []
+
+    target = chunk_seconds
+    while target < total - chunk_seconds / 4:
+        lo = max(0, int((target - search_seconds) * 1000 / frame_ms))
+        hi = min(len(energy), int((target + search_seconds) * 1000 / frame_ms))
+        if hi <= lo:
+            break
+        quietest = lo + int(np.argmin(energy[lo:hi]))
+        cut = quietest * frame + frame // 2
+        if not cuts or cut > cuts[-1]:
+            cuts.append(cut)
+        target = cut / sample_rate + chunk_seconds
+
+    return cuts
+
+
+def plan_chunks(audio, sample_rate: int = SAMPLE_RATE, chunk_seconds: float = 300,
+                overlap_seconds: float = 1.0) -> list:
+    """
+    Split audio into chunks that overlap slightly across each cut.
+
+    Returns:
+        List of dicts with sample range (start, end) and the nominal
+        ownership window (own_start, own_end) in seconds
+    """
+    cuts = find_split_points(audio, sample_rate, chunk_seconds)
+    bounds = [0] + cuts + [len(audio)]
+    overlap = int(overlap_seconds * sample_rate)
+
+    chunks = []
+    for i in range(len(bounds) - 1):
+        chunks.append({
+            'index': i,
+            'start': max(0, bounds[i] - overlap),
+            'end': min(len(audio), bounds[i + 1] + overlap),
+            'own_start': bounds[i] / sample_rate,
+            'own_end': bounds[i + 1] / sample_rate,
+        })
+    return chunks
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'[^\w\s]', '', text.lower()).strip()
+
+
+def stitch_segments(chunk_results: list) -> list:
+    """
+    Merge per-chunk segments into one timeline.
+
+    Each chunk's segments are shifted by the chunk's start offset. Within the
+    overlap, a segment belongs to the chunk whose ownership window contains its
+    midpoint; an identical repeated line across a seam is dropped.
+
+    Args:
+        chunk_results: List of (chunk, segments) with chunk-local timestamps
+
+    Returns:
+        Ordered list of {'start', 'end', 'text'} on the original timeline
+    """
+    merged = []
+    for chunk, segments in sorted(chunk_results, key=lambda r: r[0]['index']):
+        offset = chunk['start'] / SAMPLE_RATE
+        for seg in segments:
+            start = seg['start'] + offset
+            end = seg['end'] + offset
+            midpoint = (start + end) / 2
+            if not (chunk['own_start'] <= midpoint < chunk['own_end']):
+                continue
+            if merged and _normalize(merged[-1]['text']) == _normalize(seg['text']) \
+                    and start - merged[-1]['end'] < 2.0:
+                continue
+            merged.append({'start': start, 'end': end, 'text': seg['text']})
+    return merged
+
+
+class WorkerProcess:
+    """One model replica in a child process, transcribing a chunk at a time."""
+
+    def __init__(self, model: str, compute_type: str, cpu_threads: int):
+        self.process = subprocess.Popen(
+            [sys.executable, str(WORKER_SCRIPT), model, compute_type, str(cpu_threads)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self.last_used = time.monotonic()
+
+    def transcribe(self, audio, language: Optional[str], beam_size: int) -> tuple:
+        """
+        Returns:
+            (True, (segments with chunk-local timestamps, detected language)),
+            or (False, error message) if decoding failed
+
+        Raises:
+            RuntimeError: If the process exited
+        """
+        try:
+            pickle.dump((audio, language, beam_size), self.process.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+            self.process.stdin.flush()
+            reply = pickle.load(self.process.stdout)
+        except (EOFError, OSError, pickle.UnpicklingError):
+            self.process.wait()
+            raise RuntimeError(f"Chunk worker exited with code {self.process.returncode}") from None
+        self.last_used = time.monotonic()
+        return reply
+
+    def close(self):
+        """Close stdin so the worker exits; kill it if it does not."""
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    """
+    Up to `workers` model replicas in child processes, shared by every job
+    on the same model.
+
+    A replica is started on first use, checked out for one chunk at a time
+    and shut down after WORKER_IDLE_SECONDS without work. With a model_pool,
+    live replicas are reserved against its RAM budget, so resident models are
+    evicted to make room for them.
+    """
+
+    def __init__(self, model: str, compute_type: str, workers: int,
+                 model_pool: Optional[ModelPool] = None):
+        self.model = model
+        self.compute_type = compute_type
+        self.workers = workers
+        self.cpu_threads = max(1, (os.cpu_count() or 2) // workers)
+        self.model_pool = model_pool
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self._idle = []  # started replicas waiting for a chunk
+        self._live = 0
+
+    def _account(self, change: int):
+        with self._lock:
+            self._live += change
+            live = self._live
+        if self.model_pool is not None:
+            self.model_pool.reserve(f"chunk workers {self.model}/{self.compute_type}/{self.workers}",
+                                    live * estimate_model_memory_mb(self.model, self.compute_type))
+
+    def transcribe(self, audio, language: Optional[str], beam_size: int,
+                   cancel: Optional[CancelToken] = None) -> tuple:
+        """
+        Transcribe one chunk on a free replica, starting one if none is idle.
+        Cancelling the token kills the replica mid-chunk, so the CPU is freed
+        at once; the next job starts a fresh one.
+        """
+        with self._slots:
+            if cancel is not None:
+                cancel.check()
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                self._account(+1)
+                try:
+                    worker = WorkerProcess(self.model, self.compute_type, self.cpu_threads)
+                except OSError:
+                    self._account(-1)
+                    raise
+            try:
+                if cancel is None:
+                    ok, payload = worker.transcribe(audio, language, beam_size)
+                else:
+                    with cancel.track(worker.process):
+                        ok, payload = worker.transcribe(audio, language, beam_size)
+            except BaseException:
+                self._discard(worker)
+                if cancel is not None:
+                    cancel.check()
+                raise
+            if cancel is not None and cancel.cancelled:
+                # Killed just after answering; don't hand a dead replica to the next chunk
+                self._discard(worker)
+                cancel.check()
+            with self._lock:
+                self._idle.append(worker)
+        if not ok:
+            raise RuntimeError(f"Chunk worker failed: {payload}")
+        return payload
+
+    def _discard(self, worker: WorkerProcess):
+        worker.close()
+        self._account(-1)
+
+    def reap(self, idle_seconds: float):
+        """Shut down replicas that have had no work for idle_seconds."""
+        now = time.monotonic()
+        with self._lock:
+            stale = [w for w in self._idle if now - w.last_used >= idle_seconds]
+            self._idle = [w for w in self._idle if w not in stale]
+        for worker in stale:
+            self._discard(worker)
+
+
+def _reap_idle_workers():
+    while True:
+        time.sleep(max(1.0, WORKER_IDLE_SECONDS / 4))
+        with _pools_lock:
+            pools = list(_pools.values())
+        for pool in pools:
+            pool.reap(WORKER_IDLE_SECONDS)
+
+
+def get_worker_pool(model: str, compute_type: str = 'int8', workers: int = 2,
+                    model_pool: Optional[ModelPool] = None) -> WorkerPool:
+    """Pool of model replicas, reused across jobs until they sit idle."""
+    global _reaper
+    key = (model, compute_type, workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = WorkerPool(model, compute_type, workers, model_pool)
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap_idle_workers, daemon=True)
+            _reaper.start()
+    return pool
+
+
+def shutdown_pools():
+    """Stop all idle replicas (releases their memory)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.reap(0)
+
+
+def _transcribe_chunk(pool: WorkerPool, chunk: dict, audio, language: Optional[str],
+                      beam_size: int, cancel: Optional[CancelToken]) -> tuple:
+    segments, language = pool.transcribe(audio, language, beam_size, cancel)
+    return chunk, segments, language
+
+
+def transcribe_parallel(audio, model: str = 'large-v3', workers: int = 2,
+                        compute_type: str = 'int8', chunk_seconds: float = 300,
+                        overlap_seconds: float = 1.0, language: Optional[str] = None,
+                        beam_size: int = 5,
+                        on_segment: Optional[Callable[[dict], None]] = None,
+                        on_progress: Optional[Callable[[float], None]] = None,
+                        cancel: Optional[CancelToken] = None,
+                        model_pool: Optional[ModelPool] = None) -> dict:
+    """
+    Transcribe a long recording by decoding chunks concurrently.
+
+    Args:
+        audio: float32 mono samples at 16 kHz
+        model: faster-whisper model name
+        workers: Number of worker processes (model replicas)
+        compute_type: CTranslate2 compute type for the replicas
+        chunk_seconds: Target chunk length
+        overlap_seconds: Audio shared across each cut, for de-duplication
+        language: Force a language (otherwise detected per chunk)
+        beam_size: Beam size for decoding
+        on_segment: Called with each stitched segment, in timeline order
+        on_progress: Called with the fraction of audio transcribed so far
+        cancel: On cancellation, replicas decoding this job's chunks are
+            killed and chunks that have not started are dropped. After any
+            other error, chunks already decoding finish and are discarded.
+        model_pool: Pool whose RAM budget the replicas are counted against
+
+    Returns:
+        dict with 'text', 'segments', 'language', 'chunks'
+
+    Raises:
+        JobCancelled: If the token was cancelled
+    """
+    from collections import Counter
+
+    chunks = plan_chunks(audio, SAMPLE_RATE, chunk_seconds, overlap_seconds)
+    pool = get_worker_pool(model, compute_type, workers, model_pool)
+    total = len(audio) / SAMPLE_RATE
+
+    # One thread per replica feeds chunks to the worker processes
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = [
+        executor.submit(_transcribe_chunk, pool, chunk, audio[chunk['start']:chunk['end']],
+                        language, beam_size, cancel)
+        for chunk in chunks
+    ]
+
+    done = {}
+    languages = Counter()
+    emitted = 0  # chunks whose segments have been handed to on_segment
+    transcribed = 0.0
+    stitched = []
+
+    pending = set(futures)
+    try:
+        while pending:
+            finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            if cancel is not None:
+                cancel.check()
+
+            for future in finished:
+                chunk, segments, chunk_language = future.result()
+                done[chunk['index']] = (chunk, segments)
+                languages[chunk_language] += 1
+                transcribed += chunk['own_end'] - chunk['own_start']
+                if on_progress:
+                    on_progress(min(1.0, transcribed / total) if total else 1.0)
+
+            # Emit segments strictly in order, as soon as a contiguous prefix is done
+            while emitted in done:
+                for seg in stitch_segments([done[emitted]]):
+                    if stitched and _normalize(stitched[-1]['text']) == _normalize(seg['text']) \
+                            and seg['start'] - stitched[-1]['end'] < 2.0:
+                        continue
+                    stitched.append(seg)
+                    if on_segment:
+                        on_segment(seg)
+                emitted += 1
+    finally:
+        # Don't leave this job's remaining chunks queued behind other jobs
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {
+        'text': ' '.join(s['text'].strip() for s in stitched),
+        'segments': stitched,
+        'language': languages.most_common(1)[0][0] if languages else 'en',
+        'chunks': len(chunks),
+    }
+
+
+def benchmark(file_path: str, model: str = 'small', workers: int = 4,
+              compute_type: str = 'int8', chunk_seconds: float = 300) -> dict:
+    """
+    Compare wall-clock time of the single-call path against parallel chunks.
+
+    Returns:
+        dict with timings, speedup and how closely the two transcripts agree
+    """
+    from difflib import SequenceMatcher
+    from faster_whisper import WhisperModel
+    from preprocess import decode_audio
+
+    audio, stats = decode_audio(file_path, remove_silence_enabled=False)
+    duration = stats['final_duration']
+    print(f"Audio: {duration/60:.1f} min, model: {model} ({compute_type}), workers: {workers}")
+
+    # Baseline: one model using every core, one sequential transcribe call
+    single = WhisperModel(model, device='cpu', compute_type=compute_type, cpu_threads=os.cpu_count() or 4)
+    start = time.time()
+    segments, _ = single.transcribe(audio, beam_size=5)
+    single_text = ' '.join(s.text.strip() for s in segments)
+    single_time = time.time() - start
+    del single
+    print(f"  Single call:  {single_time:.1f}s ({duration/single_time:.1f}x real-time)")
+
+    # Warm the worker pool so model load time isn't counted against the parallel path
+    warmup = audio[:SAMPLE_RATE * 5]
+    transcribe_parallel(warmup, model, workers, compute_type, chunk_seconds)
+
+    start = time.time()
+    result = transcribe_parallel(audio, model, workers, compute_type, chunk_seconds)
+    parallel_time = time.time() - start
+    print(f"  Parallel ({result['chunks']} chunks): {parallel_time:.1f}s ({duration/parallel_time:.1f}x real-time)")
+
+    similarity = SequenceMatcher(None, _normalize(single_text).split(), _normalize(result['text']).split()).ratio()
+    speedup = single_time / parallel_time if parallel_time else 0
+    print(f"  Speedup: {speedup:.2f}x, transcript agreement: {similarity:.1%}")
+
+    shutdown_pools()
+    return {
+        'duration_seconds': duration,
+        'single_seconds': single_time,
+        'parallel_seconds': parallel_time,
+        'chunks': result['chunks'],
+        'speedup': speedup,
+        'agreement': similarity,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parallel chunked transcription (CPU)")
+    parser.add_argument("file", help="Audio file to transcribe")
+    parser.add_argument("--model", default="small", help="faster-whisper model (default: small)")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel model replicas (default: 4)")
+    parser.add_argument("--compute-type", default="int8", help="CTranslate2 compute type (default: int8)")
+    parser.add_argument("--chunk-seconds", type=float, default=300, help="Target chunk length (default: 300)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare against the single-call path and report the speedup")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"Error: File not found: {args.file}")
+        sys.exit(1)
+
+    if args.benchmark:
+        benchmark(args.file, args.model, args.workers, args.compute_type, args.chunk_seconds)
+    else:
+        from preprocess import decode_audio
+        audio, _ = decode_audio(args.file)
+        start = time.time()
+        result = transcribe_parallel(
+            audio, args.model, args.workers, args.compute_type, args.chunk_seconds,
+            on_segment=lambda s: print(f"[{s['start']:7.1f} -> {s['end']:7.1f}] {s['text'].strip()}")
+        )
+        shutdown_pools()
+        print(f"\n{result['chunks']} chunks in {time.time() - start:.1f}s")
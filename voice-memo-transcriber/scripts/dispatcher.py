@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Work-stealing dispatch of a batch of recordings across several servers.
+Files are split between backends in proportion to their measured
+throughput, a backend that runs out of work takes queued files from the
+one furthest behind, and a file whose server drops out mid-job is retried
+on another.
+"""
+
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable
+
+# Weight of the newest file in a backend's throughput estimate
+RATE_SMOOTHING = 0.5
+
+
+class BackendUnavailable(RuntimeError):
+    """The server could not be reached or lost the job; the file can be sent elsewhere."""
+
+
+class WorkItem:
+    """One recording of the batch."""
+
+    def __init__(self, path, duration: float):
+        self.path = Path(path)
+        self.duration = max(duration, 1.0)  # unknown durations still cost something
+        self.tried = set()  # backends that dropped out while holding it
+
+
+class DispatchBackend:
+    """A server taking part in a batch, with its own queue of files."""
+
+    def __init__(self, name: str, config: dict, rate: float, workers: int = 1, delay: float = 0.0):
+        """
+        Args:
+            name: Backend key in config.json
+            config: Backend config (url, name, ...)
+            rate: Expected seconds of audio transcribed per second, per worker
+            workers: Jobs the server runs at once
+            delay: Seconds of other work already queued on the server
+        """
+        self.name = name
+        self.config = config
+        self.label = config.get('name', name)
+        self.rate = rate
+        self.workers = max(1, workers)
+        self.delay = delay
+        self.queue = deque()
+        self.healthy = True
+        self.completed = 0
+        self.audio_seconds = 0.0
+        self.stolen = 0
+
+    @property
+    def capacity(self) -> float:
+        """Seconds of audio per second with every worker busy."""
+        return self.rate * self.workers
+
+    def backlog_seconds(self) -> float:
+        """Expected time to get through the files queued here."""
+        return sum(item.duration for item in self.queue) / self.capacity
+
+
+class BatchDispatcher:
+    """
+    Runs a batch on several backends at once.
+
+    Each backend gets as many worker threads as jobs its server runs in
+    parallel. transcribe(path, backend_config) does one file end to end and
+    raises BackendUnavailable when the server cannot be reached; any other
+    exception fails just that file.
+    """
+
+    def __init__(self, backends: list, transcribe: Callable[[Path, dict], dict],
+                 log: Callable[[str], None] = print):
+        self.backends = backends
+        self.transcribe = transcribe
+        self.log = log
+        self.results = {}  # path -> result dict or exception
+        self._cond = threading.Condition()
+        self._in_flight = 0
+
+    def run(self, files: list) -> dict:
+        """
+        Transcribe (path, duration) pairs.
+
+        Returns:
+            Dict of path -> result dict, or the exception that failed the file
+        """
+        # Longest first: big files start early, small ones fill the gaps and get stolen
+        for item in sorted((WorkItem(p, d) for p, d in files), key=lambda i: -i.duration):
+            self._assign(item)
+        for backend in self.backends:
+            if backend.queue:
+                minutes = sum(i.duration for i in backend.queue) / 60
+                self.log(f"  {backend.label}: {len(backend.queue)} files, {minutes:.1f} min of audio")
+
+        threads = [threading.Thread(target=self._worker, args=(backend,), daemon=True)
+                   for backend in self.backends for _ in range(backend.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.results
+
+    def _assign(self, item: WorkItem, error: Exception = None):
+        """Queue a file on the healthy backend expected to finish it first. Caller holds the lock (or is single-threaded)."""
+        candidates = [b for b in self.backends if b.healthy and b.name not in item.tried]
+        if not candidates:
+            self.results[item.path] = error or BackendUnavailable("No backend available")
+            return
+        best = min(candidates, key=lambda b: b.delay + b.backlog_seconds() + item.duration / b.capacity)
+        best.queue.append(item)
+
+    def _next(self, backend: DispatchBackend):
+        """Next file for a worker of backend: its own queue first, otherwise stolen. Caller holds the lock."""
+        if not backend.healthy:
+            return None
+        if backend.queue:
+            return backend.queue.popleft()
+
+        # Steal the smallest queued file from the backend furthest behind, if
+        # this one would finish it before that backend could even start it
+        victims = [v for v in self.backends
+                   if v is not backend and v.queue and backend.name not in v.queue[-1].tried
+                   and v.queue[-1].duration / backend.rate < v.delay + v.backlog_seconds()]
+        if not victims:
+            return None
+        victim = max(victims, key=lambda v: v.delay + v.backlog_seconds())
+        item = victim.queue.pop()
+        backend.stolen += 1
+        self.log(f"  {backend.label} took {item.path.name} from {victim.label}")
+        return item
+
+    def _work_remaining(self) -> bool:
+        return self._in_flight > 0 or any(b.queue for b in self.backends if b.healthy)
+
+    def _worker(self, backend: DispatchBackend):
+        while True:
+            with self._cond:
+                item = self._next(backend)
+                # Stay around while work is left anywhere: a dropped backend's files may come this way
+                while item is None and backend.healthy and self._work_remaining():
+                    self._cond.wait()
+                    item = self._next(backend)
+                if item is None:
+                    return
+                self._in_flight += 1
+
+            started = time.time()
+            try:
+                result = self.transcribe(item.path, backend.config)
+            except BackendUnavailable as e:
+                with self._cond:
+                    self._in_flight -= 1
+                    item.tried.add(backend.name)
+                    orphans = [item]
+                    if backend.healthy:
+                        backend.healthy = False
+                        orphans += list(backend.queue)
+                        backend.queue.clear()
+                        self.log(f"  {backend.label} dropped out ({e}); moving {len(orphans)} files")
+                    for orphan in orphans:
+                        self._assign(orphan, e)
+                    self._cond.notify_all()
+                return
+            except Exception as e:
+                with self._cond:
+                    self._in_flight -= 1
+                    self.results[item.path] = e
+                    self._cond.notify_all()
+                self.log(f"  {item.path.name} failed on {backend.label}: {e}")
+                continue
+
+            elapsed = max(time.time() - started, 1e-3)
+            with self._cond:
+                self._in_flight -= 1
+                backend.rate += RATE_SMOOTHING * (item.duration / elapsed - backend.rate)
+                backend.delay = 0.0
+                backend.completed += 1
+                backend.audio_seconds += item.duration
+                self.results[item.path] = result
+                self._cond.notify_all()
+            self.log(f"  {item.path.name} done on {backend.label} in {elapsed:.0f}s "
+                     f"({item.duration / elapsed:.1f}x real-time)")
+
+    def summary(self) -> list:
+        """Per-backend share of the batch."""
+        return [{
+            'backend': b.name,
+            'files': b.completed,
+            'audio_minutes': round(b.audio_seconds / 60, 1),
+            'stolen': b.stolen,
+            'rate': round(b.rate, 2),
+            'healthy': b.healthy,
+        } for b in self.backends]
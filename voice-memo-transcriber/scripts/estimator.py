@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Self-calibrating transcription-time estimator.
+Every completed job records how long it took; estimates come from a small
+linear model fitted per (host, method, model, device, compute_type) on the
+speech and removed-silence seconds of each recording, leaning on
+built-in defaults until enough history exists.
+"""
+
+import platform
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "estimator.db"
+
+# Default real-time factors used before any history exists
+# (processing seconds per second of audio)
+MLX_MODEL_RTF = {
+    'tiny': 0.02,
+    'base': 0.04,
+    'small': 0.08,
+    'medium': 0.15,
+    'large-v3': 0.1,
+    'large-v3-turbo': 0.07,
+}
+DEVICE_RTF = {
+    'mlx': 0.1,
+    'cuda': 0.05,
+    'cpu': 0.3,
+}
+OPENAI_OVERHEAD_SECONDS = 30.0   # upload and queueing
+OPENAI_RTF = 2 / 60              # ~2 s per minute of audio
+LOCAL_OVERHEAD_SECONDS = 1.0
+
+# Share of a recording assumed to be silence before any has been measured
+DEFAULT_SILENCE_RATIO = 0.2
+
+# The defaults count as one average job until a full fit is possible
+PRIOR_WEIGHT = 1.0
+
+# Jobs needed before overhead and silence cost are fitted too
+MIN_FIT_SAMPLES = 10
+
+# Most recent observations kept per key
+MAX_OBSERVATIONS = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    host TEXT NOT NULL,
+    method TEXT NOT NULL,
+    model TEXT NOT NULL,
+    device TEXT NOT NULL,
+    compute_type TEXT NOT NULL,
+    duration REAL NOT NULL,
+    silence_ratio REAL NOT NULL,
+    seconds REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_key
+    ON observations (host, method, model, device, compute_type, recorded_at DESC);
+"""
+
+
+def local_host() -> str:
+    """Name this machine's observations are recorded under."""
+    return platform.node() or 'localhost'
+
+
+def prior_coefficients(method: str, model: str, device: str) -> tuple:
+    """
+    Default (overhead, seconds per speech second, seconds per removed-silence second).
+    Removed silence still costs a little: it is decoded and scanned, not transcribed.
+    """
+    if method == 'openai':
+        return OPENAI_OVERHEAD_SECONDS, OPENAI_RTF, 0.0
+    if method == 'mlx' or device == 'mlx':
+        rtf = MLX_MODEL_RTF.get(model, DEVICE_RTF['mlx'])
+    else:
+        rtf = DEVICE_RTF.get(device, DEVICE_RTF['cpu'])
+    return LOCAL_OVERHEAD_SECONDS, rtf, 0.01
+
+
+def _features(duration: float, silence_ratio: float) -> tuple:
+    silence_ratio = min(1.0, max(0.0, silence_ratio))
+    return 1.0, duration * (1 - silence_ratio), duration * silence_ratio
+
+
+def _solve(matrix: list, vector: list) -> Optional[list]:
+    """Gaussian elimination with partial pivoting for a small dense system."""
+    n = len(vector)
+    a = [row[:] + [vector[i]] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        if abs(a[pivot][col]) < 1e-12:
+            return None
+        a[col], a[pivot] = a[pivot], a[col]
+        for r in range(col + 1, n):
+            f = a[r][col] / a[col][col]
+            for c in range(col, n + 1):
+                a[r][c] -= f * a[col][c]
+    x = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        x[r] = (a[r][n] - sum(a[r][c] * x[c] for c in range(r + 1, n))) / a[r][r]
+    return x
+
+
+def fit(observations: list, prior: tuple) -> tuple:
+    """
+    Fit (overhead, speech RTF, silence RTF) to past jobs.
+
+    With little history only the speech RTF is learned: a ratio estimate in
+    which the default counts as PRIOR_WEIGHT average jobs, so one odd run
+    can't swing it. From MIN_FIT_SAMPLES on, a least-squares fit of all
+    three terms is used when it comes out physically sensible (no negative
+    costs).
+
+    Args:
+        observations: List of (duration, silence_ratio, seconds)
+        prior: Default coefficients
+
+    Returns:
+        Fitted coefficients
+    """
+    if not observations:
+        return prior
+
+    rows = [(_features(d, r), s) for d, r, s in observations]
+
+    if len(rows) >= MIN_FIT_SAMPLES:
+        n = len(prior)
+        xtx = [[sum(x[i] * x[j] for x, _ in rows) for j in range(n)] for i in range(n)]
+        xty = [sum(x[i] * y for x, y in rows) for i in range(n)]
+        coefficients = _solve(xtx, xty)
+        if coefficients is not None and min(coefficients) >= 0:
+            return tuple(coefficients)
+
+    overhead, rtf, silence_rtf = prior
+    speech = sum(x[1] for x, _ in rows)
+    mean_speech = speech / len(rows)
+    spent = sum(y - overhead - silence_rtf * x[2] for x, y in rows)
+    weight = PRIOR_WEIGHT * mean_speech
+    if speech + weight <= 0:
+        return prior
+    return overhead, max(0.0, (spent + weight * rtf) / (speech + weight)), silence_rtf
+
+
+class TranscriptionEstimator:
+    """
+    Persistent per-backend timing history and fitted estimates.
+
+    Thread-safe; fits are cached in memory and refreshed when a new
+    observation for the same key arrives.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        """
+        Args:
+            db_path: SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._fits = {}  # key -> (coefficients, samples, mean silence ratio)
+
+    @staticmethod
+    def _key(host: Optional[str], method: str, model: str, device: str, compute_type: str) -> tuple:
+        return (host or local_host(), method, model or '', device or '', compute_type or '')
+
+    def record(self, duration: float, seconds: float, silence_ratio: float = 0.0, *,
+               method: str, model: str, device: str = '', compute_type: str = '',
+               host: Optional[str] = None):
+        """
+        Store how long a finished job took.
+
+        Args:
+            duration: Length of the original recording in seconds
+            seconds: Processing time (preprocessing and transcription)
+            silence_ratio: Share of the recording removed as silence (0 if none)
+        """
+        if duration <= 0 or seconds <= 0:
+            return
+        key = self._key(host, method, model, device, compute_type)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO observations (host, method, model, device, compute_type, duration, "
+                "silence_ratio, seconds, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (duration, silence_ratio, seconds, time.time())
+            )
+            # Keep only the most recent observations for this key
+            self._conn.execute(
+                "DELETE FROM observations WHERE rowid IN (SELECT rowid FROM observations "
+                "WHERE host = ? AND method = ? AND model = ? AND device = ? AND compute_type = ? "
+                "ORDER BY recorded_at DESC LIMIT -1 OFFSET ?)",
+                key + (MAX_OBSERVATIONS,)
+            )
+            self._conn.commit()
+            self._fits.pop(key, None)
+
+    def _fit(self, key: tuple) -> tuple:
+        """Coefficients, sample count and mean silence ratio for a key."""
+        with self._lock:
+            cached = self._fits.get(key)
+            if cached is not None:
+                return cached
+            rows = self._conn.execute(
+                "SELECT duration, silence_ratio, seconds FROM observations "
+                "WHERE host = ? AND method = ? AND model = ? AND device = ? AND compute_type = ? "
+                "ORDER BY recorded_at DESC LIMIT ?",
+                key + (MAX_OBSERVATIONS,)
+            ).fetchall()
+
+        observations = [tuple(r) for r in rows]
+        removed = [r for _, r, _ in observations if r > 0]
+        mean_silence = sum(removed) / len(removed) if removed else DEFAULT_SILENCE_RATIO
+        result = (fit(observations, prior_coefficients(key[1], key[2], key[3])), len(observations), mean_silence)
+        with self._lock:
+            self._fits[key] = result
+        return result
+
+    def estimate(self, duration: float, silence_ratio: Optional[float] = None, *,
+                 method: str, model: str, device: str = '', compute_type: str = '',
+                 host: Optional[str] = None) -> float:
+        """
+        Expected processing seconds for a recording.
+
+        Args:
+            duration: Length of the recording in seconds
+            silence_ratio: Share that will be removed as silence; None uses the
+                average measured for this backend (for when silence removal is
+                on but the recording has not been analysed yet)
+        """
+        coefficients, _, mean_silence = self._fit(self._key(host, method, model, device, compute_type))
+        if silence_ratio is None:
+            silence_ratio = mean_silence
+        return sum(c * x for c, x in zip(coefficients, _features(duration, silence_ratio)))
+
+    def describe(self, *, method: str, model: str, device: str = '', compute_type: str = '',
+                 host: Optional[str] = None) -> dict:
+        """Fitted parameters and sample count for a key."""
+        key = self._key(host, method, model, device, compute_type)
+        (overhead, rtf, silence_rtf), samples, mean_silence = self._fit(key)
+        return {
+            'host': key[0], 'method': key[1], 'model': key[2], 'device': key[3], 'compute_type': key[4],
+            'samples': samples,
+            'overhead_seconds': round(overhead, 2),
+            'rtf': round(rtf, 4),
+            'silence_rtf': round(silence_rtf, 4),
+            'mean_silence_ratio': round(mean_silence, 3),
+        }
+
+    def summary(self) -> list:
+        """Fitted parameters for every key with history."""
+        with self._lock:
+            keys = self._conn.execute(
+                "SELECT DISTINCT host, method, model, device, compute_type FROM observations"
+            ).fetchall()
+        return [self.describe(host=h, method=m, model=mo, device=d, compute_type=c) for h, m, mo, d, c in keys]
+
+
+_default = None
+
+
+def get_estimator() -> TranscriptionEstimator:
+    """Shared estimator on the project's default database."""
+    global _default
+    if _default is None:
+        _default = TranscriptionEstimator()
+    return _default
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Show fitted transcription-time estimates")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="Estimator database")
+    parser.add_argument("--duration", type=float, help="Also estimate a recording of this many minutes")
+    args = parser.parse_args()
+
+    estimator = TranscriptionEstimator(args.db)
+    for entry in estimator.summary():
+        line = json.dumps(entry)
+        if args.duration:
+            seconds = estimator.estimate(
+                args.duration * 60, method=entry['method'], model=entry['model'],
+                device=entry['device'], compute_type=entry['compute_type'], host=entry['host'])
+            line += f"  -> {seconds/60:.1f} min for {args.duration:g} min"
+        print(line)
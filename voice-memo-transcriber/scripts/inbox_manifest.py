@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Local manifest of inbox files.
+SQLite remembers each file's hash and duration keyed by (path, inode, size,
+mtime), so an unchanged file is never re-read or re-probed, and keeps the
+last known Supabase status of every file, refreshed with one bulk query.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "inbox_manifest.db"
+
+# Files hashed and probed at once when the inbox has changed
+SCAN_WORKERS = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    file_hash TEXT NOT NULL,
+    duration REAL NOT NULL,
+    remote_status TEXT,
+    memo_id TEXT,
+    remote_checked_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_files_hash ON files (file_hash);
+"""
+
+
+class InboxManifest:
+    """
+    Thread-safe SQLite manifest, one row per file path.
+    A row is trusted only while the file's inode, size and mtime still match;
+    anything else (a replaced or edited file) is hashed and probed again.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        """
+        Args:
+            db_path: SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def scan(self, paths: Iterable[Path], hash_file: Callable[[str], str],
+             probe_duration: Callable[[str], float], workers: int = SCAN_WORKERS,
+             prune: bool = True) -> list:
+        """
+        Describe files, hashing and probing only those not already known.
+
+        With prune, rows for paths not passed in (files that left the inbox)
+        are removed.
+
+        Args:
+            paths: Files currently in the inbox
+            hash_file: Returns a file's SHA-256
+            probe_duration: Returns a file's duration in seconds
+            workers: Changed files processed at once
+            prune: Whether paths is the whole inbox
+
+        Returns:
+            One dict per path, in order: path, filename, hash, duration,
+            size, remote_status, memo_id
+        """
+        paths = [Path(p) for p in paths]
+        with self._lock:
+            rows = {row['path']: row for row in self._conn.execute("SELECT * FROM files")}
+
+        entries, stale = [], []
+        for path in paths:
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # gone since it was listed
+            row = rows.get(str(path))
+            if row and (row['inode'], row['size'], row['mtime_ns']) == (st.st_ino, st.st_size, st.st_mtime_ns):
+                entries.append(self._entry(path, row))
+            else:
+                entries.append(None)
+                stale.append((len(entries) - 1, path, st))
+
+        if stale:
+            def describe(item):
+                index, path, st = item
+                return index, path, st, hash_file(str(path)), probe_duration(str(path))
+
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(stale)))) as executor:
+                described = list(executor.map(describe, stale))
+            with self._lock:
+                for index, path, st, file_hash, duration in described:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO files (path, inode, size, mtime_ns, file_hash, duration)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (str(path), st.st_ino, st.st_size, st.st_mtime_ns, file_hash, duration))
+                    entries[index] = {'path': path, 'filename': path.name, 'hash': file_hash,
+                                      'duration': duration, 'size': st.st_size,
+                                      'remote_status': None, 'memo_id': None}
+                self._conn.commit()
+
+        current = {str(p) for p in paths}
+        gone = [path for path in rows if path not in current] if prune else []
+        if gone:
+            with self._lock:
+                self._conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in gone])
+                self._conn.commit()
+
+        return [e for e in entries if e is not None]
+
+    def refresh_remote(self, entries: list, fetch: Callable[[list], dict]) -> list:
+        """
+        Update the remote status of entries with one bulk lookup.
+
+        Args:
+            entries: Dicts returned by scan()
+            fetch: Takes a list of hashes and returns hash -> memo record
+                for those that exist remotely
+
+        Returns:
+            The same entries, each with 'existing' (memo or None),
+            'remote_status' and 'memo_id' filled in
+        """
+        hashes = sorted({e['hash'] for e in entries})
+        memos = fetch(hashes) if hashes else {}
+        now = time.time()
+        for entry in entries:
+            memo = memos.get(entry['hash'])
+            entry['existing'] = memo
+            entry['remote_status'] = memo.get('status') if memo else None
+            entry['memo_id'] = memo.get('id') if memo else None
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE files SET remote_status = ?, memo_id = ?, remote_checked_at = ? WHERE file_hash = ?",
+                [(e['remote_status'], e['memo_id'], now, e['hash']) for e in entries])
+            self._conn.commit()
+        return entries
+
+    def forget(self, path: Path):
+        """Drop a file's row, e.g. once it has been moved out of the inbox."""
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (str(path),))
+            self._conn.commit()
+
+    @staticmethod
+    def _entry(path: Path, row: sqlite3.Row) -> dict:
+        return {'path': path, 'filename': path.name, 'hash': row['file_hash'],
+                'duration': row['duration'], 'size': row['size'],
+                'remote_status': row['remote_status'], 'memo_id': row['memo_id']}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_manifest() -> InboxManifest:
+    """Shared manifest on the project's default database."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = InboxManifest(Path(os.getenv('INBOX_MANIFEST_PATH', DEFAULT_DB_PATH)))
+        return _default
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Watching the inbox for new recordings.
+On Linux the kernel's inotify API (through ctypes, no extra package) wakes
+the watcher as soon as a file is written or moved in; elsewhere the folder
+is polled. Either way a file is only handed over once its size and mtime
+have stopped changing, so half-synced recordings are never picked up.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Optional
+
+STABLE_SECONDS = 2.0    # a file must stay unchanged this long before it is ready
+POLL_INTERVAL = 2.0     # seconds between scans when inotify is unavailable
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class PollingWatcher:
+    """Reports files whose size or mtime changed since the previous scan."""
+
+    name = 'polling'
+
+    def __init__(self, directory: Path, interval: float = POLL_INTERVAL):
+        self.directory = Path(directory)
+        self.interval = interval
+        self._seen = {}  # name -> (size, mtime_ns), only for files currently present
+
+    def wait(self, timeout: float) -> Optional[set]:
+        """
+        Sleep for timeout seconds or one poll interval, whichever is shorter, then scan.
+
+        Returns:
+            Names of new or changed files
+        """
+        time.sleep(max(0.0, min(timeout, self.interval)))
+        current = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        st = entry.stat()
+                        current[entry.name] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            return set()
+        changed = {name for name, sig in current.items() if self._seen.get(name) != sig}
+        self._seen = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Reports files written, created or moved into the directory.
+    wait() returns None when the kernel queue overflowed and events were
+    lost, telling the caller to rescan the folder.
+    """
+
+    name = 'inotify'
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(str(self.directory)), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {self.directory}")
+
+    def wait(self, timeout: float) -> Optional[set]:
+        """
+        Block until events arrive or timeout seconds pass.
+
+        Returns:
+            Names of files that changed, or None if events were lost
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        names, overflow = set(), False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif name and not mask & IN_IGNORED:
+                    names.add(os.fsdecode(name))
+        return None if overflow else names
+
+    def close(self):
+        os.close(self._fd)
+
+
+def open_watcher(directory: Path, poll_interval: float = POLL_INTERVAL):
+    """An inotify watcher where the platform supports it, otherwise a polling one."""
+    try:
+        return InotifyWatcher(directory)
+    except (OSError, AttributeError, TypeError):
+        return PollingWatcher(directory, poll_interval)
+
+
+class StabilityTracker:
+    """
+    Candidate files waiting for their size and mtime to settle.
+    Only files still in the inbox are tracked, so memory stays proportional
+    to the number of files being synced at once.
+    """
+
+    def __init__(self, stable_seconds: float = STABLE_SECONDS):
+        self.stable_seconds = stable_seconds
+        self._pending = {}  # path -> ((size, mtime_ns), time the signature was first seen)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def observe(self, path: Path):
+        """Note that a file was created or changed."""
+        self._pending.setdefault(Path(path), (None, 0.0))
+
+    def ready(self) -> list:
+        """Re-check candidates; return (and stop tracking) the ones that have settled."""
+        now = time.monotonic()
+        settled = []
+        for path, (signature, since) in list(self._pending.items()):
+            try:
+                st = path.stat()
+            except OSError:
+                del self._pending[path]  # deleted or moved away
+                continue
+            current = (st.st_size, st.st_mtime_ns)
+            if current != signature:
+                self._pending[path] = (current, now)
+            elif st.st_size > 0 and now - since >= self.stable_seconds:
+                del self._pending[path]
+                settled.append(path)
+        return settled
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Publish/subscribe hub for job progress events.
+Writers publish small delta events; SSE subscribers block on a per-job
+condition variable instead of polling, and can resume from Last-Event-ID.
+Long-poll requests covering many jobs wait on a hub-wide condition.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class JobChannel:
+    """Event log and wake-up condition for a single job."""
+
+    def __init__(self, maxlen: int):
+        self.cond = threading.Condition()
+        self.events = deque(maxlen=maxlen)  # (event_id, event_type, data)
+        self.last_id = 0
+        self.closed = False
+
+
+class JobEventHub:
+    """
+    Per-job event streams with bounded replay buffers.
+
+    Event ids increase monotonically per job, so a reconnecting client can
+    send the last id it saw and receive only what it missed.
+    """
+
+    def __init__(self, history: int = 1000):
+        """
+        Args:
+            history: Events retained per job for Last-Event-ID replay
+        """
+        self.history = history
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._any = threading.Condition()  # notified on every publish, for wait_any
+
+    def _channel(self, job_id: str) -> JobChannel:
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel is None:
+                channel = self._channels[job_id] = JobChannel(self.history)
+            return channel
+
+    def publish(self, job_id: str, event_type: str, data: dict, final: bool = False) -> int:
+        """
+        Append an event and wake all subscribers of the job.
+
+        Args:
+            job_id: Job the event belongs to
+            event_type: SSE event name (update, segment, ...)
+            data: JSON-serializable payload
+            final: Mark the stream as finished after this event
+
+        Returns:
+            The event id
+        """
+        channel = self._channel(job_id)
+        with channel.cond:
+            channel.last_id += 1
+            channel.events.append((channel.last_id, event_type, data))
+            if final:
+                channel.closed = True
+            channel.cond.notify_all()
+            event_id = channel.last_id
+        with self._any:
+            self._any.notify_all()
+        return event_id
+
+    def _existing(self, job_id: str) -> Optional[JobChannel]:
+        with self._lock:
+            return self._channels.get(job_id)
+
+    def last_event_id(self, job_id: str) -> int:
+        """Id of the most recent event for a job (0 if none)."""
+        channel = self._existing(job_id)
+        return channel.last_id if channel else 0
+
+    def wait_any(self, cursors: dict, timeout: float) -> list:
+        """
+        Block until any of several jobs has events newer than its cursor,
+        or had its channel discarded since.
+
+        Args:
+            cursors: job_id -> last event id the caller has seen
+            timeout: Seconds to wait at most
+
+        Returns:
+            Ids of the jobs that changed (empty on timeout)
+        """
+        deadline = time.monotonic() + timeout
+        with self._any:
+            while True:
+                changed = [job_id for job_id, seen in cursors.items() if self.last_event_id(job_id) != seen]
+                remaining = deadline - time.monotonic()
+                if changed or remaining <= 0:
+                    return changed
+                self._any.wait(remaining)
+
+    def wait(self, job_id: str, after_id: int, timeout: float) -> Optional[list]:
+        """
+        Block until events newer than after_id exist, or timeout elapses.
+
+        Returns:
+            List of (event_id, event_type, data) newer than after_id (possibly
+            empty on timeout), or None if after_id fell out of the replay buffer
+            and the caller must resynchronize from a snapshot.
+        """
+        deadline = time.monotonic() + timeout
+        channel = self._existing(job_id)
+        if channel is None:
+            # Nothing published yet (or already discarded): wait for a first
+            # event without creating a channel for an id that may never get one
+            with self._any:
+                while channel is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return []
+                    self._any.wait(remaining)
+                    channel = self._existing(job_id)
+
+        with channel.cond:
+            if channel.last_id <= after_id and not channel.closed:
+                channel.cond.wait(max(0.0, deadline - time.monotonic()))
+            if channel.last_id <= after_id:
+                return []
+            oldest = channel.events[0][0] if channel.events else channel.last_id + 1
+            if after_id + 1 < oldest:
+                return None
+            return [e for e in channel.events if e[0] > after_id]
+
+    def is_closed(self, job_id: str) -> bool:
+        """Whether the job's stream has published its final event (or was discarded)."""
+        channel = self._existing(job_id)
+        return channel is None or channel.closed
+
+    def discard(self, job_id: str):
+        """Drop a job's channel, waking any subscribers so they can exit."""
+        with self._lock:
+            channel = self._channels.pop(job_id, None)
+        if channel is not None:
+            with channel.cond:
+                channel.closed = True
+                channel.cond.notify_all()
+            with self._any:
+                self._any.notify_all()
+
+    def channel_count(self) -> int:
+        """Number of job channels currently tracked."""
+        with self._lock:
+            return len(self._channels)
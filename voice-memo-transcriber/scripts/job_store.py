@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Durable job store for the transcription server.
+SQLite (WAL mode) holds job metadata, results and decoded segments so jobs
+survive restarts, old results can be expired, and listings use indexes.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+TERMINAL_STATUSES = ('completed', 'error', 'cancelled')
+ACTIVE_STATUSES = ('queued', 'preprocessing', 'transcribing')
+
+# Job fields kept in their own columns; everything else goes in the data blob
+COLUMNS = ('filename', 'status', 'backend', 'priority', 'file_hash', 'created_at', 'updated_at')
+
+# Large or derived fields that are never written into the data blob
+EXCLUDED_FIELDS = {'segments', 'segment', 'partial_transcript'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT,
+    status TEXT NOT NULL,
+    backend TEXT,
+    priority INTEGER DEFAULT 0,
+    file_hash TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL,
+    file_path TEXT,
+    options TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_file_hash ON jobs (file_hash);
+
+CREATE TABLE IF NOT EXISTS job_segments (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    start REAL,
+    end REAL,
+    text TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+class JobStore:
+    """
+    Thread-safe SQLite-backed job store.
+    A single connection is shared behind a lock; WAL lets readers proceed
+    while a writer commits.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def _split(job: dict) -> tuple[dict, str]:
+        """Split a job dict into column values and the JSON data blob."""
+        data = {k: v for k, v in job.items() if k not in EXCLUDED_FIELDS}
+        return {c: job.get(c) for c in COLUMNS}, json.dumps(data)
+
+    def create(self, job: dict, file_path: Optional[str] = None, options: Optional[dict] = None):
+        """Insert a new job along with what is needed to re-run it."""
+        cols, data = self._split(job)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, filename, status, backend, priority, file_hash, "
+                "created_at, updated_at, file_path, options, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job['id'], cols['filename'], cols['status'], cols['backend'], cols['priority'] or 0,
+                 cols['file_hash'], cols['created_at'], cols['updated_at'], file_path,
+                 json.dumps(options) if options is not None else None, data)
+            )
+            self._conn.commit()
+
+    def update(self, job: dict):
+        """Persist the current state of a job."""
+        cols, data = self._split(job)
+        finished_at = job.get('updated_at') if job.get('status') in TERMINAL_STATUSES else None
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET filename = ?, status = ?, backend = ?, priority = ?, file_hash = ?, "
+                "updated_at = ?, finished_at = ?, data = ? WHERE id = ?",
+                (cols['filename'], cols['status'], cols['backend'], cols['priority'] or 0,
+                 cols['file_hash'], cols['updated_at'], finished_at, data, job['id'])
+            )
+            self._conn.commit()
+
+    def delete(self, job_id: str):
+        """Remove a job and its segments."""
+        with self._lock:
+            self._conn.execute("DELETE FROM job_segments WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._conn.commit()
+
+    def add_segment(self, job_id: str, index: int, segment: dict):
+        """Persist one decoded segment."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_segments (job_id, idx, start, end, text) VALUES (?, ?, ?, ?, ?)",
+                (job_id, index, segment.get('start'), segment.get('end'), segment.get('text'))
+            )
+            self._conn.commit()
+
+    def clear_segments(self, job_id: str):
+        """Forget partial segments (e.g. before re-running a job)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM job_segments WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+    def get_segments(self, job_id: str) -> list:
+        """Decoded segments of a job in order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start, end, text FROM job_segments WHERE job_id = ? ORDER BY idx", (job_id,)
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def get(self, job_id: str, include_segments: bool = True) -> Optional[dict]:
+        """Load a job by id."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = json.loads(row['data'])
+        if include_segments:
+            segments = self.get_segments(job_id)
+            if segments:
+                job['segments'] = segments
+                job['partial_transcript'] = ' '.join(s['text'].strip() for s in segments)
+        return job
+
+    def file_path(self, job_id: str) -> Optional[str]:
+        """Path of the upload a job was created with."""
+        with self._lock:
+            row = self._conn.execute("SELECT file_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row['file_path'] if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50, offset: int = 0) -> tuple[list, int]:
+        """
+        Page through jobs, newest first.
+
+        Returns:
+            Tuple of (jobs on this page, total matching jobs)
+        """
+        where, params = ("WHERE status = ?", [status]) if status else ("", [])
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM jobs {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT data FROM jobs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [json.loads(r['data']) for r in rows], total
+
+    def count_by_status(self) -> dict:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {r['status']: r['n'] for r in rows}
+
+    def unfinished(self) -> list:
+        """
+        Jobs that were queued or running when the process stopped.
+
+        Returns:
+            List of (job, file_path, options) tuples, oldest first
+        """
+        placeholders = ','.join('?' * len(ACTIVE_STATUSES))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data, file_path, options FROM jobs WHERE status IN ({placeholders}) "
+                "ORDER BY created_at", ACTIVE_STATUSES
+            ).fetchall()
+        return [
+            (json.loads(r['data']), r['file_path'], json.loads(r['options']) if r['options'] else {})
+            for r in rows
+        ]
+
+    def evict(self, max_age_seconds: float) -> list:
+        """
+        Delete finished jobs (and their segments) older than max_age_seconds.
+
+        Returns:
+            Ids of the evicted jobs
+        """
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            ids = [r['id'] for r in self._conn.execute(
+                "SELECT id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,)
+            ).fetchall()]
+            if ids:
+                self._conn.executemany("DELETE FROM job_segments WHERE job_id = ?", [(i,) for i in ids])
+                self._conn.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in ids])
+                self._conn.commit()
+        return ids
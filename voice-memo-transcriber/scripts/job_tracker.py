@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Push-style tracking of server jobs for the remote CLI.
+One background thread per server long-polls /jobs/wait for every job this
+process is waiting on, over a single keep-alive connection, so a finished
+job is seen the moment it completes and following many jobs costs one
+request at a time instead of a new connection every couple of seconds.
+"""
+
+import http.client
+import json
+import socket
+import threading
+import time
+import urllib.parse
+from typing import Callable, Optional
+
+from dispatcher import BackendUnavailable
+
+LONG_POLL_SECONDS = 25   # how long the server holds each request
+GRACE_SECONDS = 60       # how long the server may be unreachable before jobs are given up
+RETRY_SECONDS = 2
+
+TERMINAL_STATUSES = ('completed', 'error', 'cancelled')
+
+
+class LongPollUnsupported(RuntimeError):
+    """The server has no /jobs/wait endpoint; the caller should poll instead."""
+
+
+class JobTracker:
+    """
+    Follows jobs on one server.
+
+    Threads call wait(job_id) and block until the job finishes; whichever
+    jobs are being waited on are covered by a single long-poll. Adding a job
+    while a long-poll is in flight reconnects at once so it is included.
+    """
+
+    def __init__(self, backend_url: str, grace_seconds: float = GRACE_SECONDS):
+        parts = urllib.parse.urlsplit(backend_url)
+        self.https = parts.scheme == 'https'
+        self.netloc = parts.netloc
+        self.base_path = parts.path.rstrip('/')
+        self.grace_seconds = grace_seconds
+        self.supported = None  # unknown until the first response
+        self._cond = threading.Condition()
+        self._watched = {}     # job_id -> entry dict
+        self._thread = None
+        self._conn = None
+        self._restart = False
+        self._unreachable_since = None
+
+    def wait(self, job_id: str, on_update: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Block until a job reaches a terminal status.
+
+        Args:
+            job_id: Job to follow
+            on_update: Called (from the tracker thread) with the job's state
+                whenever it changes; progress updates are only fetched for
+                jobs that have one
+
+        Returns:
+            The job's final state
+
+        Raises:
+            LongPollUnsupported: The server predates /jobs/wait
+            BackendUnavailable: The server stayed unreachable for grace_seconds
+            RuntimeError: The server does not know the job
+        """
+        with self._cond:
+            if self.supported is False:
+                raise LongPollUnsupported(self.netloc)
+            entry = self._watched.get(job_id)
+            if entry is None:
+                entry = self._watched[job_id] = {'cursor': None, 'job': None, 'done': False,
+                                                 'error': None, 'callbacks': []}
+                self._interrupt()
+            if on_update:
+                entry['callbacks'].append(on_update)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            while not entry['done']:
+                self._cond.wait()
+            self._watched.pop(job_id, None)
+
+        if entry['error']:
+            raise entry['error']
+        return entry['job']
+
+    def _interrupt(self):
+        """Cut short an in-flight long-poll so the next one covers new jobs. Caller holds the lock."""
+        conn = self._conn
+        if conn is not None and conn.sock is not None:
+            self._restart = True
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _path(self, pending: dict) -> str:
+        params = {'ids': ','.join(pending), 'timeout': LONG_POLL_SECONDS}
+        cursors = [f"{job_id}:{e['cursor']}" for job_id, e in pending.items() if e['cursor'] is not None]
+        if cursors:
+            params['cursor'] = ','.join(cursors)
+        if not any(e['callbacks'] for e in pending.values()):
+            params['terminal'] = 1  # nobody shows progress: only wake for finished jobs
+        return f"{self.base_path}/jobs/wait?{urllib.parse.urlencode(params)}"
+
+    def _request(self, path: str) -> Optional[dict]:
+        """One long-poll on the kept-alive connection; None if the server lacks the endpoint."""
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            with self._cond:
+                self._conn = cls(self.netloc, timeout=LONG_POLL_SECONDS + 15)
+        self._conn.request('GET', path, headers={'Accept': 'application/json'})
+        response = self._conn.getresponse()
+        body = response.read()
+        if response.status == 404:
+            return None
+        if response.status != 200:
+            raise http.client.HTTPException(f"HTTP {response.status}: {body[:200].decode(errors='replace')}")
+        return json.loads(body.decode())
+
+    def _close(self):
+        with self._cond:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+    def _fail(self, pending: dict, error: Exception):
+        """Give up on jobs. Caller holds the lock."""
+        for entry in pending.values():
+            entry['error'] = error
+            entry['done'] = True
+        self._cond.notify_all()
+
+    def _retire(self) -> Optional[http.client.HTTPConnection]:
+        """Detach this thread and its connection so a new one can start. Caller holds the lock."""
+        conn, self._conn = self._conn, None
+        self._thread = None
+        return conn
+
+    def _run(self):
+        while True:
+            with self._cond:
+                pending = {job_id: e for job_id, e in self._watched.items() if not e['done']}
+                if not pending:
+                    conn = self._retire()
+                    break
+                self._restart = False
+                path = self._path(pending)
+
+            try:
+                data = self._request(path)
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                self._close()
+                with self._cond:
+                    if self._restart:
+                        continue  # interrupted to pick up a new job
+                    self._unreachable_since = self._unreachable_since or time.time()
+                    if time.time() - self._unreachable_since > self.grace_seconds:
+                        self._unreachable_since = None
+                        self._fail(pending, BackendUnavailable(f"Lost contact with server: {e}"))
+                        continue
+                time.sleep(RETRY_SECONDS)
+                continue
+
+            callbacks = []
+            with self._cond:
+                self._unreachable_since = None
+                if data is None:
+                    self.supported = False
+                    self._fail(pending, LongPollUnsupported(self.netloc))
+                    conn = self._retire()
+                    break
+                self.supported = True
+                for job_id, job in data.get('jobs', {}).items():
+                    entry = self._watched.get(job_id)
+                    if entry is None or entry['done']:
+                        continue
+                    entry['cursor'] = data.get('cursors', {}).get(job_id)
+                    if job is None:
+                        entry['error'] = RuntimeError(f"Job {job_id} not found on the server")
+                        entry['done'] = True
+                        continue
+                    entry['job'] = job
+                    callbacks += [(callback, job) for callback in entry['callbacks']]
+                    if job.get('status') in TERMINAL_STATUSES:
+                        entry['done'] = True
+
+            for callback, job in callbacks:
+                callback(job)
+            with self._cond:
+                self._cond.notify_all()
+
+        if conn is not None:
+            conn.close()
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def tracker_for(backend_url: str) -> JobTracker:
+    """The shared tracker for a server."""
+    key = backend_url.rstrip('/')
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = JobTracker(key)
+        return tracker
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Minimal Prometheus metrics for the transcription server.
+Counters, histograms and callback gauges rendered in the Prometheus text
+exposition format, with no client library required.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# Seconds, from sub-second probes to hour-long decodes
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Real-time factor: processing seconds per second of audio
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: Optional[dict] = None) -> str:
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class: a named metric with a fixed set of label names."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        super().__init__(name, help_text, labels)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}"
+                    for k, v in sorted(self._values.items())]
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram with sum and count."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = STAGE_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a with-block."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.observe(time.time() - start, **labels)
+
+    def samples(self) -> list:
+        lines = []
+        with self._lock:
+            for key, entry in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, entry):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, {'le': _format_value(bound)})} "
+                                 f"{cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, {'le': '+Inf'})} {entry[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(entry[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {entry[-1]}")
+        return lines
+
+
+class CallbackGauge(Metric):
+    """Gauge (or counter) whose values are read from a callback at scrape time."""
+
+    def __init__(self, name: str, help_text: str, labels: tuple, callback: Callable[[], list],
+                 kind: str = 'gauge'):
+        """
+        Args:
+            callback: Returns a list of (label values dict, value)
+            kind: 'gauge', or 'counter' for totals kept elsewhere
+        """
+        super().__init__(name, help_text, labels)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self) -> list:
+        return [f"{self.name}{_format_labels(self.labels, self._key(labels))} {_format_value(value)}"
+                for labels, value in self.callback() if value is not None]
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together at /metrics."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = STAGE_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def gauge_callback(self, name: str, help_text: str, labels: tuple, callback: Callable[[], list],
+                       kind: str = 'gauge') -> CallbackGauge:
+        return self._register(CallbackGauge(name, help_text, labels, callback, kind))
+
+    def _register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                samples = []
+                lines.append(f"# {metric.name} unavailable: {e}")
+            lines.extend(metric.header())
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
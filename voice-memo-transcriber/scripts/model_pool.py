@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Process-wide registry of loaded Whisper models.
+Keeps hot models resident between jobs and evicts the least-recently-used
+ones when the configured RAM budget would be exceeded.
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+# Approximate resident size (MB) of CTranslate2 Whisper weights at float16.
+# int8 roughly halves this, float32 roughly doubles it.
+MODEL_MEMORY_MB = {
+    'tiny': 80,
+    'base': 150,
+    'small': 490,
+    'medium': 1550,
+    'large-v2': 3100,
+    'large-v3': 3100,
+    'large-v3-turbo': 1650,
+}
+
+COMPUTE_TYPE_FACTORS = {
+    'float32': 2.0,
+    'float16': 1.0,
+    'bfloat16': 1.0,
+    'int8_float32': 0.55,
+    'int8_float16': 0.55,
+    'int8_bfloat16': 0.55,
+    'int8': 0.5,
+}
+
+
+def estimate_model_memory_mb(model: str, compute_type: str) -> float:
+    """Estimate the memory footprint of a model from its size and compute type."""
+    base = MODEL_MEMORY_MB.get(model, MODEL_MEMORY_MB['large-v3'])
+    return base * COMPUTE_TYPE_FACTORS.get(compute_type, 1.0)
+
+
+def get_process_rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB, if it can be measured."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ModelPool:
+    """
+    LRU cache of loaded models keyed by (model, device, compute_type).
+
+    Models are handed out through acquire(), which pins them for the duration
+    of a job so they are never evicted while a transcription is running.
+    """
+
+    def __init__(self, loader: Callable[..., object], budget_mb: float = 8192):
+        """
+        Args:
+            loader: Callable(model, device, compute_type, **kwargs) returning a loaded model
+            budget_mb: Total memory the pool may hold before evicting idle models
+        """
+        self.loader = loader
+        self.budget_mb = budget_mb
+        self._entries = OrderedDict()  # key -> entry dict, least recently used first
+        self._lock = threading.Lock()
+        self._load_locks = {}  # key -> Lock, so concurrent jobs don't load the same model twice
+        self._reserved = {}  # name -> MB held outside the pool (e.g. replicas in worker processes)
+        self.hits = 0
+        self.misses = 0
+
+    def _evict_for(self, needed_mb: float):
+        """Drop idle models (oldest first) until needed_mb fits in the budget. Caller holds _lock."""
+        used = sum(e['memory_mb'] for e in self._entries.values()) + sum(self._reserved.values())
+        for key in list(self._entries):
+            if used + needed_mb <= self.budget_mb:
+                break
+            entry = self._entries[key]
+            if entry['in_use'] > 0:
+                continue
+            del self._entries[key]
+            used -= entry['memory_mb']
+            print(f"  Evicted model {key[0]} ({key[1]}/{key[2]}, {entry['memory_mb']:.0f} MB)")
+
+    def get(self, model: str, device: str, compute_type: str, **load_kwargs):
+        """Return a resident model, loading it (and evicting others) if necessary."""
+        key = (model, device, compute_type)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry['last_used'] = time.time()
+                entry['uses'] += 1
+                self.hits += 1
+                return entry['model']
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry['last_used'] = time.time()
+                    entry['uses'] += 1
+                    self.hits += 1
+                    return entry['model']
+                self.misses += 1
+                estimate = estimate_model_memory_mb(model, compute_type)
+                self._evict_for(estimate)
+
+            gc.collect()
+            rss_before = get_process_rss_mb()
+            start = time.time()
+            loaded = self.loader(model, device, compute_type, **load_kwargs)
+            load_time = time.time() - start
+            rss_after = get_process_rss_mb()
+
+            # RSS only reflects host memory; GPU weights live in VRAM
+            memory_mb = estimate
+            if device == 'cpu' and rss_before is not None and rss_after is not None:
+                measured = rss_after - rss_before
+                if measured > 0:
+                    memory_mb = measured
+
+            with self._lock:
+                self._entries[key] = {
+                    'model': loaded,
+                    'memory_mb': memory_mb,
+                    'loaded_at': time.time(),
+                    'last_used': time.time(),
+                    'load_time': load_time,
+                    'uses': 1,
+                    'in_use': 0,
+                }
+            print(f"  Loaded model {model} ({device}/{compute_type}) in {load_time:.1f}s, ~{memory_mb:.0f} MB")
+            return loaded
+
+    @contextmanager
+    def acquire(self, model: str, device: str, compute_type: str, **load_kwargs):
+        """Context manager that pins a model against eviction while it is in use."""
+        key = (model, device, compute_type)
+        loaded = self.get(model, device, compute_type, **load_kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['in_use'] += 1
+        try:
+            yield loaded
+        finally:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry['in_use'] -= 1
+
+    def reserve(self, name: str, memory_mb: float):
+        """
+        Count memory held outside the pool against the budget, evicting idle
+        models to make room. Replaces any earlier reservation under the same
+        name; a memory_mb of 0 releases it.
+        """
+        with self._lock:
+            self._reserved.pop(name, None)
+            if memory_mb <= 0:
+                return
+            self._evict_for(memory_mb)
+            self._reserved[name] = memory_mb
+        gc.collect()
+
+    def is_loaded(self, model: str, device: str, compute_type: str) -> bool:
+        """Check whether a model is already resident."""
+        with self._lock:
+            return (model, device, compute_type) in self._entries
+
+    def evict(self, model: str, device: str, compute_type: str) -> bool:
+        """Explicitly unload an idle model. Returns False if absent or in use."""
+        key = (model, device, compute_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['in_use'] > 0:
+                return False
+            del self._entries[key]
+        gc.collect()
+        return True
+
+    def stats(self) -> dict:
+        """Snapshot of loaded models and memory usage for status endpoints."""
+        with self._lock:
+            loaded = [
+                {
+                    'model': key[0],
+                    'device': key[1],
+                    'compute_type': key[2],
+                    'memory_mb': round(entry['memory_mb'], 1),
+                    'load_time_seconds': round(entry['load_time'], 2),
+                    'loaded_at': entry['loaded_at'],
+                    'last_used': entry['last_used'],
+                    'uses': entry['uses'],
+                    'in_use': entry['in_use'],
+                }
+                for key, entry in reversed(self._entries.items())
+            ]
+            reserved = [{'name': name, 'memory_mb': round(mb, 1)} for name, mb in self._reserved.items()]
+            total = sum(e['memory_mb'] for e in self._entries.values()) + sum(self._reserved.values())
+
+        return {
+            'loaded': loaded,
+            'reserved': reserved,
+            'memory_used_mb': round(total, 1),
+            'memory_budget_mb': self.budget_mb,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
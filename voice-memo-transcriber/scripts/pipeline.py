@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Staged pipeline with bounded queues between stages.
+Each stage has its own workers, so while one file is being transcribed the
+next is already being preprocessed and the one before is being synced.
+Queues are small, so a fast stage blocks instead of running far ahead of
+a slow one and holding every intermediate file at once.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+_DONE = object()  # end-of-input marker, one per worker
+
+
+class Stage:
+    """
+    One step of a pipeline.
+
+    func takes an item and returns the item to pass on, or None to drop it
+    (e.g. a file that needs no further work). A coroutine function runs on
+    an event loop in a single thread with up to `workers` items in flight.
+    """
+
+    def __init__(self, name: str, func: Callable, workers: int = 1, queue_size: int = 2):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.inbox = queue.Queue(maxsize=max(1, queue_size))
+        self.is_async = asyncio.iscoroutinefunction(func)
+        self.busy = 0.0       # summed seconds workers spent in func
+        self.waiting = 0.0    # summed seconds spent blocked on a full downstream queue
+        self.processed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def _account(self, busy: float, failed: bool = False):
+        with self._lock:
+            self.busy += busy
+            self.processed += 1
+            self.failed += failed
+
+    def _blocked(self, seconds: float):
+        with self._lock:
+            self.waiting += seconds
+
+
+class Pipeline:
+    """
+    Runs items through a list of stages.
+
+    An item whose stage raises skips the remaining stages: the error is
+    stored under item['error'], on_error is called, and the item is
+    returned with the others.
+    """
+
+    def __init__(self, stages: list, on_error: Optional[Callable[[dict, Exception], None]] = None):
+        self.stages = stages
+        self.on_error = on_error
+        self.started = None
+        self.finished = None
+        self._output = []
+        self._output_lock = threading.Lock()
+        self._remaining = {}
+
+    def run(self, items: Iterable[dict]) -> list:
+        """Feed items through every stage and return them once all have finished."""
+        self.started = time.perf_counter()
+        # Workers that must finish before a stage's successor gets end-of-input
+        self._remaining = {i: 1 if stage.is_async else stage.workers for i, stage in enumerate(self.stages)}
+
+        threads = []
+        for index, stage in enumerate(self.stages):
+            if stage.is_async:
+                threads.append(threading.Thread(target=self._async_worker, args=(index,), daemon=True))
+            else:
+                threads += [threading.Thread(target=self._worker, args=(index,), daemon=True)
+                            for _ in range(stage.workers)]
+        for thread in threads:
+            thread.start()
+
+        first = self.stages[0]
+        for item in items:
+            first.inbox.put(item)
+        for _ in range(first.workers):
+            first.inbox.put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        self.finished = time.perf_counter()
+        return self._output
+
+    def _forward(self, index: int, item: dict):
+        """Hand an item to the next stage, or collect it after the last one."""
+        if index + 1 == len(self.stages):
+            with self._output_lock:
+                self._output.append(item)
+            return
+        start = time.perf_counter()
+        self.stages[index + 1].inbox.put(item)
+        self.stages[index]._blocked(time.perf_counter() - start)
+
+    def _fail(self, index: int, item: dict, error: Exception):
+        item['error'] = str(error)
+        item['failed_stage'] = self.stages[index].name
+        if self.on_error:
+            try:
+                self.on_error(item, error)
+            except Exception:
+                pass
+        with self._output_lock:
+            self._output.append(item)
+
+    def _worker_done(self, index: int):
+        """Last worker of a stage to finish passes end-of-input downstream."""
+        with self._output_lock:
+            self._remaining[index] -= 1
+            last = self._remaining[index] == 0
+        if last and index + 1 < len(self.stages):
+            following = self.stages[index + 1]
+            for _ in range(following.workers):
+                following.inbox.put(_DONE)
+
+    def _handle(self, index: int, item: dict, result, error: Optional[Exception], elapsed: float):
+        stage = self.stages[index]
+        stage._account(elapsed, failed=error is not None)
+        if error is not None:
+            self._fail(index, item, error)
+        elif result is not None:
+            self._forward(index, result)
+
+    def _worker(self, index: int):
+        stage = self.stages[index]
+        while True:
+            item = stage.inbox.get()
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            try:
+                result, error = stage.func(item), None
+            except Exception as e:
+                result, error = None, e
+            self._handle(index, item, result, error, time.perf_counter() - start)
+        self._worker_done(index)
+
+    def _async_worker(self, index: int):
+        asyncio.run(self._async_loop(index))
+        self._worker_done(index)
+
+    async def _async_loop(self, index: int):
+        stage = self.stages[index]
+        slots = asyncio.Semaphore(stage.workers)
+        tasks = set()
+
+        async def handle(item):
+            start = time.perf_counter()
+            try:
+                result, error = await stage.func(item), None
+            except Exception as e:
+                result, error = None, e
+            try:
+                # Forwarding may block on a full queue; keep that off the event loop
+                await asyncio.to_thread(self._handle, index, item, result, error, time.perf_counter() - start)
+            finally:
+                slots.release()
+
+        # Upstream sends one end marker per worker slot
+        ends = 0
+        while ends < stage.workers:
+            item = await asyncio.to_thread(stage.inbox.get)
+            if item is _DONE:
+                ends += 1
+                continue
+            await slots.acquire()
+            task = asyncio.create_task(handle(item))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    def report(self, audio_seconds: float = 0.0) -> dict:
+        """
+        Per-stage utilization and end-to-end throughput of the last run.
+
+        Utilization is the share of the stage's worker time spent working;
+        the stage closest to 100% is the bottleneck.
+        """
+        wall = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        stages = []
+        for stage in self.stages:
+            capacity = wall * stage.workers
+            stages.append({
+                'name': stage.name,
+                'workers': stage.workers,
+                'processed': stage.processed,
+                'failed': stage.failed,
+                'busy_seconds': round(stage.busy, 2),
+                'blocked_seconds': round(stage.waiting, 2),
+                'utilization': stage.busy / capacity if capacity > 0 else 0.0,
+            })
+        completed = sum(1 for item in self._output if 'error' not in item)
+        return {
+            'wall_seconds': wall,
+            'items': len(self._output),
+            'completed': completed,
+            'items_per_minute': completed / wall * 60 if wall > 0 else 0.0,
+            'audio_seconds_per_second': audio_seconds / wall if wall > 0 else 0.0,
+            'stages': stages,
+        }
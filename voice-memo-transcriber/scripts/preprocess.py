@@ -5,10 +5,16 @@ Uses FFmpeg for silence removal and compression to speed up transcription.
 """
 
 import subprocess
-import tempfile
 import os
 import sys
+import threading
 from pathlib import Path
+from typing import Optional
+
+from cancellation import CancelToken, run_process
+
+# Whisper models expect 16 kHz mono input
+SAMPLE_RATE = 16000
 
 
 def get_audio_duration(file_path: str) -> float:
@@ -24,98 +30,289 @@ def get_audio_duration(file_path: str) -> float:
         return 0.0
 
 
-def remove_silence(input_path: str, output_path: str,
-                   noise_threshold: str = "-50dB",
-                   min_silence_duration: float = 0.5) -> bool:
+def atempo_filters(speed: float) -> list:
     """
-    Remove silence from audio file.
-
-    Args:
-        input_path: Input audio file path
-        output_path: Output audio file path
-        noise_threshold: Volume threshold for silence detection (default -50dB)
-        min_silence_duration: Minimum duration to consider as silence (default 0.5s)
-
-    Returns:
-        True if successful, False otherwise
+    Build an atempo filter chain for the given speed.
+    A single atempo instance only accepts factors between 0.5 and 2.0.
     """
-    # FFmpeg silenceremove filter
-    # stop_periods=-1 means process entire file
-    # stop_duration is minimum silence duration
-    # stop_threshold is the volume threshold
-    filter_complex = (
+    filters = []
+    remaining_speed = speed
+    while remaining_speed > 2.0:
+        filters.append("atempo=2.0")
+        remaining_speed /= 2.0
+    while remaining_speed < 0.5:
+        filters.append("atempo=0.5")
+        remaining_speed /= 0.5
+    filters.append(f"atempo={remaining_speed}")
+    return filters
+
+
+def silence_filter(noise_threshold: str = "-50dB", min_silence_duration: float = 0.5) -> str:
+    """
+    FFmpeg silenceremove filter.
+    stop_periods=-1 means process entire file, stop_duration is the minimum
+    silence duration and stop_threshold the volume threshold.
+    """
+    return (
         f"silenceremove=stop_periods=-1:stop_duration={min_silence_duration}:"
         f"stop_threshold={noise_threshold}"
     )
 
-    cmd = [
-        'ffmpeg', '-y', '-i', input_path,
-        '-af', filter_complex,
-        '-c:a', 'copy' if output_path.endswith('.m4a') else 'libmp3lame',
-        output_path
-    ]
 
-    try:
-        subprocess.run(cmd, capture_output=True, check=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error removing silence: {e.stderr.decode() if e.stderr else str(e)}")
-        return False
+def build_filter_graph(speed: float = 1.0, remove_silence_enabled: bool = True,
+                       noise_threshold: str = "-50dB",
+                       min_silence_duration: float = 0.5,
+                       sample_rate: int = SAMPLE_RATE) -> str:
+    """
+    Combined FFmpeg filter graph: speed change, silence removal and resampling.
 
+    Args:
+        speed: Playback speed factor (1.0 = unchanged)
+        remove_silence_enabled: Cut silences longer than min_silence_duration
+        noise_threshold: Volume threshold for silence detection
+        min_silence_duration: Minimum duration to consider as silence
+        sample_rate: Output sample rate
 
-def compress_audio(input_path: str, output_path: str,
-                   sample_rate: int = 16000,
-                   bitrate: str = "64k",
-                   mono: bool = True) -> bool:
+    Returns:
+        Filter string for ffmpeg -af
     """
-    Compress audio for faster transcription.
-    Whisper works best with 16kHz mono audio.
+    filters = []
+    if speed != 1.0:
+        filters.extend(atempo_filters(speed))
+    if remove_silence_enabled:
+        filters.append(silence_filter(noise_threshold, min_silence_duration))
+    filters.append(f"aresample={sample_rate}")
+    return ",".join(filters)
+
+
+def decode_audio(input_path: str, speed: float = 1.0,
+                 remove_silence_enabled: bool = True,
+                 sample_rate: int = SAMPLE_RATE,
+                 cancel: Optional[CancelToken] = None):
+    """
+    Decode, speed up, strip silence and resample in a single FFmpeg pass.
+    Raw 32-bit float PCM is streamed over a pipe straight into a NumPy array,
+    so no intermediate files are written and nothing is re-encoded lossily.
 
     Args:
         input_path: Input audio file path
-        output_path: Output audio file path (should be .wav or .mp3)
-        sample_rate: Target sample rate (default 16000 for Whisper)
-        bitrate: Target bitrate for lossy formats
-        mono: Convert to mono (default True)
+        speed: Playback speed factor (1.0 = unchanged)
+        remove_silence_enabled: Whether to remove silence
+        sample_rate: Output sample rate (16000 for Whisper)
+        cancel: Token that kills FFmpeg when the job is cancelled
 
     Returns:
-        True if successful, False otherwise
+        Tuple of (float32 mono samples, stats_dict)
+
+    Raises:
+        RuntimeError: If FFmpeg fails to decode the file
+        JobCancelled: If the token was cancelled mid-decode
     """
+    import numpy as np
+
     cmd = [
-        'ffmpeg', '-y', '-i', input_path,
-        '-ar', str(sample_rate),
-        '-ac', '1' if mono else '2',
+        'ffmpeg', '-nostdin', '-v', 'error', '-i', str(input_path),
+        '-af', build_filter_graph(speed, remove_silence_enabled, sample_rate=sample_rate),
+        '-ac', '1', '-ar', str(sample_rate),
+        '-f', 'f32le', '-acodec', 'pcm_f32le', 'pipe:1'
     ]
 
-    # Add codec based on output format
-    if output_path.endswith('.wav'):
+    result = run_process(cmd, cancel=cancel)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg decode failed: {result.stderr.decode(errors='replace').strip()[-500:]}")
+
+    audio = np.frombuffer(result.stdout, dtype=np.float32)
+    stats = {
+        'final_duration': len(audio) / sample_rate,
+        'sample_rate': sample_rate,
+        'speed_applied': speed,
+        'silence_removed': remove_silence_enabled,
+        'compressed': True,
+    }
+    return audio, stats
+
+
+def encode_audio(audio, output_path: str, sample_rate: int = SAMPLE_RATE, bitrate: str = "64k",
+                 cancel: Optional[CancelToken] = None) -> str:
+    """
+    Encode float32 mono samples to a file, for APIs that need one after the
+    audio was already processed in memory. Format follows the extension.
+
+    Returns:
+        output_path
+
+    Raises:
+        RuntimeError: If FFmpeg fails to encode
+        JobCancelled: If the token was cancelled mid-encode
+    """
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'f32le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0'
+    ]
+    suffix = Path(output_path).suffix.lower()
+    if suffix == '.wav':
         cmd.extend(['-c:a', 'pcm_s16le'])
-    elif output_path.endswith('.mp3'):
+    elif suffix == '.mp3':
         cmd.extend(['-c:a', 'libmp3lame', '-b:a', bitrate])
-    elif output_path.endswith('.m4a'):
+    elif suffix == '.m4a':
         cmd.extend(['-c:a', 'aac', '-b:a', bitrate])
+    cmd.append(str(output_path))
 
-    cmd.append(output_path)
+    result = run_process(cmd, input=audio.tobytes(), cancel=cancel)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg encode failed: {result.stderr.decode(errors='replace').strip()[-500:]}")
+    return str(output_path)
 
-    try:
-        subprocess.run(cmd, capture_output=True, check=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error compressing audio: {e.stderr.decode() if e.stderr else str(e)}")
-        return False
+
+# Codecs for sending recordings over the network: encoder args, container, extension
+TRANSFER_CODECS = {
+    'opus': (['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip'], 'ogg', '.opus'),
+    'flac': (['-c:a', 'flac', '-compression_level', '8'], 'flac', '.flac'),
+}
+
+
+def transcode_command(input_path: str, codec: str = 'opus', output: str = 'pipe:1',
+                      sample_rate: int = SAMPLE_RATE) -> list:
+    """
+    FFmpeg command that re-encodes a recording to 16 kHz mono for transfer.
+
+    The server resamples to this anyway, so nothing the model would hear is
+    lost (with FLAC nothing at all); Opus shrinks a typical memo by an order
+    of magnitude. Bit-exact muxing keeps the output identical between runs,
+    so its hash (used by the result cache and resumable uploads) is stable.
+    Both containers can be written to and decoded from a pipe.
+    """
+    encoder, container, _ = TRANSFER_CODECS[codec]
+    return [
+        'ffmpeg', '-nostdin', '-v', 'error', '-i', str(input_path),
+        '-vn', '-map_metadata', '-1', '-ac', '1', '-ar', str(sample_rate),
+        *encoder, '-fflags', '+bitexact', '-flags:a', '+bitexact',
+        '-f', container, '-y', str(output)
+    ]
+
+
+class StreamingDecoder:
+    """
+    Decode audio while its bytes are still arriving (e.g. during an upload).
+
+    Bytes are fed to FFmpeg's stdin as they come in and PCM is collected from
+    its stdout on a background thread, so by the time the last byte lands most
+    of the decode is already done. Containers that need to seek, such as M4A
+    files with the index at the end, cannot be decoded from a pipe; the
+    decoder then reports failure and the caller decodes the finished file.
+    """
+
+    def __init__(self, speed: float = 1.0, remove_silence_enabled: bool = True,
+                 sample_rate: int = SAMPLE_RATE, max_seconds: float = None):
+        """
+        Args:
+            speed: Playback speed factor (1.0 = unchanged)
+            remove_silence_enabled: Whether to remove silence
+            sample_rate: Output sample rate (16000 for Whisper)
+            max_seconds: Give up once this much audio is decoded (bounds memory)
+        """
+        self.speed = speed
+        self.remove_silence_enabled = remove_silence_enabled
+        self.sample_rate = sample_rate
+        self.failed = False
+        self._max_bytes = int(max_seconds * sample_rate * 4) if max_seconds else None
+        self._chunks = []
+        self._size = 0
+        self._closed = False
+
+        cmd = [
+            'ffmpeg', '-v', 'error', '-i', 'pipe:0',
+            '-af', build_filter_graph(speed, remove_silence_enabled, sample_rate=sample_rate),
+            '-ac', '1', '-ar', str(sample_rate),
+            '-f', 'f32le', '-acodec', 'pcm_f32le', 'pipe:1'
+        ]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL)
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        """Collect decoded PCM until FFmpeg exits."""
+        for data in iter(lambda: self._proc.stdout.read(1 << 16), b''):
+            self._size += len(data)
+            if self._max_bytes and self._size > self._max_bytes:
+                self.abort()
+                return
+            self._chunks.append(data)
+
+    def feed(self, data: bytes) -> bool:
+        """Pass more input bytes to FFmpeg. Returns False once decoding has failed."""
+        if self.failed or self._closed:
+            return not self.failed
+        try:
+            self._proc.stdin.write(data)
+        except (BrokenPipeError, OSError, ValueError):
+            self.failed = True
+        return not self.failed
+
+    def close(self):
+        """Signal end of input so FFmpeg can flush the tail."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            self.failed = True
+
+    def finish(self):
+        """
+        Wait for decoding to complete.
+
+        Returns:
+            Tuple of (float32 mono samples, stats_dict), or None if the input
+            could not be decoded as a stream
+        """
+        import numpy as np
+
+        self.close()
+        self._reader.join()
+        if self._proc.wait() != 0 or self.failed:
+            return None
+
+        audio = np.frombuffer(b''.join(self._chunks), dtype=np.float32)
+        self._chunks = []
+        stats = {
+            'final_duration': len(audio) / self.sample_rate,
+            'sample_rate': self.sample_rate,
+            'speed_applied': self.speed,
+            'silence_removed': self.remove_silence_enabled,
+            'compressed': True,
+            'decoded_during_upload': True,
+        }
+        return audio, stats
+
+    def abort(self):
+        """Stop FFmpeg and discard everything decoded so far."""
+        self.failed = True
+        self._chunks = []
+        try:
+            self._proc.kill()
+        except OSError:
+            pass
 
 
 def preprocess_audio(input_path: str, output_path: str = None,
                      remove_silence_enabled: bool = True,
-                     compress_enabled: bool = True) -> tuple[str, dict]:
+                     compress_enabled: bool = True,
+                     speed: float = 1.0,
+                     cancel: Optional[CancelToken] = None) -> tuple[str, dict]:
     """
-    Full preprocessing pipeline: silence removal + compression.
+    Full preprocessing pipeline: speed change + silence removal + compression,
+    run as one FFmpeg invocation with a combined filter graph.
 
     Args:
         input_path: Input audio file path
         output_path: Output file path (default: input with _preprocessed suffix)
         remove_silence_enabled: Whether to remove silence
-        compress_enabled: Whether to compress audio
+        compress_enabled: Whether to compress audio to 16kHz mono
+        speed: Playback speed factor (1.0 = unchanged)
+        cancel: Token that kills FFmpeg when the job is cancelled
 
     Returns:
         Tuple of (output_path, stats_dict)
@@ -133,55 +330,55 @@ def preprocess_audio(input_path: str, output_path: str = None,
         'final_size': 0,
         'silence_removed': remove_silence_enabled,
         'compressed': compress_enabled,
+        'speed_applied': speed,
     }
 
-    current_file = str(input_path)
-    temp_files = []
-
-    try:
-        # Step 1: Remove silence
+    if not (remove_silence_enabled or compress_enabled or speed != 1.0):
+        # Nothing to do, just copy
+        import shutil
+        shutil.copy(str(input_path), str(output_path))
+    else:
+        filters = []
+        if speed != 1.0:
+            filters.extend(atempo_filters(speed))
         if remove_silence_enabled:
-            temp_silence = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-            temp_silence.close()
-            temp_files.append(temp_silence.name)
-
-            print(f"  Removing silence...")
-            if remove_silence(current_file, temp_silence.name):
-                current_file = temp_silence.name
-                duration_after_silence = get_audio_duration(current_file)
-                stats['duration_after_silence'] = duration_after_silence
-                reduction = (1 - duration_after_silence / stats['original_duration']) * 100
-                print(f"  Silence removal: {stats['original_duration']:.1f}s -> {duration_after_silence:.1f}s ({reduction:.1f}% reduction)")
-
-        # Step 2: Compress
+            filters.append(silence_filter())
+
+        cmd = ['ffmpeg', '-y', '-nostdin', '-v', 'error', '-i', str(input_path)]
+        if filters:
+            cmd.extend(['-af', ','.join(filters)])
         if compress_enabled:
-            print(f"  Compressing to 16kHz mono...")
-            if compress_audio(current_file, str(output_path)):
-                current_file = str(output_path)
-            else:
-                # If compression fails, just copy
-                import shutil
-                shutil.copy(current_file, str(output_path))
-        else:
-            # Just copy without compression
+            cmd.extend(['-ar', str(SAMPLE_RATE), '-ac', '1'])
+
+        # Add codec based on output format
+        suffix = output_path.suffix.lower()
+        if suffix == '.wav':
+            cmd.extend(['-c:a', 'pcm_s16le'])
+        elif suffix == '.mp3':
+            cmd.extend(['-c:a', 'libmp3lame', '-b:a', '64k'])
+        elif suffix == '.m4a':
+            cmd.extend(['-c:a', 'aac', '-b:a', '64k'])
+        cmd.append(str(output_path))
+
+        print(f"  Preprocessing (single pass: {', '.join(f.split('=')[0] for f in filters) or 'resample'})...")
+        result = run_process(cmd, cancel=cancel)
+        if result.returncode != 0:
+            print(f"Error preprocessing audio: {result.stderr.decode(errors='replace')}")
             import shutil
-            shutil.copy(current_file, str(output_path))
+            shutil.copy(str(input_path), str(output_path))
 
-        stats['final_duration'] = get_audio_duration(str(output_path))
-        stats['final_size'] = output_path.stat().st_size
+    stats['final_duration'] = get_audio_duration(str(output_path))
+    stats['final_size'] = output_path.stat().st_size
 
-        size_reduction = (1 - stats['final_size'] / stats['original_size']) * 100
-        print(f"  Size: {stats['original_size'] / 1024 / 1024:.1f}MB -> {stats['final_size'] / 1024 / 1024:.1f}MB ({size_reduction:.1f}% reduction)")
+    if remove_silence_enabled and stats['original_duration'] > 0:
+        stats['duration_after_silence'] = stats['final_duration'] * speed
+        reduction = (1 - stats['duration_after_silence'] / stats['original_duration']) * 100
+        print(f"  Silence removal: {stats['original_duration']:.1f}s -> {stats['duration_after_silence']:.1f}s ({reduction:.1f}% reduction)")
 
-        return str(output_path), stats
+    size_reduction = (1 - stats['final_size'] / stats['original_size']) * 100
+    print(f"  Size: {stats['original_size'] / 1024 / 1024:.1f}MB -> {stats['final_size'] / 1024 / 1024:.1f}MB ({size_reduction:.1f}% reduction)")
 
-    finally:
-        # Clean up temp files
-        for temp_file in temp_files:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+    return str(output_path), stats
 
 
 def estimate_transcription_time(duration_seconds: float, model: str = "large-v3",
@@ -189,35 +386,23 @@ def estimate_transcription_time(duration_seconds: float, model: str = "large-v3"
     """
     Estimate transcription time based on audio duration and model.
 
-    These estimates are for M1/M2/M3 Macs with MLX Whisper.
-    Actual times may vary based on hardware and content.
+    Learned from past MLX Whisper runs on this machine (see estimator.py);
+    until there are any, typical speeds on M1/M2/M3 Macs are assumed.
 
     Args:
         duration_seconds: Audio duration in seconds
         model: Whisper model name
-        preprocessed: Whether audio has been preprocessed
+        preprocessed: Whether silence will be removed first
 
     Returns:
         Estimated transcription time in seconds
     """
-    # Approximate real-time factors for MLX Whisper on Apple Silicon
-    # (transcription_time / audio_duration)
-    model_factors = {
-        'tiny': 0.02,      # ~50x real-time
-        'base': 0.04,      # ~25x real-time
-        'small': 0.08,     # ~12x real-time
-        'medium': 0.15,    # ~7x real-time
-        'large-v3': 0.1,   # ~10x real-time (optimized for MLX)
-        'large-v3-turbo': 0.07,  # ~14x real-time
-    }
-
-    factor = model_factors.get(model, 0.1)
-
-    # Preprocessing typically reduces duration by 10-30%
-    if preprocessed:
-        duration_seconds *= 0.8  # Assume 20% reduction
+    from estimator import get_estimator
 
-    return duration_seconds * factor
+    # With preprocessing, assume this machine's usual share of silence is cut
+    silence_ratio = None if preprocessed else 0.0
+    return get_estimator().estimate(duration_seconds, silence_ratio, method='mlx', model=model,
+                                    device='mlx', compute_type='float16')
 
 
 if __name__ == "__main__":
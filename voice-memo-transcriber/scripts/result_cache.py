@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of transcription results.
+Results are keyed by the audio's SHA-256 plus the options that affect the
+transcript, stored as JSON on disk, and evicted least-recently-used first
+once the cache exceeds its size cap.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+def normalize_options(options: dict) -> dict:
+    """
+    Canonical form of the options that change a transcript (filename and method do not).
+
+    transfer_codec is set when the audio was a re-encoded copy filed under the
+    original recording's hash; such results get keys of their own, so they
+    never stand in for (or replace) one computed from the real bytes.
+    """
+    normalized = {
+        'model': options.get('model', 'large-v3'),
+        'speed': float(options.get('speed', 1.0)),
+        'remove_silence': bool(options.get('remove_silence', True)),
+        'compress': bool(options.get('compress', True)),
+    }
+    if options.get('transfer_codec'):
+        normalized['transfer_codec'] = options['transfer_codec']
+    return normalized
+
+
+# Bumped when stored results change meaning (2: timestamps on the original timeline)
+RESULT_FORMAT = 2
+
+
+def make_cache_key(file_hash: str, options: dict) -> str:
+    """Stable key for (file hash, model, speed, silence removal, compression, transfer codec)."""
+    payload = json.dumps({'hash': file_hash, 'format': RESULT_FORMAT, **normalize_options(options)},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk result cache laid out as <dir>/<hash[:2]>/<hash>/<key>.json.
+    File mtimes record last access, so LRU order survives restarts.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_mb: float = 500):
+        """
+        Args:
+            cache_dir: Directory to store results in
+            max_size_mb: Size cap before least-recently-used entries are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_mb = max_size_mb
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._size = sum(p.stat().st_size for p in self.cache_dir.glob('*/*/*.json'))
+
+    def _hash_dir(self, file_hash: str) -> Path:
+        return self.cache_dir / file_hash[:2] / file_hash
+
+    def _entry_path(self, file_hash: str, options: dict) -> Path:
+        return self._hash_dir(file_hash) / f"{make_cache_key(file_hash, options)}.json"
+
+    def get(self, file_hash: str, options: dict) -> Optional[dict]:
+        """
+        Return a cached result for these options, marking it recently used.
+        A lookup for a re-encoded copy (transfer_codec) is also answered by a
+        result from the original bytes, never the other way round.
+        """
+        candidates = [options]
+        if options.get('transfer_codec'):
+            candidates.insert(0, {**options, 'transfer_codec': None})
+        for candidate in candidates:
+            path = self._entry_path(file_hash, candidate)
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+                os.utime(path)
+            except (OSError, json.JSONDecodeError):
+                continue
+            self.hits += 1
+            return entry['result']
+        self.misses += 1
+        return None
+
+    def put(self, file_hash: str, options: dict, result: dict):
+        """Store a result, then evict old entries if over the size cap."""
+        path = self._entry_path(file_hash, options)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({
+            'file_hash': file_hash,
+            'options': normalize_options(options),
+            'stored_at': time.time(),
+            'result': result,
+        })
+
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+
+        with self._lock:
+            if path.exists():
+                self._size -= path.stat().st_size
+            os.replace(tmp_path, path)
+            self._size += len(data.encode())
+            self._evict()
+
+    def entries_for_hash(self, file_hash: str) -> list:
+        """Option sets that have a cached result for this audio hash."""
+        entries = []
+        for path in self._hash_dir(file_hash).glob('*.json'):
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            entries.append({
+                'options': entry['options'],
+                'stored_at': entry['stored_at'],
+                'word_count': entry['result'].get('word_count'),
+            })
+        return entries
+
+    def _evict(self):
+        """Delete least-recently-used entries until under the cap. Caller holds _lock."""
+        limit = self.max_size_mb * 1024 * 1024
+        if self._size <= limit:
+            return
+
+        paths = sorted(self.cache_dir.glob('*/*/*.json'), key=lambda p: p.stat().st_mtime)
+        for path in paths:
+            if self._size <= limit:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                self._size -= size
+                if not any(path.parent.iterdir()):
+                    path.parent.rmdir()
+            except OSError:
+                continue
+
+    def stats(self) -> dict:
+        """Size and hit-rate summary for status endpoints."""
+        total = self.hits + self.misses
+        return {
+            'size_mb': round(self._size / 1024 / 1024, 2),
+            'max_size_mb': self.max_size_mb,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else None,
+        }
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Bounded worker pool and priority queue for transcription jobs.
+Each backend (mlx, faster-whisper, openai) gets a fixed number of worker
+threads; queued jobs run highest priority first, then shortest audio first.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional
+
+
+class QueueFullError(Exception):
+    """Raised when a backend's backlog is at its admission limit."""
+
+    def __init__(self, backend: str, depth: int, retry_after: float):
+        super().__init__(f"Queue for {backend} is full ({depth} jobs waiting)")
+        self.backend = backend
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+class JobScheduler:
+    """
+    Fixed-size worker pools with admission control.
+
+    Jobs are ordered by (-priority, duration, submission order), so an explicit
+    priority wins and otherwise short memos jump ahead of long ones.
+    """
+
+    def __init__(self, handler: Callable, workers: dict, max_queue: int = 20,
+                 estimator: Optional[Callable[[str, float], float]] = None):
+        """
+        Args:
+            handler: Callable(job_id, *args) that runs a job to completion
+            workers: Mapping of backend name -> worker thread count
+            max_queue: Maximum number of waiting jobs per backend
+            estimator: Callable(backend, duration) -> expected processing seconds
+        """
+        self.handler = handler
+        self.workers = dict(workers)
+        self.max_queue = max_queue
+        self.estimator = estimator or (lambda backend, duration: duration * 0.3)
+        self._queues = {backend: [] for backend in self.workers}
+        self._running = {backend: {} for backend in self.workers}  # job_id -> (started_at, estimate, priority)
+        self._entries = {}  # job_id -> heap entry for queued jobs
+        self._released = set()  # running job ids whose worker slot was handed on
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+
+        for backend, count in self.workers.items():
+            for i in range(count):
+                self._start_worker(backend)
+
+    def _start_worker(self, backend: str):
+        t = threading.Thread(target=self._worker, args=(backend,),
+                             name=f"{backend}-worker-{len(self._threads)}", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def submit(self, job_id: str, backend: str, args: tuple = (),
+               duration: float = 0.0, priority: int = 0,
+               handler: Optional[Callable] = None, estimate: Optional[float] = None) -> int:
+        """
+        Queue a job. Returns its 1-based queue position.
+
+        A handler passed here replaces the default one for this job only
+        (e.g. a batch of clips that runs as a single queue entry). An estimate
+        passed here overrides the estimator when the caller knows more about
+        the job (model, speed, silence removal) than its duration.
+
+        Raises:
+            KeyError: Unknown backend
+            QueueFullError: Backend backlog is at max_queue
+        """
+        if backend not in self._queues:
+            raise KeyError(f"No workers configured for backend: {backend}")
+
+        with self._cond:
+            queue = self._queues[backend]
+            if len(queue) >= self.max_queue:
+                raise QueueFullError(backend, len(queue), self._drain_time(backend))
+
+            if estimate is None:
+                estimate = self.estimator(backend, duration)
+            entry = [(-priority, duration, next(self._counter)), job_id, args, estimate, handler or self.handler]
+            heapq.heappush(queue, entry)
+            self._entries[job_id] = entry
+            self._cond.notify_all()
+
+        return self.queue_info(job_id).get('queue_position', 0)
+
+    def check_admission(self, backend: str, entries: int = 1):
+        """Raise QueueFullError early if the backlog has no room for this many entries."""
+        with self._cond:
+            queue = self._queues.get(backend, [])
+            if len(queue) + entries > self.max_queue:
+                raise QueueFullError(backend, len(queue), self._drain_time(backend))
+
+    def _worker(self, backend: str):
+        """Worker loop: pull the best queued job for this backend and run it."""
+        queue = self._queues[backend]
+        while True:
+            with self._cond:
+                while not queue:
+                    self._cond.wait()
+                key, job_id, args, estimate, handler = heapq.heappop(queue)
+                self._entries.pop(job_id, None)
+                self._running[backend][job_id] = (time.time(), estimate, -key[0])
+
+            try:
+                handler(job_id, *args)
+            except Exception as e:
+                print(f"Worker {backend} failed on job {job_id}: {e}")
+            finally:
+                with self._cond:
+                    released = job_id in self._released
+                    self._released.discard(job_id)
+                    if not released:
+                        self._running[backend].pop(job_id, None)
+                    self._cond.notify_all()
+
+            if released:
+                return  # a replacement worker already took over this slot
+
+    def cancel(self, job_id: str) -> bool:
+        """Remove a job that has not started yet. Returns False if it is not queued."""
+        with self._cond:
+            entry = self._entries.pop(job_id, None)
+            if entry is None:
+                return False
+            for queue in self._queues.values():
+                if entry in queue:
+                    queue.remove(entry)
+                    heapq.heapify(queue)
+                    break
+            self._cond.notify_all()
+            return True
+
+    def release(self, job_id: str) -> bool:
+        """
+        Free a running job's worker slot immediately, e.g. once it has been
+        cancelled and is only winding down. A replacement worker starts on the
+        next queued job; the old thread exits when its handler returns.
+
+        Returns:
+            False if the job is not running
+        """
+        with self._cond:
+            for backend, running in self._running.items():
+                if job_id in running:
+                    running.pop(job_id)
+                    self._released.add(job_id)
+                    self._start_worker(backend)
+                    return True
+            return False
+
+    def preemption_candidates(self, backend: str, priority: int) -> list:
+        """
+        Running jobs a job of this priority may displace, if every worker of
+        the backend is busy: lower priorities first, then the most recently
+        started (least work lost).
+        """
+        with self._cond:
+            running = self._running.get(backend, {})
+            if len(running) < self.workers.get(backend, 0):
+                return []
+            lower = [(p, -started, job_id) for job_id, (started, _, p) in running.items() if p < priority]
+            return [job_id for _, _, job_id in sorted(lower)]
+
+    def _ordered(self, backend: str) -> list:
+        """Queued entries for a backend in the order they will run."""
+        return sorted(self._queues[backend], key=lambda e: e[0])
+
+    def _remaining_running(self, backend: str) -> list:
+        """Estimated seconds left for each running job of a backend."""
+        now = time.time()
+        return [max(0.0, estimate - (now - started))
+                for started, estimate, _ in self._running[backend].values()]
+
+    def _drain_time(self, backend: str) -> float:
+        """Rough seconds until the whole backlog of a backend has started."""
+        total = sum(self._remaining_running(backend)) + sum(e[3] for e in self._queues[backend])
+        return total / max(1, self.workers[backend])
+
+    def queue_info(self, job_id: str) -> dict:
+        """Queue position and ETA (seconds until completion) for a job."""
+        with self._cond:
+            for backend, running in self._running.items():
+                if job_id in running:
+                    started, estimate, _ = running[job_id]
+                    return {
+                        'backend': backend,
+                        'queue_position': 0,
+                        'eta_seconds': round(max(0.0, estimate - (time.time() - started)), 1),
+                    }
+
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return {}
+
+            backend = next(b for b, q in self._queues.items() if entry in q)
+            workers = max(1, self.workers[backend])
+
+            # Simulate the backend's workers picking up jobs ahead of this one
+            busy = self._remaining_running(backend)
+            slots = sorted(busy + [0.0] * max(0, workers - len(busy)))
+            position = 0
+            for position, queued in enumerate(self._ordered(backend), 1):
+                start = heapq.heappop(slots)
+                if queued is entry:
+                    return {
+                        'backend': backend,
+                        'queue_position': position,
+                        'eta_seconds': round(start + entry[3], 1),
+                    }
+                heapq.heappush(slots, start + queued[3])
+            return {'backend': backend, 'queue_position': position}
+
+    def stats(self) -> dict:
+        """Per-backend worker and queue counts."""
+        with self._cond:
+            return {
+                backend: {
+                    'workers': self.workers[backend],
+                    'running': len(self._running[backend]),
+                    'queued': len(self._queues[backend]),
+                    'max_queue': self.max_queue,
+                    'backlog_seconds': round(self._drain_time(backend), 1),
+                }
+                for backend in self.workers
+            }
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Incremental transcription of live audio.
+Audio is decoded as it arrives and the unconfirmed tail of the recording is
+re-transcribed about once a second. A word is committed once two consecutive
+passes agree on it (LocalAgreement-2), and everything pending is committed
+as soon as the speaker pauses, so committed text never changes and appears a
+second or two after it is spoken.
+"""
+
+import re
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+
+from preprocess import SAMPLE_RATE
+from vad import detect_speech
+from cancellation import CancelToken, JobCancelled
+
+# Formats a live stream may be sent in; raw PCM is mono
+PCM_FORMATS = {'pcm_s16le': ('s16le', 2), 'pcm_f32le': ('f32le', 4)}
+STREAM_FORMATS = set(PCM_FORMATS) | {'webm', 'ogg', 'opus'}
+
+MIN_CHUNK_SECONDS = 1.0    # new audio between decoding passes
+TRIM_SECONDS = 10.0        # buffer length after which committed audio is dropped
+MAX_BUFFER_SECONDS = 20.0  # unconfirmed audio before words are committed regardless
+PAUSE_SECONDS = 0.6        # trailing silence that ends an utterance
+PROMPT_CHARS = 200         # committed text passed to the model as context
+
+
+def normalize_word(text: str) -> str:
+    """Word as compared between passes (case and punctuation ignored)."""
+    return re.sub(r"[^\w']", '', text.lower())
+
+
+class LocalAgreement:
+    """
+    LocalAgreement-2 commit policy: a word is stable once two consecutive
+    hypotheses agree on it and on every uncommitted word before it.
+    """
+
+    def __init__(self):
+        self.previous = []
+
+    def update(self, words: list) -> list:
+        """
+        Feed the latest hypothesis for the uncommitted audio.
+
+        Returns:
+            The prefix of words confirmed by the previous hypothesis
+        """
+        agreed = 0
+        for old, new in zip(self.previous, words):
+            if normalize_word(old['text']) != normalize_word(new['text']):
+                break
+            agreed += 1
+        self.previous = words[agreed:]
+        return words[:agreed]
+
+    def reset(self):
+        self.previous = []
+
+
+class StreamingTranscriber:
+    """
+    Commits text from a growing recording while it is being fed.
+
+    decode(audio, prompt, language) runs the model on float32 samples and
+    returns (words, language), each word a dict with start, end (seconds
+    into the given audio) and text. It is called from a worker thread, one
+    pass at a time. on_event(kind, data) receives 'commit' events (a new
+    segment of committed text) and 'partial' events (the current guess at
+    what follows it, which may still change).
+    """
+
+    def __init__(self, decode: Callable, on_event: Optional[Callable] = None,
+                 sample_rate: int = SAMPLE_RATE, vad_method: str = 'auto',
+                 cancel: Optional[CancelToken] = None):
+        """
+        Args:
+            decode: Model call, see above
+            on_event: Receives commit and partial events
+            sample_rate: Rate of the samples passed to feed()
+            vad_method: Detector used to find pauses ('auto', 'silero', 'energy')
+            cancel: Stops decoding when cancelled
+        """
+        self.decode = decode
+        self.on_event = on_event or (lambda kind, data: None)
+        self.sample_rate = sample_rate
+        self.vad_method = vad_method
+        self.cancel = cancel or CancelToken()
+        self.language = None
+        self.segments = []
+        self.passes = 0
+        self.decode_seconds = 0.0
+        self.received_seconds = 0.0
+        self.error = None
+
+        self._agreement = LocalAgreement()
+        self._buffer = None          # audio not yet dropped, starting at _buffer_start
+        self._buffer_start = 0.0     # seconds into the recording
+        self._committed_until = 0.0  # end of the last committed word
+        self._committed_text = ''
+        self._pending = []
+        self._pending_samples = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def feed(self, samples):
+        """Append float32 mono samples to the recording."""
+        if not len(samples):
+            return
+        with self._cond:
+            if self._closed:
+                return
+            self._pending.append(samples)
+            self._pending_samples += len(samples)
+            self.received_seconds += len(samples) / self.sample_rate
+            if self._pending_samples >= MIN_CHUNK_SECONDS * self.sample_rate:
+                self._cond.notify()
+
+    def finish(self, timeout: Optional[float] = None) -> dict:
+        """
+        End the recording, commit whatever is still pending and return the
+        transcript.
+
+        Raises:
+            JobCancelled: The stream was cancelled
+            Exception: Whatever decode raised on the worker thread
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join(timeout)
+        self.cancel.check()
+        if self.error is not None:
+            raise self.error
+
+        return {
+            'text': ' '.join(s['text'] for s in self.segments),
+            'segments': self.segments,
+            'language': self.language or 'en',
+            'duration': self.received_seconds,
+            'transcription_time': self.decode_seconds,
+            'passes': self.passes,
+        }
+
+    def abort(self):
+        """Stop decoding and drop the recording."""
+        self.cancel.cancel()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def _run(self):
+        import numpy as np
+
+        try:
+            while True:
+                with self._cond:
+                    while (not self._closed and not self.cancel.cancelled
+                           and self._pending_samples < MIN_CHUNK_SECONDS * self.sample_rate):
+                        self._cond.wait()
+                    pending, self._pending, self._pending_samples = self._pending, [], 0
+                    closing = self._closed
+
+                self.cancel.check()
+                if pending:
+                    parts = pending if self._buffer is None else [self._buffer] + pending
+                    self._buffer = np.concatenate(parts)
+                if self._buffer is None or not len(self._buffer):
+                    if closing:
+                        return
+                    continue
+                self._step(final=closing)
+                if closing:
+                    return
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self.error = e
+
+    def _seconds(self, samples: int) -> float:
+        return samples / self.sample_rate
+
+    def _drop_until(self, t: float):
+        """Forget buffered audio before recording time t."""
+        cut = int((t - self._buffer_start) * self.sample_rate)
+        if cut > 0:
+            self._buffer = self._buffer[cut:]
+            self._buffer_start += self._seconds(cut)
+
+    def _step(self, final: bool):
+        """One decoding pass over the buffer."""
+        buffer_end = self._buffer_start + self._seconds(len(self._buffer))
+        speech = detect_speech(self._buffer, self.sample_rate, method=self.vad_method,
+                               min_silence_duration=PAUSE_SECONDS, min_speech_duration=0.1,
+                               speech_pad=0.0)
+        if not speech.intervals:
+            # Nothing said since the last commit: skip the model (Whisper
+            # hallucinates on silence) and keep only a little lead-in
+            if final:
+                self._commit(self._agreement.previous)
+            self._agreement.reset()
+            self._drop_until(buffer_end - PAUSE_SECONDS)
+            return
+        paused = speech.total_seconds - speech.intervals[-1][1] >= PAUSE_SECONDS
+
+        started = time.time()
+        words, language = self.decode(self._buffer, self._committed_text[-PROMPT_CHARS:], self.language)
+        self.decode_seconds += time.time() - started
+        self.passes += 1
+        self.cancel.check()
+        if self.language is None and language and self._seconds(len(self._buffer)) >= 3:
+            self.language = language  # short clips misdetect; settle once there is enough audio
+
+        words = self._new_words([{**w, 'start': w['start'] + self._buffer_start,
+                                  'end': w['end'] + self._buffer_start} for w in words])
+
+        if final or paused:
+            # End of an utterance: the speaker has moved on, nothing left to confirm
+            self._commit(words)
+            self._agreement.reset()
+            self._drop_until(buffer_end - (0.0 if final else 0.2))
+            return
+
+        committed = self._agreement.update(words)
+        if not committed and self._seconds(len(self._buffer)) > MAX_BUFFER_SECONDS:
+            # Passes keep disagreeing; commit what is well clear of the moving edge
+            committed = [w for w in words if w['end'] <= buffer_end - MIN_CHUNK_SECONDS]
+            self._agreement.reset()
+        self._commit(committed)
+
+        pending = words[len(committed):]
+        self.on_event('partial', {
+            'text': ''.join(w['text'] for w in pending).strip(),
+            'start': pending[0]['start'] if pending else buffer_end,
+            'end': buffer_end,
+        })
+
+        if self._seconds(len(self._buffer)) > TRIM_SECONDS and self._committed_until > self._buffer_start:
+            self._drop_until(self._committed_until)
+
+    def _new_words(self, words: list) -> list:
+        """Drop words of the hypothesis that were already committed."""
+        words = [w for w in words if (w['start'] + w['end']) / 2 >= self._committed_until]
+        if not words or words[0]['start'] - self._committed_until > 1.0:
+            return words
+        # Timestamps jitter between passes; also drop a repeat of the committed tail
+        tail = [normalize_word(w) for w in self._committed_text.split()[-5:]]
+        for n in range(min(len(tail), len(words)), 0, -1):
+            if [normalize_word(w['text']) for w in words[:n]] == tail[-n:]:
+                return words[n:]
+        return words
+
+    def _commit(self, words: list):
+        text = ''.join(w['text'] for w in words).strip()
+        if not text:
+            return
+        segment = {'start': words[0]['start'], 'end': words[-1]['end'], 'text': text}
+        self.segments.append(segment)
+        self._committed_until = segment['end']
+        self._committed_text = f"{self._committed_text} {text}".strip()
+        self.on_event('commit', segment)
+
+
+class LiveStream:
+    """
+    A live recording arriving as bytes: decodes them to 16 kHz mono PCM and
+    feeds a StreamingTranscriber.
+
+    16 kHz mono PCM is converted in-process. Other rates and compressed
+    formats (WebM/Ogg Opus from a browser's MediaRecorder) go through an
+    FFmpeg pipe that emits PCM as soon as each packet decodes.
+    """
+
+    def __init__(self, decode: Callable, on_event: Optional[Callable] = None,
+                 fmt: str = 'pcm_s16le', sample_rate: int = SAMPLE_RATE, channels: int = 1,
+                 vad_method: str = 'auto', cancel: Optional[CancelToken] = None):
+        """
+        Args:
+            decode: Model call passed to StreamingTranscriber
+            on_event: Receives commit and partial events
+            fmt: One of STREAM_FORMATS
+            sample_rate: Rate of raw PCM input
+            channels: Channels of raw PCM input (downmixed to mono)
+            vad_method: Pause detector
+            cancel: Stops the stream (and kills FFmpeg) when cancelled
+        """
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported stream format: {fmt} (use one of {', '.join(sorted(STREAM_FORMATS))})")
+        self.cancel = cancel or CancelToken()
+        self.transcriber = StreamingTranscriber(decode, on_event, vad_method=vad_method, cancel=self.cancel)
+        self.format = fmt
+        self.bytes_received = 0
+        self.last_activity = time.time()
+        self._leftover = b''
+        self._proc = None
+        self._track = None
+
+        if fmt in PCM_FORMATS and sample_rate == SAMPLE_RATE and channels == 1:
+            return
+        if fmt in PCM_FORMATS:
+            raw_format, _ = PCM_FORMATS[fmt]
+            source = ['-f', raw_format, '-ar', str(sample_rate), '-ac', str(channels)]
+        else:
+            source = ['-probesize', '32768', '-analyzeduration', '0']
+        cmd = [
+            'ffmpeg', '-v', 'error', '-fflags', 'nobuffer', *source, '-i', 'pipe:0',
+            '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 'f32le', '-acodec', 'pcm_f32le',
+            '-flush_packets', '1', 'pipe:1'
+        ]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL)
+        self._track = self.cancel.track(self._proc)
+        self._track.__enter__()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.time() - self.last_activity
+
+    def _read(self):
+        """Pass FFmpeg's PCM output on as it is produced."""
+        import numpy as np
+
+        leftover = b''
+        for data in iter(lambda: self._proc.stdout.read1(1 << 14), b''):
+            data = leftover + data
+            usable = len(data) - len(data) % 4
+            leftover = data[usable:]
+            self.transcriber.feed(np.frombuffer(data[:usable], dtype=np.float32))
+
+    def write(self, data: bytes):
+        """Add received bytes to the recording."""
+        import numpy as np
+
+        self.cancel.check()
+        self.bytes_received += len(data)
+        self.last_activity = time.time()
+        if self._proc is not None:
+            try:
+                self._proc.stdin.write(data)
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError, ValueError):
+                self.cancel.check()
+                raise RuntimeError("FFmpeg could not decode the stream")
+            return
+
+        raw_format, width = PCM_FORMATS[self.format]
+        data = self._leftover + data
+        usable = len(data) - len(data) % width
+        self._leftover = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=np.int16 if width == 2 else np.float32)
+        if width == 2:
+            samples = samples.astype(np.float32) / 32768.0
+        self.transcriber.feed(samples)
+
+    def finish(self, timeout: Optional[float] = None) -> dict:
+        """End of the recording: flush the decoder and return the transcript."""
+        if self._proc is not None:
+            try:
+                self._proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            self._reader.join(timeout)
+            self._proc.wait()
+            self._untrack()
+        return self.transcriber.finish(timeout)
+
+    def abort(self):
+        """Stop decoding and discard the recording."""
+        self.transcriber.abort()
+        self._untrack()
+
+    def _untrack(self):
+        if self._track is not None:
+            self._track.__exit__(None, None, None)
+            self._track = None
@@ -6,6 +6,7 @@ Handles persistence of memos and transcripts to Supabase.
 
 import os
 import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
@@ -20,8 +21,23 @@ SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_ANON_KEY') or os.getenv('SUPABASE_KEY')  # Use anon/public key
 
 
+# Hashes per bulk lookup, keeping the request URL well under server limits
+HASH_LOOKUP_CHUNK = 100
+
+_client = None
+_client_lock = threading.Lock()
+
+
 def get_supabase_client():
-    """Get Supabase client instance."""
+    """Get the shared Supabase client instance, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = _create_client()
+        return _client
+
+
+def _create_client():
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise ValueError(
             "SUPABASE_URL and SUPABASE_KEY must be set in environment.\n"
@@ -90,6 +106,27 @@ def get_memo_by_hash(file_hash: str) -> Optional[dict]:
     return result.data[0] if result.data else None
 
 
+def get_memos_by_hashes(file_hashes: List[str]) -> dict:
+    """
+    Get the memos for many file hashes with bulk `in` queries.
+
+    Args:
+        file_hashes: SHA256 hashes of the files
+
+    Returns:
+        dict of file hash -> memo record, for hashes that have one
+    """
+    client = get_supabase_client()
+    file_hashes = list(file_hashes)
+    memos = {}
+    for i in range(0, len(file_hashes), HASH_LOOKUP_CHUNK):
+        chunk = file_hashes[i:i + HASH_LOOKUP_CHUNK]
+        result = client.table('voice_memos').select('*').in_('file_hash', chunk).execute()
+        for memo in result.data or []:
+            memos[memo['file_hash']] = memo
+    return memos
+
+
 def get_memo_by_id(memo_id: str) -> Optional[dict]:
     """Get a memo by its ID."""
     client = get_supabase_client()
@@ -19,6 +19,7 @@ from tqdm import tqdm
 
 # Local imports
 from preprocess import preprocess_audio, get_audio_duration, estimate_transcription_time
+from estimator import get_estimator
 
 # Load environment variables
 load_dotenv()
@@ -180,6 +181,7 @@ def transcribe_file(
     preprocess_stats = None
     audio_to_transcribe = str(input_path)
 
+    preprocess_start = time.time()
     if preprocess:
         print("\nPreprocessing...")
         temp_preprocessed = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
@@ -195,6 +197,7 @@ def transcribe_file(
         except Exception as e:
             print(f"  Preprocessing failed: {e}, using original file")
             audio_to_transcribe = str(input_path)
+    preprocess_time = time.time() - preprocess_start
 
     # Transcription
     print("\nTranscribing...")
@@ -202,6 +205,7 @@ def transcribe_file(
         result = transcribe_with_openai(audio_to_transcribe, model if model != "mlx-community/whisper-large-v3-mlx" else "whisper-1")
     else:
         result = transcribe_with_mlx(audio_to_transcribe, model)
+    record_transcription_time(result, original_duration, preprocess_stats, preprocess_time)
 
     # Clean up temp file
     if preprocess and audio_to_transcribe != str(input_path):
@@ -210,6 +214,23 @@ def transcribe_file(
         except:
             pass
 
+    return finish_transcription(input_path, result, file_hash, original_duration, output_path,
+                                preprocess, preprocess_stats, move_completed)
+
+
+def finish_transcription(input_path: Path, result: dict, file_hash: str, original_duration: float,
+                         output_path: Optional[Path] = None, preprocess: bool = True,
+                         preprocess_stats: Optional[dict] = None, move_completed: bool = False) -> dict:
+    """
+    Save a transcript, optionally move the audio to the completed folder,
+    and build the result dict that transcribe_file() returns.
+    """
+    input_path = Path(input_path)
+    if output_path is None:
+        output_path = TRANSCRIPTS_DIR / f"{input_path.stem}.txt"
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
     # Save transcript
     transcript_text = result['text'].strip()
     with open(output_path, 'w') as f:
@@ -243,6 +264,27 @@ def transcribe_file(
     }
 
 
+def record_transcription_time(result: dict, original_duration: float, preprocess_stats: Optional[dict],
+                              preprocess_time: float):
+    """Add a finished run to this machine's timing history, which future estimates learn from."""
+    silence_ratio = 0.0
+    if preprocess_stats and preprocess_stats.get('duration_after_silence') and original_duration:
+        silence_ratio = max(0.0, 1 - preprocess_stats['duration_after_silence'] / original_duration)
+
+    if result['method'] == 'openai_api':
+        key = {'method': 'openai', 'model': 'whisper-1', 'device': 'cloud'}
+    else:
+        # History is kept under the short model name ('large-v3'), as the server does
+        model = next((name for name, repo in MLX_MODELS.items() if repo == result['model']), result['model'])
+        key = {'method': 'mlx', 'model': model, 'device': 'mlx', 'compute_type': 'float16'}
+
+    try:
+        get_estimator().record(original_duration, preprocess_time + result['transcription_time'],
+                               silence_ratio, **key)
+    except Exception as e:
+        print(f"  Could not record timing: {e}")
+
+
 def estimate_cost_and_time(file_path: str, use_openai: bool = False, preprocess: bool = True) -> dict:
     """
     Estimate transcription cost and time for a file.
@@ -254,7 +296,8 @@ def estimate_cost_and_time(file_path: str, use_openai: bool = False, preprocess:
 
     if use_openai:
         cost = (duration / 60) * 0.006  # $0.006 per minute
-        est_time = 30 + (duration / 60) * 2  # ~2s per minute + upload time
+        est_time = get_estimator().estimate(duration, None if preprocess else 0.0,
+                                            method='openai', model='whisper-1', device='cloud')
     else:
         est_time = estimate_transcription_time(duration, "large-v3", preprocessed=preprocess)
         cost = 0
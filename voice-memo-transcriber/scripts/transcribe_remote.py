@@ -11,15 +11,39 @@ import time
 import hashlib
 import tempfile
 import argparse
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
+from backend_health import HealthCache
+from dispatcher import BackendUnavailable, BatchDispatcher, DispatchBackend
+from estimator import DEVICE_RTF
+from job_tracker import LongPollUnsupported, tracker_for
+from preprocess import TRANSFER_CODECS, transcode_command
+
 # Project paths
 PROJECT_DIR = Path(__file__).parent.parent
 CONFIG_PATH = PROJECT_DIR / "config.json"
 TRANSCRIPTS_DIR = PROJECT_DIR / "transcripts"
+UPLOAD_STATE_PATH = PROJECT_DIR / ".uploads.json"
+HEALTH_CACHE_PATH = PROJECT_DIR / ".backend_health.json"
+
+# Resumable uploads are sent in pieces of this size
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# How long a job's server may stay unreachable before the job is given up on it
+# (when polling; the job tracker has its own GRACE_SECONDS)
+POLL_GRACE_SECONDS = 60
+
+# Recording length used to ask servers for their speed before a batch
+PROBE_DURATION = 600
+
+# Bytes and seconds spent sending audio, per backend, for the transfer report
+TRANSFER_STATS = {}
+_transfer_lock = threading.Lock()
 
 
 def load_config() -> dict:
@@ -50,14 +74,35 @@ def check_backend_health(backend: dict, timeout: int = 5) -> dict:
                     "available": True,
                     "gpu": data.get("gpu_available", False),
                     "backend_type": data.get("backend_type", "unknown"),
-                    "active_jobs": data.get("active_jobs", 0)
+                    "active_jobs": data.get("active_jobs", 0),
+                    "queue": data.get("queue", {})
                 }
-    except (urllib.error.URLError, TimeoutError, json.JSONDecodeError):
+    except (urllib.error.URLError, TimeoutError, ConnectionError, json.JSONDecodeError):
         pass
 
     return {"available": False}
 
 
+def get_backend_estimate(backend: dict, duration: float, model: str, timeout: int = 5) -> Optional[dict]:
+    """
+    Ask a server how long a recording would take there, including its queue.
+
+    Returns:
+        The server's /estimate response, or None if it has no estimator
+    """
+    import urllib.request
+    import urllib.error
+    import urllib.parse
+
+    query = urllib.parse.urlencode({"duration": duration, "model": model})
+    url = backend.get("url", "").rstrip("/") + "/estimate?" + query
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read().decode())
+    except (urllib.error.URLError, TimeoutError, ConnectionError, json.JSONDecodeError):
+        return None
+
+
 def check_ssh_connection(host: str, timeout: int = 5) -> bool:
     """Check if SSH connection to host is available."""
     try:
@@ -71,6 +116,55 @@ def check_ssh_connection(host: str, timeout: int = 5) -> bool:
         return False
 
 
+def probe_backends(backends: dict, timeout: int = 5, ssh: bool = False, refresh: bool = False) -> dict:
+    """
+    Health of several backends, probed in parallel.
+
+    Recent results come from the on-disk health cache, and backends whose
+    circuit is open (they failed recently) are reported unavailable without
+    being contacted, so an offline machine costs nothing on the next runs.
+
+    Args:
+        backends: Backend configs by name (disabled ones are skipped)
+        timeout: Per-probe timeout in seconds
+        ssh: Also check SSH reachability of backends with an ssh_host
+        refresh: Ignore the cache and open circuits (fresh probes for --status)
+
+    Returns:
+        name -> check_backend_health() result plus latency_ms, age and
+        circuit_open, and an 'ssh' flag when ssh is set
+    """
+    probes = {}
+    for name, backend in backends.items():
+        if not backend.get("enabled", True):
+            continue
+        probes[f"http {backend.get('url', '')}"] = lambda b=backend: check_backend_health(b, timeout)
+        if ssh and backend.get("ssh_host"):
+            host = backend["ssh_host"]
+            probes[f"ssh {host}"] = lambda h=host: {"available": check_ssh_connection(h, timeout)}
+
+    results = get_health_cache().check(probes, refresh=refresh)
+
+    health = {}
+    for name, backend in backends.items():
+        if not backend.get("enabled", True):
+            continue
+        health[name] = results[f"http {backend.get('url', '')}"]
+        if ssh and backend.get("ssh_host"):
+            health[name] = {**health[name], "ssh": results[f"ssh {backend['ssh_host']}"]["available"]}
+    return health
+
+
+_health_cache = None
+
+
+def get_health_cache() -> HealthCache:
+    global _health_cache
+    if _health_cache is None:
+        _health_cache = HealthCache(HEALTH_CACHE_PATH)
+    return _health_cache
+
+
 def get_audio_duration(file_path: str) -> float:
     """Get audio duration in seconds using ffprobe."""
     cmd = [
@@ -84,13 +178,23 @@ def get_audio_duration(file_path: str) -> float:
         return 0.0
 
 
+_hash_cache = {}  # (path, size, mtime) -> SHA-256
+
+
 def compute_file_hash(file_path: str) -> str:
-    """Compute SHA256 hash of a file."""
-    sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            sha256.update(chunk)
-    return sha256.hexdigest()[:16]
+    """
+    Full SHA-256 of a file, as servers and Supabase key results by it.
+    Remembered per path, size and modification time for the rest of the run.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _hash_cache:
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(chunk)
+        _hash_cache[key] = sha256.hexdigest()
+    return _hash_cache[key]
 
 
 def transfer_file_to_remote(local_path: str, remote_host: str, remote_path: str, timeout: int = 300) -> bool:
@@ -133,22 +237,121 @@ def transfer_file_from_remote(remote_host: str, remote_path: str, local_path: st
         return False
 
 
+def transcode_file(audio_path: Path, codec: str) -> tuple[Path, float]:
+    """
+    Re-encode a recording to 16 kHz mono in a temporary directory.
+
+    Returns:
+        Tuple of (encoded file, seconds spent encoding); the caller removes
+        the file's directory when done
+
+    Raises:
+        RuntimeError: If FFmpeg fails
+    """
+    out = Path(tempfile.mkdtemp(prefix="transcode_")) / (audio_path.stem + TRANSFER_CODECS[codec][2])
+    start = time.time()
+    result = subprocess.run(transcode_command(str(audio_path), codec, str(out)), capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Transcode failed: {result.stderr.decode(errors='replace').strip()[-500:]}")
+    return out, time.time() - start
+
+
+def stream_transcode_to_remote(audio_path: Path, codec: str, remote_host: str, remote_path: str,
+                               timeout: int = 300) -> Optional[int]:
+    """
+    Encode a recording and copy it to the remote machine in one pipeline
+    (ffmpeg | ssh cat), so the transfer starts with the first encoded bytes.
+
+    Returns:
+        Bytes sent, or None if either side failed
+    """
+    remote_dir = str(Path(remote_path).parent)
+    encoder = subprocess.Popen(transcode_command(str(audio_path), codec), stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL)
+    remote_cmd = f"mkdir -p {remote_dir} && cat > {remote_path} && wc -c < {remote_path}"
+    counter = subprocess.Popen(["ssh", remote_host, remote_cmd],
+                               stdin=encoder.stdout, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    encoder.stdout.close()  # ssh owns the pipe now
+    try:
+        out, _ = counter.communicate(timeout=timeout)
+        encoder.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        encoder.kill()
+        counter.kill()
+        print(f"  Transfer timed out after {timeout}s")
+        return None
+    if encoder.returncode != 0 or counter.returncode != 0:
+        return None
+    try:
+        return int(out.strip())
+    except ValueError:
+        return None
+
+
+def record_transfer(backend: str, original_bytes: int, sent_bytes: int,
+                    encode_seconds: float, transfer_seconds: float):
+    """Add one file to the per-backend transfer report."""
+    with _transfer_lock:
+        stats = TRANSFER_STATS.setdefault(backend, {
+            "files": 0, "original_bytes": 0, "sent_bytes": 0, "encode_seconds": 0.0, "transfer_seconds": 0.0
+        })
+        stats["files"] += 1
+        stats["original_bytes"] += original_bytes
+        stats["sent_bytes"] += sent_bytes
+        stats["encode_seconds"] += encode_seconds
+        stats["transfer_seconds"] += transfer_seconds
+
+
+def print_transfer_report(config: dict):
+    """
+    Bytes sent per backend and the transfer time transcoding saved.
+
+    Savings are estimated from the throughput each backend's transfers
+    actually achieved, applied to the bytes that were not sent.
+    """
+    if not TRANSFER_STATS:
+        return
+    names = {b.get("url", name): b.get("name", name) for name, b in config.get("backends", {}).items()}
+    names.update({b.get("ssh_host"): b.get("name", name) for name, b in config.get("backends", {}).items()})
+
+    print("\nTransfers:")
+    for backend, stats in TRANSFER_STATS.items():
+        original_mb = stats["original_bytes"] / 1024 / 1024
+        sent_mb = stats["sent_bytes"] / 1024 / 1024
+        line = (f"  {names.get(backend, backend)}: {stats['files']} files, {original_mb:.1f} MB -> {sent_mb:.1f} MB, "
+                f"encode {stats['encode_seconds']:.1f}s, transfer {stats['transfer_seconds']:.1f}s")
+        if stats["sent_bytes"] and stats["transfer_seconds"] > 0:
+            rate = stats["sent_bytes"] / stats["transfer_seconds"]
+            saved = (stats["original_bytes"] - stats["sent_bytes"]) / rate
+            line += f", ~{saved:.0f}s of transfer saved"
+        print(line)
+
+
 def run_remote_transcription(
     audio_path: str,
     backend_config: dict,
     model: str = "large-v3",
-    preprocess: bool = True
+    preprocess: bool = True,
+    transcode: Optional[str] = None,
+    overlap: bool = False
 ) -> dict:
-    """Run transcription on a remote machine via SSH."""
+    """
+    Run transcription on a remote machine via SSH.
+
+    With transcode ('opus' or 'flac') the recording is re-encoded to 16 kHz
+    mono before it is copied; with overlap the encoder's output is piped
+    straight into ssh instead of going through a local file first.
+    """
     ssh_host = backend_config.get("ssh_host")
     remote_project = backend_config.get("remote_path", "~/voice-memo-transcriber")
     venv_path = backend_config.get("venv_path", "~/whisper-env")
 
     audio_path = Path(audio_path)
-    file_hash = compute_file_hash(str(audio_path))
+    file_hash = compute_file_hash(str(audio_path))[:16]
 
     # Remote paths
-    remote_audio = f"/tmp/transcribe_{file_hash}{audio_path.suffix}"
+    suffix = TRANSFER_CODECS[transcode][2] if transcode else audio_path.suffix
+    remote_audio = f"/tmp/transcribe_{file_hash}{suffix}"
     remote_transcript = f"/tmp/transcribe_{file_hash}.txt"
 
     print(f"\n{'='*60}")
@@ -161,11 +364,33 @@ def run_remote_transcription(
     print(f"Duration: {duration/60:.1f} minutes")
 
     # Step 1: Transfer audio to remote
-    if not transfer_file_to_remote(str(audio_path), ssh_host, remote_audio):
-        raise RuntimeError(f"Failed to transfer file to {ssh_host}")
+    original_bytes = audio_path.stat().st_size
+    encode_time = 0.0
+    if transcode and overlap:
+        print(f"  Transcoding to {transcode} while transferring to {ssh_host}...")
+        sent_bytes = stream_transcode_to_remote(audio_path, transcode, ssh_host, remote_audio)
+        if sent_bytes is None:
+            raise RuntimeError(f"Failed to transfer file to {ssh_host}")
+        encode_time = time.time() - start_time
+    else:
+        local_audio = audio_path
+        if transcode:
+            local_audio, encode_time = transcode_file(audio_path, transcode)
+            print(f"  Transcoded to {transcode} in {encode_time:.1f}s")
+        try:
+            if not transfer_file_to_remote(str(local_audio), ssh_host, remote_audio):
+                raise RuntimeError(f"Failed to transfer file to {ssh_host}")
+            sent_bytes = local_audio.stat().st_size
+        finally:
+            if local_audio != audio_path:
+                local_audio.unlink(missing_ok=True)
+                local_audio.parent.rmdir()
 
     transfer_time = time.time() - start_time
-    print(f"  Transfer completed in {transfer_time:.1f}s")
+    record_transfer(ssh_host, original_bytes, sent_bytes, encode_time,
+                    transfer_time if overlap else transfer_time - encode_time)
+    print(f"  Transfer completed in {transfer_time:.1f}s "
+          f"({original_bytes / 1024 / 1024:.1f} MB -> {sent_bytes / 1024 / 1024:.1f} MB)")
 
     # Step 2: Run transcription remotely
     print(f"  Starting remote transcription...")
@@ -268,19 +493,318 @@ def run_local_transcription(audio_path: str, model: str = "large-v3", preprocess
     )
 
 
-def run_server_transcription(audio_path: str, backend_url: str, model: str = "large-v3") -> dict:
-    """Run transcription via HTTP server API."""
+def load_upload_state() -> dict:
+    """Upload URLs of unfinished resumable uploads, keyed by server and file hash."""
+    try:
+        with open(UPLOAD_STATE_PATH) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_upload_state(state: dict):
+    with open(UPLOAD_STATE_PATH, 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def get_upload_offset(upload_url: str) -> Optional[int]:
+    """Offset the server has for an upload, or None if it no longer exists."""
+    import urllib.request
+    import urllib.error
+
+    req = urllib.request.Request(upload_url, method='HEAD', headers={'Tus-Resumable': '1.0.0'})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return int(response.headers.get('Upload-Offset', 0))
+    except urllib.error.HTTPError:
+        return None
+
+
+def get_finished_upload_job(base: str, upload_url: str) -> Optional[dict]:
+    """
+    Job queued from an upload whose final response never arrived.
+
+    Once the last byte lands the server removes the upload and queues a job
+    with the upload's id, so a HEAD on it says 404 even though nothing needs
+    sending again.
+
+    Returns:
+        A response like the final PATCH's (job_id, status, cache_hit), or
+        None if no such job exists
+    """
     import urllib.request
     import urllib.error
+
+    upload_id = upload_url.rstrip("/").rsplit("/", 1)[-1]
+    try:
+        with urllib.request.urlopen(f"{base}/job/{upload_id}", timeout=30) as response:
+            job = json.loads(response.read().decode())
+    except (urllib.error.URLError, TimeoutError, ConnectionError, json.JSONDecodeError):
+        return None
+    return {'job_id': job['id'], 'status': job['status'], 'cache_hit': bool(job.get('cache_hit'))}
+
+
+def upload_resumable(audio_path: Path, backend_url: str, fields: dict,
+                     chunk_size: int = UPLOAD_CHUNK_SIZE, max_retries: int = 8,
+                     quiet: bool = False) -> Optional[dict]:
+    """
+    Send a file with the server's resumable upload protocol.
+
+    The file is sent in chunks at explicit offsets. After a dropped connection
+    the client asks the server how far it got and continues from there, and an
+    interrupted upload is resumed on the next run. The file hash goes along
+    with the request, so audio the server has already transcribed is never sent.
+    quiet suppresses progress output (several uploads running at once).
+
+    Returns:
+        The server's response for the finished upload (queued or cached job),
+        or None if the server does not support resumable uploads
+    """
+    import urllib.request
+    import urllib.error
+    from uploads import encode_metadata
+
+    say = (lambda *a, **k: None) if quiet else print
+    base = backend_url.rstrip("/")
+    file_hash = compute_file_hash(str(audio_path))
+    size = audio_path.stat().st_size
+    state_key = f"{base}|{file_hash}"
+
+    state = load_upload_state()
+    location = state.get(state_key)
+    offset = get_upload_offset(base + location) if location else None
+    if location and offset is None:
+        # A previous run may have sent everything and lost only the reply
+        finished = get_finished_upload_job(base, base + location)
+        if finished is not None:
+            state.pop(state_key, None)
+            save_upload_state(state)
+            say("  Upload already finished on the server")
+            return finished
+
+    if offset is None:
+        metadata = {'filename': audio_path.name, 'sha256': file_hash, **fields}
+        req = urllib.request.Request(
+            base + "/uploads",
+            method='POST',
+            headers={
+                'Tus-Resumable': '1.0.0',
+                'Upload-Length': str(size),
+                'Upload-Metadata': encode_metadata(metadata)
+            }
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                data = json.loads(response.read().decode())
+                if response.status == 200:
+                    say("  Already transcribed on server (cache hit), skipping upload")
+                    return data
+                location = response.headers['Location']
+        except urllib.error.HTTPError as e:
+            if e.code in (404, 405):
+                return None
+            raise RuntimeError(f"Upload rejected ({e.code}): {e.read().decode(errors='replace')}")
+
+        offset = 0
+        state[state_key] = location
+        save_upload_state(state)
+    else:
+        say(f"  Resuming upload at {offset / size:.0%}")
+
+    upload_url = base + location
+    failures = 0
+    with open(audio_path, 'rb') as f:
+        while True:
+            f.seek(offset)
+            chunk = f.read(chunk_size)
+            last = offset + len(chunk) >= size
+            req = urllib.request.Request(
+                upload_url,
+                data=chunk,
+                method='PATCH',
+                headers={
+                    'Tus-Resumable': '1.0.0',
+                    'Upload-Offset': str(offset),
+                    'Content-Type': 'application/offset+octet-stream'
+                }
+            )
+            try:
+                with urllib.request.urlopen(req, timeout=120) as response:
+                    offset = int(response.headers.get('Upload-Offset', offset + len(chunk)))
+                    body = response.read()
+                failures = 0
+                say(f"  Uploaded {offset / size:.0%} ({offset / 1024 / 1024:.1f} MB)", end="\r")
+                if offset >= size:
+                    say()
+                    state.pop(state_key, None)
+                    save_upload_state(state)
+                    return json.loads(body.decode()) if body else {}
+                continue
+            except urllib.error.HTTPError as e:
+                if e.code != 409:
+                    state.pop(state_key, None)
+                    save_upload_state(state)
+                    raise RuntimeError(f"Upload failed ({e.code}): {e.read().decode(errors='replace')}")
+            except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                failures += 1
+                if failures > max_retries:
+                    raise BackendUnavailable(f"Upload failed after {max_retries} retries: {e}")
+                wait = min(30, 2 ** failures)
+                say(f"\n  Connection problem ({e}), retrying in {wait}s...")
+                time.sleep(wait)
+
+            # Ask the server where to continue from
+            offset = get_upload_offset(upload_url)
+            if offset is None:
+                state.pop(state_key, None)
+                save_upload_state(state)
+                # The last chunk may have arrived and only the reply been lost
+                finished = get_finished_upload_job(base, upload_url) if last else None
+                if finished is not None:
+                    say()
+                    return finished
+                raise RuntimeError("Upload expired on the server")
+
+
+def upload_transcoding(audio_path: Path, backend_url: str, fields: dict, codec: str,
+                       chunk_size: int = UPLOAD_CHUNK_SIZE, max_retries: int = 8,
+                       quiet: bool = False) -> Optional[tuple]:
+    """
+    Encode a recording to 16 kHz mono and upload it at the same time.
+
+    The upload is created with a deferred length. FFmpeg's output is spooled
+    to a temporary file by a background thread while full chunks are sent
+    from it, and the length is declared with the last chunk. The server
+    decodes the Ogg/FLAC stream as it arrives, so encoding, transfer and
+    decoding all overlap. After a dropped connection the upload resumes from
+    the server's offset out of the spool.
+
+    Returns:
+        Tuple of (server response, bytes sent, seconds spent encoding), or
+        None if the server does not support deferred-length uploads
+    """
+    import urllib.request
+    import urllib.error
+    from uploads import encode_metadata
+
+    say = (lambda *a, **k: None) if quiet else print
+    base = backend_url.rstrip("/")
+    metadata = {'filename': audio_path.stem + TRANSFER_CODECS[codec][2], **fields}
+    req = urllib.request.Request(
+        base + "/uploads",
+        method='POST',
+        headers={
+            'Tus-Resumable': '1.0.0',
+            'Upload-Defer-Length': '1',
+            'Upload-Metadata': encode_metadata(metadata)
+        }
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            upload_url = base + response.headers['Location']
+    except urllib.error.HTTPError as e:
+        if e.code in (400, 404, 405):
+            return None  # no resumable uploads, or lengths must be known up front
+        raise RuntimeError(f"Upload rejected ({e.code}): {e.read().decode(errors='replace')}")
+
+    spool_dir = Path(tempfile.mkdtemp(prefix="transcode_"))
+    spool_path = spool_dir / metadata['filename']
+    started = time.time()
+    encoder = subprocess.Popen(transcode_command(str(audio_path), codec), stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    cond = threading.Condition()
+    spooled = {'size': 0, 'done': False, 'seconds': 0.0}
+
+    def pump():
+        with open(spool_path, 'wb') as out:
+            for data in iter(lambda: encoder.stdout.read(64 * 1024), b''):
+                out.write(data)
+                out.flush()
+                with cond:
+                    spooled['size'] += len(data)
+                    cond.notify_all()
+        encoder.wait()
+        with cond:
+            spooled['done'] = True
+            spooled['seconds'] = time.time() - started
+            cond.notify_all()
+
+    pump_thread = threading.Thread(target=pump, daemon=True)
+    pump_thread.start()
+
+    offset = 0
+    failures = 0
+    try:
+        with open(spool_path, 'rb') as f:
+            while True:
+                with cond:
+                    while not spooled['done'] and spooled['size'] - offset < chunk_size:
+                        cond.wait()
+                    size, done = spooled['size'], spooled['done']
+                if done and encoder.returncode != 0:
+                    error = encoder.stderr.read().decode(errors='replace').strip()[-500:]
+                    raise RuntimeError(f"Transcode failed: {error}")
+
+                f.seek(offset)
+                chunk = f.read(min(chunk_size, size - offset))
+                last = done and offset + len(chunk) >= size
+                headers = {
+                    'Tus-Resumable': '1.0.0',
+                    'Upload-Offset': str(offset),
+                    'Content-Type': 'application/offset+octet-stream'
+                }
+                if last:
+                    headers['Upload-Length'] = str(size)
+                req = urllib.request.Request(upload_url, data=chunk, method='PATCH', headers=headers)
+                try:
+                    with urllib.request.urlopen(req, timeout=120) as response:
+                        offset = int(response.headers.get('Upload-Offset', offset + len(chunk)))
+                        body = response.read()
+                    failures = 0
+                    say(f"  Sent {offset / 1024 / 1024:.1f} MB{'' if done else ' (still encoding)'}", end="\r")
+                    if last and offset >= size:
+                        say()
+                        return (json.loads(body.decode()) if body else {}), size, spooled['seconds']
+                    continue
+                except urllib.error.HTTPError as e:
+                    if e.code != 409:
+                        raise RuntimeError(f"Upload failed ({e.code}): {e.read().decode(errors='replace')}")
+                except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                    failures += 1
+                    if failures > max_retries:
+                        raise BackendUnavailable(f"Upload failed after {max_retries} retries: {e}")
+                    wait = min(30, 2 ** failures)
+                    say(f"\n  Connection problem ({e}), retrying in {wait}s...")
+                    time.sleep(wait)
+
+                # Ask the server where to continue from
+                offset = get_upload_offset(upload_url)
+                if offset is None:
+                    # The last chunk may have arrived and only the reply been lost
+                    finished = get_finished_upload_job(base, upload_url) if last else None
+                    if finished is not None:
+                        say()
+                        return finished, size, spooled['seconds']
+                    raise RuntimeError("Upload expired on the server")
+    finally:
+        if encoder.poll() is None:
+            encoder.kill()
+        pump_thread.join(timeout=5)
+        spool_path.unlink(missing_ok=True)
+        spool_dir.rmdir()
+
+
+def upload_multipart(audio_path: Path, backend_url: str, model: str,
+                     source_sha256: Optional[str] = None, source_codec: Optional[str] = None) -> dict:
+    """
+    Send a file to /transcribe in a single multipart request.
+    source_sha256 and source_codec are the original recording's hash and the
+    codec used when audio_path is a re-encoded copy.
+    """
+    import urllib.request
     from urllib.parse import urljoin
 
     url = urljoin(backend_url.rstrip("/") + "/", "transcribe")
-    audio_path = Path(audio_path)
-
-    print(f"\n{'='*60}")
-    print(f"Server Transcription: {audio_path.name}")
-    print(f"Backend: {backend_url}")
-    print(f"{'='*60}")
 
     # Build multipart form data
     boundary = "----WebKitFormBoundary" + hashlib.md5(str(time.time()).encode()).hexdigest()[:16]
@@ -303,6 +827,13 @@ def run_server_transcription(audio_path: str, backend_url: str, model: str = "la
     body.append(b'')
     body.append(model.encode())
 
+    if source_sha256 and source_codec:
+        for name, value in (('source_sha256', source_sha256), ('source_codec', source_codec)):
+            body.append(f'--{boundary}'.encode())
+            body.append(f'Content-Disposition: form-data; name="{name}"'.encode())
+            body.append(b'')
+            body.append(value.encode())
+
     body.append(f'--{boundary}--'.encode())
     body.append(b'')
 
@@ -318,78 +849,326 @@ def run_server_transcription(audio_path: str, backend_url: str, model: str = "la
         method='POST'
     )
 
-    try:
-        print("  Uploading file to server...")
-        with urllib.request.urlopen(req, timeout=300) as response:
-            data = json.loads(response.read().decode())
+    with urllib.request.urlopen(req, timeout=300) as response:
+        return json.loads(response.read().decode())
+
+
+def save_transcript(audio_path: Path, text: str) -> Path:
+    """Write a transcript next to the others, named after the recording."""
+    local_transcript = TRANSCRIPTS_DIR / f"{audio_path.stem}.txt"
+    TRANSCRIPTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(local_transcript, 'w') as f:
+        f.write(text)
+    return local_transcript
+
+
+def poll_job(backend_url: str, job_id: str, on_update=None) -> dict:
+    """
+    Poll a job every 2 s until it finishes, for servers without /jobs/wait.
+
+    Short outages (e.g. the server restarting and resuming its jobs) are
+    ridden out; if the server stays unreachable for POLL_GRACE_SECONDS the
+    job is given up with BackendUnavailable so it can be run elsewhere.
+    """
+    import urllib.request
+    import urllib.error
+    from urllib.parse import urljoin
+
+    job_url = urljoin(backend_url.rstrip("/") + "/", f"job/{job_id}")
+    unreachable_since = None
+    while True:
+        job_req = urllib.request.Request(job_url, method='GET')
+        try:
+            with urllib.request.urlopen(job_req, timeout=30) as job_resp:
+                job_data = json.loads(job_resp.read().decode())
+            unreachable_since = None
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            unreachable_since = unreachable_since or time.time()
+            if time.time() - unreachable_since > POLL_GRACE_SECONDS:
+                raise BackendUnavailable(f"Lost contact with server: {e}")
+            time.sleep(5)
+            continue
+
+        if on_update:
+            on_update(job_data)
+        if job_data.get("status") in ("completed", "error", "cancelled"):
+            return job_data
+        time.sleep(2)
+
+
+def wait_for_job(backend_url: str, job_id: str, audio_path: Path, quiet: bool = False) -> dict:
+    """
+    Wait for a server job to finish, then save the transcript locally.
+
+    Completion is pushed through the server's /jobs/wait long-poll, which
+    the shared tracker keeps open on one connection for every job this
+    process is following; older servers are polled instead.
+    """
+    def show(job: dict):
+        print(f"  [{job.get('progress', 0)}%] {job.get('message', '')}", end="\r")
 
-            if "job_id" in data:
-                job_id = data["job_id"]
-                print(f"  Job started: {job_id}")
+    on_update = None if quiet else show
+    try:
+        job_data = tracker_for(backend_url).wait(job_id, on_update)
+    except LongPollUnsupported:
+        job_data = poll_job(backend_url, job_id, on_update)
 
-                # Poll for completion
-                job_url = urljoin(backend_url.rstrip("/") + "/", f"job/{job_id}")
-                while True:
-                    time.sleep(2)
-                    job_req = urllib.request.Request(job_url, method='GET')
-                    with urllib.request.urlopen(job_req, timeout=30) as job_resp:
-                        job_data = json.loads(job_resp.read().decode())
+    status = job_data.get("status")
+    if not quiet:
+        print()
 
-                        status = job_data.get("status")
-                        progress = job_data.get("progress", 0)
-                        message = job_data.get("message", "")
+    if status == "completed":
+        result = job_data.get("result", {})
+        result["transcript_path"] = str(save_transcript(audio_path, result.get("transcript", "")))
+        return result
 
-                        print(f"  [{progress}%] {message}", end="\r")
+    elif status == "error":
+        raise RuntimeError(job_data.get("error", "Unknown error"))
 
-                        if status == "completed":
-                            print()
-                            result = job_data.get("result", {})
+    raise RuntimeError("Job was cancelled on the server")
 
-                            # Save transcript locally
-                            transcript_text = result.get("transcript", "")
-                            local_transcript = TRANSCRIPTS_DIR / f"{audio_path.stem}.txt"
-                            TRANSCRIPTS_DIR.mkdir(parents=True, exist_ok=True)
-                            with open(local_transcript, 'w') as f:
-                                f.write(transcript_text)
 
-                            result["transcript_path"] = str(local_transcript)
-                            return result
+def run_server_transcription(audio_path: str, backend_url: str, model: str = "large-v3",
+                             quiet: bool = False, transcode: Optional[str] = None,
+                             overlap: bool = False) -> dict:
+    """
+    Run transcription via HTTP server API.
 
-                        elif status == "error":
-                            raise RuntimeError(job_data.get("error", "Unknown error"))
+    With transcode ('opus' or 'flac') the recording is re-encoded to 16 kHz
+    mono first, and sent as is if that does not make it smaller; with overlap
+    it is encoded while it uploads. Raises BackendUnavailable when the server
+    cannot be reached, so batch dispatch can retry the file on another
+    backend. quiet drops the banner and progress lines.
+    """
+    import urllib.error
 
-            return data
+    audio_path = Path(audio_path)
+    fields = {'model': model}
+    original_bytes = audio_path.stat().st_size
+
+    if not quiet:
+        print(f"\n{'='*60}")
+        print(f"Server Transcription: {audio_path.name}")
+        print(f"Backend: {backend_url}")
+        print(f"{'='*60}")
+        print("  Uploading file to server...")
 
-    except urllib.error.URLError as e:
+    # Sent along with a re-encoded copy: the server caches its result under
+    # the original recording's hash, marked with the codec
+    source = {}
+    if transcode:
+        source = {'source_sha256': compute_file_hash(str(audio_path)), 'source_codec': transcode}
+        cached = lookup_server_cache({"url": backend_url}, source['source_sha256'], model, codec=transcode)
+        if cached is not None and cached.get("transcript") is not None:
+            if not quiet:
+                print("  Already transcribed on server (cache hit), skipping encode and upload")
+            result = dict(cached)
+            result["transcript_path"] = str(save_transcript(audio_path, result["transcript"]))
+            return result
+
+    upload_path = audio_path
+    try:
+        start = time.time()
+        streamed = None
+        encode_time = 0.0
+        if transcode and overlap:
+            streamed = upload_transcoding(audio_path, backend_url, {**fields, **source}, transcode, quiet=quiet)
+        if streamed is not None:
+            data, sent_bytes, encode_time = streamed
+            transfer_time = time.time() - start
+        else:
+            if transcode:
+                encoded, encode_time = transcode_file(audio_path, transcode)
+                if encoded.stat().st_size < original_bytes:
+                    upload_path = encoded
+                    fields.update(filename=encoded.name, **source)
+                else:
+                    encoded.unlink()
+                    encoded.parent.rmdir()
+            transfer_start = time.time()
+            data = upload_resumable(upload_path, backend_url, fields, quiet=quiet)
+            if data is None:
+                # Older server without resumable uploads
+                data = upload_multipart(upload_path, backend_url, model,
+                                        fields.get('source_sha256'), fields.get('source_codec'))
+            sent_bytes = upload_path.stat().st_size
+            transfer_time = time.time() - transfer_start
+
+        if not data.get("cache_hit"):  # cache hits are normally answered before any audio moves
+            record_transfer(backend_url, original_bytes, sent_bytes, encode_time, transfer_time)
+        if transcode and not quiet:
+            print(f"  Sent {sent_bytes / 1024 / 1024:.1f} MB instead of {original_bytes / 1024 / 1024:.1f} MB "
+                  f"(encode {encode_time:.1f}s, transfer {transfer_time:.1f}s)")
+
+        if "job_id" in data:
+            if not quiet:
+                print(f"  Job started: {data['job_id']}")
+            return wait_for_job(backend_url, data["job_id"], audio_path, quiet=quiet)
+
+        return data
+
+    except urllib.error.HTTPError as e:
         raise RuntimeError(f"Server request failed: {e}")
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+        raise BackendUnavailable(f"Server request failed: {e}")
+    finally:
+        if upload_path != audio_path:
+            upload_path.unlink(missing_ok=True)
+            upload_path.parent.rmdir()
+
+
+def lookup_server_cache(backend: dict, file_hash: str, model: str, timeout: int = 5,
+                        codec: Optional[str] = None) -> Optional[dict]:
+    """
+    A server's cached result for this audio and model, or None.
+    With codec, a result transcribed from a copy re-encoded with that codec
+    also counts; otherwise only results from the original bytes do.
+    """
+    import urllib.request
+    import urllib.error
+    import urllib.parse
+
+    query = {"model": model, **({"codec": codec} if codec else {})}
+    url = backend.get("url", "").rstrip("/") + f"/cache/{file_hash}?" + urllib.parse.urlencode(query)
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            data = json.loads(response.read().decode())
+    except (urllib.error.URLError, TimeoutError, ConnectionError, json.JSONDecodeError):
+        return None  # 404 (not cached), an older server, or unreachable
+    return data.get("result") if data.get("cached") else None
+
 
+def lookup_supabase(file_hash: str) -> Optional[dict]:
+    """
+    Transcript of a completed memo with this hash in Supabase, or None.
+    Also None when Supabase is not set up here or cannot be reached.
+    """
+    import importlib.util
+
+    if importlib.util.find_spec("supabase") is None:
+        return None
+    try:
+        from sync_to_supabase import SUPABASE_URL, SUPABASE_KEY, get_memo_by_hash, get_transcript_by_memo
+    except ImportError:
+        return None
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        return None
 
-def select_best_backend(config: dict) -> tuple[str, dict]:
-    """Select the best available backend based on priority and availability."""
+    try:
+        memo = get_memo_by_hash(file_hash)
+        if not memo or memo.get("status") != "completed":
+            return None
+        transcript = get_transcript_by_memo(memo["id"])
+    except Exception:
+        return None  # the lookup only saves work; on any error just transcribe
+    if not transcript:
+        return None
+    return {"transcript": transcript["transcript_text"], "model": memo.get("model_used")}
+
+
+def find_existing_transcript(audio_path: Path, backends: dict, model: str,
+                             timeout: int = 5, codec: Optional[str] = None) -> Optional[tuple[str, dict]]:
+    """
+    Ask every given server's result cache and Supabase, all at once, whether
+    this recording was already transcribed anywhere. The first to answer
+    with a transcript wins.
+
+    Args:
+        backends: Reachable backends by name
+        model: Only server results from this model count; Supabase holds
+            one transcript per memo, which is taken whatever its model
+        codec: Transfer codec this run would re-encode with; server results
+            from copies sent with it count too
+
+    Returns:
+        Tuple of (where it was found, result with a 'transcript'), or None
+    """
+    file_hash = compute_file_hash(str(audio_path))
+    lookups = {backend.get("name", name): (lambda b=backend: lookup_server_cache(b, file_hash, model, timeout, codec))
+               for name, backend in backends.items()}
+    lookups["Supabase"] = lambda: lookup_supabase(file_hash)
+
+    executor = ThreadPoolExecutor(max_workers=len(lookups))
+    futures = {executor.submit(lookup): source for source, lookup in lookups.items()}
+    try:
+        for future in as_completed(futures):
+            result = future.result()
+            if result and result.get("transcript") is not None:
+                return futures[future], result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None
+
+
+def reuse_existing_transcripts(files: list, config: dict, model: str, codec: Optional[str] = None) -> list:
+    """
+    Save transcripts that already exist on any server or in Supabase instead
+    of transcribing those files again.
+
+    Returns:
+        The files that still need transcribing
+    """
     backends = config.get("backends", {})
     timeout = config.get("health_check_timeout", 5)
+    health = probe_backends(backends, timeout)
+    reachable = {name: backends[name] for name, h in health.items() if h["available"]}
 
-    available = []
+    with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+        hits = list(executor.map(
+            lambda f: find_existing_transcript(Path(f), reachable, model, timeout, codec), files))
 
-    for name, backend in backends.items():
-        if not backend.get("enabled", True):
+    remaining = []
+    for file_path, hit in zip(files, hits):
+        if hit is None:
+            remaining.append(file_path)
             continue
+        source, result = hit
+        transcript_path = save_transcript(Path(file_path), result["transcript"])
+        print(f"{Path(file_path).name}: already transcribed ({source}), saved {transcript_path}")
+    return remaining
+
+
+def select_best_backend(config: dict, duration: Optional[float] = None,
+                        model: str = "large-v3") -> tuple[str, dict]:
+    """
+    Select the best available backend.
+
+    Given the recording's duration, each server is asked when it would finish
+    the job (its learned speed plus its current queue) and the soonest wins.
+    Servers that cannot estimate rank after those that can; ties and SSH-only
+    fallbacks go by configured priority. Health checks and estimates run in
+    parallel, and health comes from the cache when it is recent.
+    """
+    backends = config.get("backends", {})
+    timeout = config.get("health_check_timeout", 5)
+
+    health = probe_backends(backends, timeout)
+    up = [name for name, h in health.items() if h["available"]]
 
-        health = check_backend_health(backend, timeout)
-        if health["available"]:
-            available.append({
-                "name": name,
-                "config": backend,
-                "priority": backend.get("priority", 99),
-                "gpu": health.get("gpu", False)
-            })
+    estimates = {}
+    if duration and up:
+        with ThreadPoolExecutor(max_workers=len(up)) as executor:
+            futures = {name: executor.submit(get_backend_estimate, backends[name], duration, model, timeout)
+                       for name in up}
+        estimates = {name: future.result() for name, future in futures.items()}
+
+    available = []
+    for name in up:
+        estimate = estimates.get(name)
+        available.append({
+            "name": name,
+            "config": backends[name],
+            "priority": backends[name].get("priority", 99),
+            "gpu": health[name].get("gpu", False),
+            "completion": estimate.get("estimated_completion_seconds") if estimate else None
+        })
 
     if not available:
         # Try SSH fallback for remote backends
-        for name, backend in backends.items():
-            if not backend.get("enabled", True):
-                continue
-            if backend.get("ssh_host") and check_ssh_connection(backend["ssh_host"]):
+        ssh_backends = {name: b for name, b in backends.items() if b.get("ssh_host")}
+        for name, h in probe_backends(ssh_backends, timeout, ssh=True).items():
+            backend = backends[name]
+            if h.get("ssh"):
                 available.append({
                     "name": name,
                     "config": backend,
@@ -400,44 +1179,120 @@ def select_best_backend(config: dict) -> tuple[str, dict]:
     if not available:
         raise RuntimeError("No backends available. Start a server or check SSH connections.")
 
-    # Sort by priority (lower = better)
-    available.sort(key=lambda x: x["priority"])
+    # Soonest estimated completion first, then priority (lower = better)
+    available.sort(key=lambda x: (x.get("completion") is None, x.get("completion") or 0, x["priority"]))
     best = available[0]
+    if best.get("completion") is not None:
+        print(f"Estimated {best['completion']/60:.1f} min on {best['config'].get('name', best['name'])}")
 
     return best["name"], best["config"]
 
 
+def dispatch_backends(config: dict, model: str) -> list:
+    """
+    Every reachable server, with its expected speed for this model.
+
+    Speed comes from the server's own estimator (falling back to typical
+    real-time factors for its device), the number of parallel jobs from its
+    scheduler, and any work it already has queued delays its first file.
+    """
+    backends = config.get("backends", {})
+    timeout = config.get("health_check_timeout", 5)
+
+    health_by_name = {name: h for name, h in probe_backends(backends, timeout).items() if h["available"]}
+    if not health_by_name:
+        return []
+    with ThreadPoolExecutor(max_workers=len(health_by_name)) as executor:
+        futures = {name: executor.submit(get_backend_estimate, backends[name], PROBE_DURATION, model, timeout)
+                   for name in health_by_name}
+
+    available = []
+    for name, health in health_by_name.items():
+        backend = backends[name]
+        estimate = futures[name].result()
+        queue = health.get("queue", {})
+        if estimate:
+            rate = PROBE_DURATION / max(estimate["estimated_seconds"], 1.0)
+            workers = queue.get(estimate.get("backend"), {}).get("workers", 1)
+            delay = estimate.get("queue_wait_seconds", 0.0)
+        else:
+            device = "mlx" if health.get("backend_type") == "mlx" else "cuda" if health.get("gpu") else "cpu"
+            rate = 1 / DEVICE_RTF[device]
+            workers = max([q.get("workers", 1) for q in queue.values()] or [1])
+            delay = 0.0
+        available.append(DispatchBackend(name, backend, rate, workers, delay))
+
+    return available
+
+
+def dispatch_batch(files: list, config: dict, model: str = "large-v3",
+                   transcode: Optional[str] = None, overlap: bool = False) -> Optional[dict]:
+    """
+    Transcribe a batch on all reachable servers at once.
+
+    Files are shared out by expected throughput, a server that runs out of
+    work takes queued files from the one furthest behind, and a file whose
+    server drops out is retried on another.
+
+    Returns:
+        Dict of path -> result dict or exception, or None if no server is
+        reachable (the caller falls back to one backend at a time)
+    """
+    backends = dispatch_backends(config, model)
+    if not backends:
+        return None
+
+    print(f"Dispatching {len(files)} files across "
+          + ", ".join(f"{b.label} ({b.rate:.1f}x, {b.workers} at once)" for b in backends))
+
+    def transcribe(path: Path, backend: dict) -> dict:
+        try:
+            return run_server_transcription(str(path), backend["url"], model, quiet=True,
+                                            transcode=transcode, overlap=overlap)
+        except BackendUnavailable:
+            get_health_cache().record_failure(f"http {backend['url']}")
+            raise
+
+    dispatcher = BatchDispatcher(backends, transcribe)
+    results = dispatcher.run([(Path(f), get_audio_duration(f)) for f in files])
+
+    print(f"\n{'='*60}")
+    for row in dispatcher.summary():
+        state = "" if row["healthy"] else " (dropped out)"
+        print(f"  {row['backend']}: {row['files']} files, {row['audio_minutes']} min, "
+              f"{row['stolen']} taken from others, {row['rate']:.1f}x real-time{state}")
+    print(f"{'='*60}")
+    return {str(path): result for path, result in results.items()}
+
+
 def show_status(config: dict):
-    """Show status of all configured backends."""
+    """Show status of all configured backends (probed fresh, in parallel)."""
     backends = config.get("backends", {})
     timeout = config.get("health_check_timeout", 5)
+    health = probe_backends(backends, timeout, ssh=True, refresh=True)
 
     print("\nBackend Status:")
     print("="*60)
 
     for name, backend in backends.items():
-        enabled = backend.get("enabled", True)
         status_parts = []
 
-        if not enabled:
+        if name not in health:
             status_parts.append("DISABLED")
         else:
-            # Check HTTP server
-            health = check_backend_health(backend, timeout)
-            if health["available"]:
-                status_parts.append("SERVER: OK")
-                if health.get("gpu"):
+            # HTTP server
+            h = health[name]
+            if h["available"]:
+                status_parts.append(f"SERVER: OK ({h['latency_ms']:.0f} ms)")
+                if h.get("gpu"):
                     status_parts.append("GPU")
+                status_parts.append(f"{h.get('active_jobs', 0)} active")
             else:
                 status_parts.append("SERVER: offline")
 
-            # Check SSH if configured
-            ssh_host = backend.get("ssh_host")
-            if ssh_host:
-                if check_ssh_connection(ssh_host):
-                    status_parts.append("SSH: OK")
-                else:
-                    status_parts.append("SSH: no connection")
+            # SSH if configured
+            if backend.get("ssh_host"):
+                status_parts.append("SSH: OK" if h.get("ssh") else "SSH: no connection")
 
         priority = backend.get("priority", 99)
         status_str = " | ".join(status_parts)
@@ -456,7 +1311,7 @@ Examples:
   %(prog)s audio/memo.m4a --backend asus     # Use ASUS GPU backend
   %(prog)s audio/memo.m4a --backend local    # Use local Mac (MLX)
   %(prog)s --status                          # Show backend status
-  %(prog)s audio/*.m4a --auto                # Batch process with auto selection
+  %(prog)s audio/*.m4a                       # Batch across all available servers
         """
     )
 
@@ -471,6 +1326,16 @@ Examples:
                         help="Show status of all backends")
     parser.add_argument("--config", type=Path, default=CONFIG_PATH,
                         help="Path to config file")
+    parser.add_argument("--transcode", choices=["opus", "flac"],
+                        help="Re-encode to 16 kHz mono before sending: opus (small) or flac (lossless). "
+                             "Defaults to the config's \"transcode\" setting")
+    parser.add_argument("--overlap", action="store_true",
+                        help="With --transcode, send audio while it is still being encoded")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Transcribe even if a server or Supabase already has a transcript")
+    parser.add_argument("--sequential", action="store_true",
+                        help="With several files, send each to the single best backend in turn "
+                             "instead of spreading the batch across all servers")
 
     args = parser.parse_args()
 
@@ -496,12 +1361,37 @@ Examples:
             print(f"Error: File not found: {file_path}")
             return 1
 
+    transcode = args.transcode or config.get("transcode")
+
+    # Recordings transcribed before, on any machine, are fetched rather than re-sent
+    files = args.files
+    if not args.no_dedup:
+        files = reuse_existing_transcripts(files, config, args.model, transcode)
+        if not files:
+            return 0
+
+    # Batches go to every reachable server at once
+    if args.backend == "auto" and len(files) > 1 and not args.sequential:
+        results = dispatch_batch(files, config, args.model, transcode, args.overlap)
+        if results is not None:
+            failed = 0
+            for file_path in files:
+                result = results.get(str(Path(file_path)))
+                if isinstance(result, Exception) or result is None:
+                    failed += 1
+                    print(f"Error transcribing {file_path}: {result or 'not processed'}")
+            print(f"{len(files) - failed}/{len(files)} transcribed")
+            print_transfer_report(config)
+            return 1 if failed else 0
+        print("No server reachable, falling back to one file at a time")
+
     # Process each file
-    for file_path in args.files:
+    for file_path in files:
         try:
             # Select backend
             if args.backend == "auto":
-                backend_name, backend_config = select_best_backend(config)
+                backend_name, backend_config = select_best_backend(config, get_audio_duration(file_path),
+                                                                   args.model)
                 print(f"Auto-selected backend: {backend_config.get('name', backend_name)}")
             else:
                 backend_name = args.backend
@@ -519,12 +1409,15 @@ Examples:
                 )
             elif backend_config.get("ssh_host"):
                 # Check if server is available first
-                health = check_backend_health(backend_config)
+                health = probe_backends({backend_name: backend_config}, config.get("health_check_timeout", 5))
+                health = health.get(backend_name, {"available": False})
                 if health["available"]:
                     result = run_server_transcription(
                         file_path,
                         backend_config["url"],
-                        model=args.model
+                        model=args.model,
+                        transcode=transcode,
+                        overlap=args.overlap
                     )
                 else:
                     # Fall back to SSH
@@ -532,14 +1425,18 @@ Examples:
                         file_path,
                         backend_config,
                         model=args.model,
-                        preprocess=not args.no_preprocess
+                        preprocess=not args.no_preprocess,
+                        transcode=transcode,
+                        overlap=args.overlap
                     )
             else:
                 # Use HTTP server
                 result = run_server_transcription(
                     file_path,
                     backend_config["url"],
-                    model=args.model
+                    model=args.model,
+                    transcode=transcode,
+                    overlap=args.overlap
                 )
 
             if result.get("success", True):
@@ -547,9 +1444,10 @@ Examples:
 
         except Exception as e:
             print(f"Error transcribing {file_path}: {e}")
-            if len(args.files) == 1:
+            if len(files) == 1:
                 return 1
 
+    print_transfer_report(config)
     return 0
 
 
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Resumable uploads (tus 1.0 style) for the transcription server.
+Bytes are appended at explicit offsets and hashed as they arrive, so an
+interrupted transfer resumes where it stopped and the SHA-256 is ready the
+moment the last byte lands. The total length may be deferred until the last
+chunk, so a client can send audio while it is still encoding it. Upload
+state survives server restarts.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Upload request that cannot be applied; carries the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_metadata(header: Optional[str]) -> dict:
+    """Decode a tus Upload-Metadata header ("key base64value,key2 base64value")."""
+    metadata = {}
+    for pair in (header or '').split(','):
+        parts = pair.strip().split(' ', 1)
+        if not parts[0]:
+            continue
+        try:
+            metadata[parts[0]] = base64.b64decode(parts[1]).decode() if len(parts) > 1 else ''
+        except (ValueError, UnicodeDecodeError):
+            raise UploadError(f"Invalid Upload-Metadata value for {parts[0]}")
+    return metadata
+
+
+def encode_metadata(metadata: dict) -> str:
+    """Encode a dict as a tus Upload-Metadata header."""
+    return ','.join(f"{k} {base64.b64encode(str(v).encode()).decode()}" for k, v in metadata.items())
+
+
+class Upload:
+    """State of one in-progress upload."""
+
+    def __init__(self, upload_id: str, path: Path, length: Optional[int], metadata: dict, created_at: float):
+        self.id = upload_id
+        self.path = path
+        self.length = length
+        self.metadata = metadata
+        self.created_at = created_at
+        self.updated_at = created_at
+        self.offset = 0
+        self.hasher = hashlib.sha256()
+        self.lock = threading.Lock()
+
+    @property
+    def complete(self) -> bool:
+        return self.length is not None and self.offset >= self.length
+
+    @property
+    def state_path(self) -> Path:
+        return self.path.with_name(self.path.name + '.upload.json')
+
+
+class UploadManager:
+    """
+    Tracks resumable uploads written into a directory.
+
+    Each upload is a partial file plus a small JSON sidecar. After a restart
+    the sidecar is reloaded and the hash is rebuilt from the bytes on disk.
+    """
+
+    def __init__(self, upload_dir: Path, max_size: int):
+        """
+        Args:
+            upload_dir: Directory partial and finished uploads are written to
+            max_size: Largest accepted Upload-Length in bytes
+        """
+        self.upload_dir = Path(upload_dir)
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self._uploads = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Pick up uploads that were in progress before a restart."""
+        for state_path in self.upload_dir.glob('*.upload.json'):
+            try:
+                with open(state_path) as f:
+                    state = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            path = self.upload_dir / state['file']
+            upload = Upload(state['id'], path, state['length'], state['metadata'], state['created_at'])
+            if path.exists():
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        upload.hasher.update(chunk)
+                        upload.offset += len(chunk)
+            upload.updated_at = state_path.stat().st_mtime
+            self._uploads[upload.id] = upload
+
+    def _check_length(self, length: int):
+        if length <= 0:
+            raise UploadError("Upload-Length must be a positive integer")
+        if length > self.max_size:
+            raise UploadError(f"Upload exceeds {self.max_size // (1024 * 1024)} MB limit", 413)
+
+    @staticmethod
+    def _write_state(upload: Upload):
+        with open(upload.state_path, 'w') as f:
+            json.dump({
+                'id': upload.id,
+                'file': upload.path.name,
+                'length': upload.length,
+                'metadata': upload.metadata,
+                'created_at': upload.created_at,
+            }, f)
+
+    def create(self, upload_id: str, filename: str, length: Optional[int], metadata: dict) -> Upload:
+        """
+        Register a new upload written to <upload_dir>/<upload_id>_<filename>.
+
+        Args:
+            length: Total size in bytes, or None to learn it later (set_length)
+
+        Raises:
+            UploadError: Length negative or over the size limit
+        """
+        if length is not None:
+            self._check_length(length)
+
+        path = self.upload_dir / f"{upload_id}_{filename}"
+        upload = Upload(upload_id, path, length, metadata, time.time())
+        path.touch()
+        self._write_state(upload)
+
+        with self._lock:
+            self._uploads[upload_id] = upload
+        return upload
+
+    def set_length(self, upload: Upload, length: int):
+        """
+        Fix the total size of an upload created with a deferred length.
+
+        Raises:
+            UploadError: Length already set to something else, shorter than
+                what has arrived, or over the size limit
+        """
+        if upload.length is not None:
+            if upload.length != length:
+                raise UploadError("Upload-Length cannot be changed", 409)
+            return
+        self._check_length(length)
+        if length < upload.offset:
+            raise UploadError(f"Upload-Length {length} is less than the {upload.offset} bytes received", 409)
+        upload.length = length
+        self._write_state(upload)
+
+    def get(self, upload_id: str) -> Optional[Upload]:
+        with self._lock:
+            return self._uploads.get(upload_id)
+
+    def append(self, upload: Upload, offset: int, stream,
+               on_data: Optional[Callable[[bytes], None]] = None) -> int:
+        """
+        Write bytes from stream at offset, hashing them as they arrive.
+
+        If the connection drops mid-request, whatever arrived is kept and the
+        client resumes from the returned offset.
+
+        Args:
+            upload: Upload to append to
+            offset: Offset the client believes the upload is at
+            stream: File-like request body
+            on_data: Called with each chunk after it is written
+
+        Returns:
+            The new offset
+
+        Raises:
+            UploadError: 409 if the offset does not match or another request
+                is already writing to this upload, 413 if an upload of
+                deferred length reaches the size limit
+        """
+        if not upload.lock.acquire(blocking=False):
+            raise UploadError("Upload is already receiving data", 409)
+        try:
+            if offset != upload.offset:
+                raise UploadError(f"Upload-Offset {offset} does not match current offset {upload.offset}", 409)
+
+            # Until the length is known, only the size limit bounds the upload
+            limit = upload.length if upload.length is not None else self.max_size
+            with open(upload.path, 'ab') as f:
+                while upload.offset < limit:
+                    try:
+                        data = stream.read(min(CHUNK_SIZE, limit - upload.offset))
+                    except Exception:
+                        break  # connection dropped; keep what arrived
+                    if not data:
+                        break
+                    f.write(data)
+                    upload.hasher.update(data)
+                    upload.offset += len(data)
+                    if on_data:
+                        on_data(data)
+
+            if upload.length is None and upload.offset >= self.max_size:
+                raise UploadError(f"Upload exceeds {self.max_size // (1024 * 1024)} MB limit", 413)
+
+            upload.updated_at = time.time()
+            upload.state_path.touch()
+            return upload.offset
+        finally:
+            upload.lock.release()
+
+    def finish(self, upload: Upload) -> str:
+        """Stop tracking a completed upload. Returns its SHA-256; the file is left in place."""
+        with self._lock:
+            self._uploads.pop(upload.id, None)
+        upload.state_path.unlink(missing_ok=True)
+        return upload.hasher.hexdigest()
+
+    def delete(self, upload: Upload):
+        """Abort an upload and remove its bytes."""
+        with self._lock:
+            self._uploads.pop(upload.id, None)
+        upload.path.unlink(missing_ok=True)
+        upload.state_path.unlink(missing_ok=True)
+
+    def expire(self, max_idle_seconds: float) -> list:
+        """
+        Delete uploads that have received nothing for max_idle_seconds.
+
+        Returns:
+            Ids of the expired uploads
+        """
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            stale = [u for u in self._uploads.values() if u.updated_at < cutoff and not u.lock.locked()]
+        for upload in stale:
+            self.delete(upload)
+        return [u.id for u in stale]
+
+    def count(self) -> int:
+        """Number of uploads in progress."""
+        with self._lock:
+            return len(self._uploads)
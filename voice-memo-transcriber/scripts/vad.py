@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Voice activity detection on decoded PCM.
+Finds speech intervals, hands only the speech to the model, and maps segment
+timestamps back onto the original recording. Uses the Silero VAD bundled
+with faster-whisper when available, otherwise a frame-energy detector.
+"""
+
+import bisect
+import os
+import sys
+import time
+from typing import Optional
+
+from preprocess import SAMPLE_RATE
+
+# Same threshold the FFmpeg silenceremove path uses
+ENERGY_THRESHOLD_DB = -50.0
+
+
+class SpeechMap:
+    """
+    Speech intervals of a recording and the mapping between the compacted
+    (speech-only) timeline the model sees and the original one.
+    """
+
+    def __init__(self, intervals: list, total_seconds: float, scale: float = 1.0, method: str = 'energy'):
+        """
+        Args:
+            intervals: Ordered, non-overlapping (start, end) speech spans in seconds
+            total_seconds: Length of the audio the intervals were detected in
+            scale: Factor from the decoded timeline to the recording (the speed-up)
+            method: Detector that produced the intervals
+        """
+        self.intervals = [(float(s), float(e)) for s, e in intervals if e > s]
+        self.total_seconds = total_seconds
+        self.scale = scale
+        self.method = method
+
+        # Start of each interval on the compacted timeline
+        self._compact_starts = []
+        position = 0.0
+        for start, end in self.intervals:
+            self._compact_starts.append(position)
+            position += end - start
+        self.speech_seconds = position
+
+    def to_original(self, t: float, is_end: bool = False) -> float:
+        """
+        Map a compacted-timeline time to the original recording.
+
+        A time exactly on the seam between two intervals maps to the end of
+        the earlier interval when is_end is set, so segment ends don't jump
+        across the removed silence.
+        """
+        if not self.intervals:
+            return t * self.scale
+        if is_end:
+            index = bisect.bisect_left(self._compact_starts, t) - 1
+        else:
+            index = bisect.bisect_right(self._compact_starts, t) - 1
+        index = min(max(index, 0), len(self.intervals) - 1)
+        start, end = self.intervals[index]
+        return min(end, start + max(0.0, t - self._compact_starts[index])) * self.scale
+
+    def remap_segment(self, segment: dict) -> dict:
+        """Copy of a segment with start/end on the original timeline."""
+        return {
+            **segment,
+            'start': self.to_original(segment['start']),
+            'end': self.to_original(segment['end'], is_end=True),
+        }
+
+    def remap_segments(self, segments: list) -> list:
+        return [self.remap_segment(s) for s in segments]
+
+    def stats(self) -> dict:
+        """Summary for preprocessing stats."""
+        return {
+            'method': self.method,
+            'speech_intervals': len(self.intervals),
+            'speech_seconds': round(self.speech_seconds, 2),
+            'total_seconds': round(self.total_seconds, 2),
+            'speech_ratio': round(self.speech_seconds / self.total_seconds, 3) if self.total_seconds else None,
+        }
+
+
+def _merge_intervals(intervals: list, min_silence: float, min_speech: float,
+                     pad: float, total: float) -> list:
+    """Bridge short gaps, drop blips, then pad each span (all in seconds)."""
+    bridged = []
+    for start, end in intervals:
+        if bridged and start - bridged[-1][1] < min_silence:
+            bridged[-1] = (bridged[-1][0], max(bridged[-1][1], end))
+        else:
+            bridged.append((start, end))
+
+    padded = []
+    for start, end in bridged:
+        if end - start < min_speech:
+            continue
+        start, end = max(0.0, start - pad), min(total, end + pad)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], max(padded[-1][1], end))
+        else:
+            padded.append((start, end))
+    return padded
+
+
+def energy_speech_intervals(audio, sample_rate: int = SAMPLE_RATE,
+                            threshold_db: float = ENERGY_THRESHOLD_DB,
+                            frame_ms: int = 30) -> list:
+    """Frames louder than threshold_db (dBFS RMS), as raw (start, end) spans in seconds."""
+    import numpy as np
+    from chunked import frame_energy
+
+    energy = frame_energy(audio, sample_rate, frame_ms)
+    loud = 20 * np.log10(np.maximum(energy, 1e-10)) > threshold_db
+    frame = frame_ms / 1000
+
+    # Edges of runs of loud frames
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], loud.astype(np.int8), [0]))))
+    return [(a * frame, b * frame) for a, b in zip(edges[::2], edges[1::2])]
+
+
+def silero_speech_intervals(audio, sample_rate: int = SAMPLE_RATE) -> Optional[list]:
+    """Silero VAD spans in seconds, or None if faster-whisper's VAD is not installed."""
+    try:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+    except ImportError:
+        return None
+
+    # Padding and gap bridging are applied afterwards, uniformly for both detectors
+    options = VadOptions(min_silence_duration_ms=100, speech_pad_ms=0)
+    return [(t['start'] / sample_rate, t['end'] / sample_rate)
+            for t in get_speech_timestamps(audio, options)]
+
+
+def detect_speech(audio, sample_rate: int = SAMPLE_RATE, method: str = 'auto',
+                  min_silence_duration: float = 0.5, min_speech_duration: float = 0.25,
+                  speech_pad: float = 0.2, scale: float = 1.0) -> SpeechMap:
+    """
+    Find speech in decoded audio.
+
+    Args:
+        audio: float32 mono samples
+        sample_rate: Sample rate of audio
+        method: 'silero', 'energy' or 'auto' (Silero if installed)
+        min_silence_duration: Shorter pauses are kept, like silenceremove's stop_duration
+        min_speech_duration: Shorter bursts are dropped as noise
+        speech_pad: Context kept around each span
+        scale: Factor from this audio's timeline to the recording (speed-up)
+
+    Returns:
+        SpeechMap of the detected intervals
+    """
+    total = len(audio) / sample_rate
+    raw = None
+    if method in ('auto', 'silero'):
+        raw = silero_speech_intervals(audio, sample_rate)
+        if raw is None and method == 'silero':
+            raise RuntimeError("Silero VAD needs faster-whisper installed")
+    used = 'silero' if raw is not None else 'energy'
+    if raw is None:
+        raw = energy_speech_intervals(audio, sample_rate)
+
+    intervals = _merge_intervals(raw, min_silence_duration, min_speech_duration, speech_pad, total)
+    return SpeechMap(intervals, total, scale=scale, method=used)
+
+
+def extract_speech(audio, speech_map: SpeechMap, sample_rate: int = SAMPLE_RATE):
+    """Concatenate the speech spans into the compacted array the model sees."""
+    import numpy as np
+
+    if not speech_map.intervals:
+        return audio[:0]
+    return np.concatenate([audio[int(s * sample_rate):int(e * sample_rate)]
+                           for s, e in speech_map.intervals])
+
+
+def apply_vad(audio, sample_rate: int = SAMPLE_RATE, method: str = 'auto', scale: float = 1.0) -> tuple:
+    """
+    Detect speech and cut out the rest.
+
+    Returns:
+        Tuple of (speech-only samples, SpeechMap)
+    """
+    speech_map = detect_speech(audio, sample_rate, method=method, scale=scale)
+    return extract_speech(audio, speech_map, sample_rate), speech_map
+
+
+def benchmark(file_path: str, model: str = 'small', method: str = 'auto') -> dict:
+    """
+    Compare FFmpeg silenceremove against in-process VAD.
+
+    Both paths are timed (preprocessing and transcription) and scored against
+    a reference transcript of the untouched audio: word agreement, and the
+    mean error of segment start times on the original timeline.
+
+    Returns:
+        dict with per-path timings and accuracy
+    """
+    from difflib import SequenceMatcher
+    from faster_whisper import WhisperModel
+    from chunked import _normalize
+    from preprocess import decode_audio
+
+    whisper_model = WhisperModel(model, device='cpu', compute_type='int8')
+
+    def transcribe(samples):
+        start = time.time()
+        segments, _ = whisper_model.transcribe(samples, beam_size=5)
+        segments = [{'start': s.start, 'end': s.end, 'text': s.text} for s in segments]
+        return segments, time.time() - start
+
+    def score(segments, reference):
+        words = _normalize(' '.join(s['text'] for s in segments)).split()
+        ref_words = _normalize(' '.join(s['text'] for s in reference)).split()
+        agreement = SequenceMatcher(None, ref_words, words).ratio()
+
+        # Match segments by text to measure timestamp drift
+        ref_starts = {_normalize(s['text']): s['start'] for s in reference}
+        errors = [abs(s['start'] - ref_starts[_normalize(s['text'])])
+                  for s in segments if _normalize(s['text']) in ref_starts]
+        return agreement, (sum(errors) / len(errors) if errors else None), len(errors)
+
+    audio, _ = decode_audio(file_path, remove_silence_enabled=False)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"Audio: {duration/60:.1f} min, model: {model}")
+
+    reference, ref_time = transcribe(audio)
+    print(f"  Reference (no silence removal): {ref_time:.1f}s")
+
+    results = {'duration_seconds': duration, 'reference_seconds': ref_time}
+    for name in ('ffmpeg', 'vad'):
+        start = time.time()
+        if name == 'ffmpeg':
+            samples, _ = decode_audio(file_path, remove_silence_enabled=True)
+            speech_map = None
+        else:
+            decoded, _ = decode_audio(file_path, remove_silence_enabled=False)
+            samples, speech_map = apply_vad(decoded, method=method)
+        prep_time = time.time() - start
+
+        segments, asr_time = transcribe(samples)
+        if speech_map is not None:
+            segments = speech_map.remap_segments(segments)
+        agreement, drift, matched = score(segments, reference)
+
+        kept = len(samples) / SAMPLE_RATE
+        label = f"VAD ({speech_map.method})" if speech_map else "FFmpeg silenceremove"
+        drift_str = f"{drift:.2f}s" if drift is not None else "n/a"
+        print(f"  {label}: preprocess {prep_time:.2f}s, transcribe {asr_time:.1f}s, "
+              f"kept {kept/duration:.0%} of audio, agreement {agreement:.1%}, "
+              f"start-time error {drift_str} over {matched} segments")
+        results[name] = {
+            'preprocess_seconds': prep_time,
+            'transcribe_seconds': asr_time,
+            'kept_seconds': kept,
+            'agreement': agreement,
+            'mean_start_error_seconds': drift,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Voice activity detection with timestamp remapping")
+    parser.add_argument("file", help="Audio file")
+    parser.add_argument("--method", choices=["auto", "silero", "energy"], default="auto",
+                        help="Detector (default: auto = Silero if installed)")
+    parser.add_argument("--model", default="small", help="faster-whisper model for --benchmark (default: small)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare speed and accuracy against FFmpeg silenceremove")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"Error: File not found: {args.file}")
+        sys.exit(1)
+
+    if args.benchmark:
+        benchmark(args.file, args.model, args.method)
+    else:
+        from preprocess import decode_audio
+        audio, _ = decode_audio(args.file, remove_silence_enabled=False)
+        start = time.time()
+        speech_map = detect_speech(audio, method=args.method)
+        print(f"{speech_map.stats()} in {time.time() - start:.2f}s")
+        for s, e in speech_map.intervals:
+            print(f"  {s:8.2f} -> {e:8.2f}")
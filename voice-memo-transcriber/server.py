@@ -15,16 +15,34 @@ import threading
 import time
 import uuid
 import platform
+import re
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
+from werkzeug.serving import WSGIRequestHandler
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 
 # Add scripts directory to path
 sys.path.insert(0, str(Path(__file__).parent / "scripts"))
-from preprocess import preprocess_audio, get_audio_duration, estimate_transcription_time
+from preprocess import (preprocess_audio, decode_audio, encode_audio, get_audio_duration,
+                        estimate_transcription_time, StreamingDecoder, SAMPLE_RATE, TRANSFER_CODECS)
+from model_pool import ModelPool
+from scheduler import JobScheduler, QueueFullError
+from job_events import JobEventHub
+from result_cache import ResultCache
+from job_store import JobStore, TERMINAL_STATUSES
+from chunked import transcribe_parallel
+from batched import plan_groups, transcribe_clips
+from uploads import UploadManager, UploadError, parse_metadata
+from vad import SpeechMap, detect_speech, extract_speech
+from metrics import MetricsRegistry, RTF_BUCKETS
+from estimator import TranscriptionEstimator
+from cancellation import CancelToken, JobCancelled
+from streaming import LiveStream, STREAM_FORMATS
+from autotune import TuningStore
 
 # Detect platform and available backends
 IS_APPLE_SILICON = platform.processor() == 'arm' and platform.system() == 'Darwin'
@@ -54,6 +72,13 @@ if not MLX_AVAILABLE:
     except ImportError:
         pass
 
+# WebSocket transport for live streams (optional; chunked HTTP works without it)
+try:
+    from flask_sock import Sock
+    SOCK_AVAILABLE = True
+except ImportError:
+    SOCK_AVAILABLE = False
+
 # Import MLX_MODELS if available
 try:
     from transcribe import MLX_MODELS
@@ -81,6 +106,19 @@ load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+sock = Sock(app) if SOCK_AVAILABLE else None
+
+
+@app.after_request
+def close_after_rejected_body(response):
+    """
+    Connections are kept alive, so a request body a handler rejected without
+    reading would be taken for the next request; close those connections.
+    """
+    if response.status_code >= 400 and (request.content_length
+                                        or 'chunked' in request.headers.get('Transfer-Encoding', '')):
+        response.headers['Connection'] = 'close'
+    return response
 
 # Configuration
 UPLOAD_FOLDER = Path(__file__).parent / "audio" / "uploads"
@@ -90,8 +128,187 @@ MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB max
 
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
-# Job tracking for progress updates
+# Resumable uploads; local backends decode the head of the file while the tail arrives
+UPLOADS = UploadManager(UPLOAD_FOLDER, max_size=MAX_CONTENT_LENGTH)
+UPLOAD_EXPIRE_SECONDS = float(os.getenv('UPLOAD_EXPIRE_HOURS', 24)) * 3600
+STREAM_DECODE_MAX_SECONDS = float(os.getenv('STREAM_DECODE_MAX_MINUTES', 60)) * 60
+stream_decoders = {}  # upload/job id -> StreamingDecoder, until the job picks it up
+
+# Content-addressed transcript cache
+CACHE_FOLDER = Path(__file__).parent / "cache" / "results"
+RESULT_CACHE = ResultCache(CACHE_FOLDER, max_size_mb=float(os.getenv('RESULT_CACHE_MB', 500)))
+
+# Job tracking for progress updates. Every job is persisted in JOB_STORE;
+# the jobs dict only holds live jobs plus recently finished ones.
+JOB_STORE = JobStore(Path(os.getenv('JOB_DB_PATH', Path(__file__).parent / "data" / "jobs.db")))
+# Measured processing times; drive queue ETAs, progress and /estimate
+ESTIMATOR = TranscriptionEstimator(Path(os.getenv('ESTIMATOR_DB_PATH', Path(__file__).parent / "data" / "estimator.db")))
+JOB_RETENTION_DAYS = float(os.getenv('JOB_RETENTION_DAYS', 7))  # finished jobs kept in the store
+FINISHED_JOB_MEMORY_SECONDS = 300                                 # finished jobs kept in memory
+JOB_SWEEP_INTERVAL_SECONDS = 600
 jobs = {}  # job_id -> {status, progress, message, result, error}
+job_events = JobEventHub()
+SSE_HEARTBEAT_SECONDS = 15
+LONG_POLL_MAX_SECONDS = 60    # longest a /jobs/wait request is held open
+LONG_POLL_MAX_JOBS = 500
+
+# Silence is cut with in-process VAD (auto, silero or energy); segment
+# timestamps are mapped back onto the original recording
+VAD_METHOD = os.getenv('VAD_METHOD', 'auto')
+speech_maps = {}  # job_id -> SpeechMap while the job is being transcribed
+
+# Running jobs (and batches) can be cancelled; a higher-priority local job
+# may displace a lower-priority one, which is re-queued from the start
+cancel_tokens = {}  # job/batch id -> CancelToken
+PREEMPTION = os.getenv('PREEMPTION', 'true').lower() == 'true'
+
+# Live recordings transcribed while they are being made. They bypass the job
+# queue (latency is the point), so the number of concurrent streams is capped
+STREAM_MODEL = os.getenv('STREAM_MODEL', 'small')
+MAX_STREAMS = int(os.getenv('MAX_STREAMS', 2))
+STREAM_IDLE_SECONDS = float(os.getenv('STREAM_IDLE_SECONDS', 120))  # no audio for this long ends a stream
+streams = {}  # job_id -> LiveStream
+streams_lock = threading.Lock()
+
+# Fields streamed through dedicated events rather than update deltas
+STREAM_ONLY_FIELDS = {'segments', 'segment', 'partial_transcript'}
+
+# Model residency
+DEFAULT_MODEL = os.getenv('DEFAULT_MODEL', 'large-v3')
+MODEL_RAM_BUDGET_MB = float(os.getenv('MODEL_RAM_BUDGET_MB', 8192))
+
+
+# Compute type, CPU threads and workers measured per host and model by
+# scripts/autotune.py (or --autotune at startup); untuned models use the defaults below
+AUTOTUNE = TuningStore(Path(os.getenv('AUTOTUNE_PATH', Path(__file__).parent / "data" / "autotune.json")))
+
+
+def faster_whisper_device() -> str:
+    return "cuda" if GPU_AVAILABLE else "cpu"
+
+
+def get_faster_whisper_settings(model: Optional[str] = None) -> tuple[str, str]:
+    """Pick (device, compute_type) for faster-whisper on this machine, tuned for the model if possible."""
+    device = faster_whisper_device()
+    tuned = AUTOTUNE.get(model, device) if model else None
+    if tuned is not None:
+        return device, tuned['compute_type']
+    return device, "float16" if device == "cuda" else "int8"
+
+
+def load_faster_whisper_model(model: str, device: str, compute_type: str, **kwargs):
+    """Loader used by the model pool; applies tuned thread and worker counts."""
+    from faster_whisper import WhisperModel
+    tuned = AUTOTUNE.get(model, device)
+    if tuned is not None and tuned['compute_type'] == compute_type:
+        kwargs = {'cpu_threads': tuned['cpu_threads'], 'num_workers': tuned['num_workers'], **kwargs}
+    with STAGE_SECONDS.time(stage='model_load', backend='faster-whisper'):
+        return WhisperModel(model, device=device, compute_type=compute_type, **kwargs)
+
+
+MODEL_POOL = ModelPool(load_faster_whisper_model, budget_mb=MODEL_RAM_BUDGET_MB)
+
+# Long recordings on CPU are split and decoded by several model replicas
+CHUNK_WORKERS = int(os.getenv('CHUNK_WORKERS', max(1, min(4, (os.cpu_count() or 2) // 2))))
+LONG_AUDIO_SECONDS = float(os.getenv('LONG_AUDIO_SECONDS', 20 * 60))
+
+# Short clips uploaded together are decoded as shared batches (faster-whisper)
+BATCH_SIZE = int(os.getenv('BATCH_SIZE', 8))                          # windows per forward pass
+BATCH_CLIP_SECONDS = float(os.getenv('BATCH_CLIP_SECONDS', 180))      # longer files run on their own
+BATCH_GROUP_SECONDS = float(os.getenv('BATCH_GROUP_SECONDS', 600))    # audio per batch
+
+# Job scheduling
+TRANSCRIBE_WORKERS = int(os.getenv('TRANSCRIBE_WORKERS', 1))  # concurrent local transcriptions
+OPENAI_WORKERS = int(os.getenv('OPENAI_WORKERS', 4))          # concurrent cloud requests
+MAX_QUEUE = int(os.getenv('MAX_QUEUE', 20))                   # waiting jobs per backend before 429
+scheduler = None
+
+# Prometheus metrics served at /metrics
+METRICS = MetricsRegistry()
+STAGE_SECONDS = METRICS.histogram(
+    'transcriber_stage_seconds',
+    'Time spent per pipeline stage (upload, probe, preprocess, model_load, decode, postprocess)',
+    labels=('stage', 'backend'))
+REAL_TIME_FACTOR = METRICS.histogram(
+    'transcriber_real_time_factor',
+    'Decode seconds per second of audio given to the model',
+    labels=('model', 'device'), buckets=RTF_BUCKETS)
+JOBS_FINISHED = METRICS.counter(
+    'transcriber_jobs_finished_total', 'Jobs that reached a final status', labels=('backend', 'status'))
+
+
+def queue_samples(field: str) -> list:
+    return [({'backend': b}, s[field]) for b, s in get_scheduler().stats().items()]
+
+
+def hit_ratio(stats: dict) -> Optional[float]:
+    total = stats['hits'] + stats['misses']
+    return stats['hits'] / total if total else None
+
+
+METRICS.gauge_callback('transcriber_info', 'Host and available backends', ('host', 'platform', 'backend_type'),
+                       lambda: [({'host': platform.node(), 'platform': platform.system(),
+                                  'backend_type': 'mlx' if MLX_AVAILABLE else
+                                  'faster-whisper' if FASTER_WHISPER_AVAILABLE else 'none'}, 1)])
+METRICS.gauge_callback('transcriber_queue_depth', 'Jobs waiting per backend', ('backend',),
+                       lambda: queue_samples('queued'))
+METRICS.gauge_callback('transcriber_active_workers', 'Workers currently running a job', ('backend',),
+                       lambda: queue_samples('running'))
+METRICS.gauge_callback('transcriber_workers', 'Configured workers per backend', ('backend',),
+                       lambda: queue_samples('workers'))
+METRICS.gauge_callback('transcriber_model_cache_hits_total', 'Model pool lookups served by a resident model', (),
+                       lambda: [({}, MODEL_POOL.stats()['hits'])], kind='counter')
+METRICS.gauge_callback('transcriber_model_cache_misses_total', 'Model pool lookups that loaded a model', (),
+                       lambda: [({}, MODEL_POOL.stats()['misses'])], kind='counter')
+METRICS.gauge_callback('transcriber_model_cache_hit_ratio', 'Share of model lookups served from memory', (),
+                       lambda: [({}, hit_ratio(MODEL_POOL.stats()))])
+METRICS.gauge_callback('transcriber_models_loaded', 'Resident models', (),
+                       lambda: [({}, len(MODEL_POOL.stats()['loaded']))])
+METRICS.gauge_callback('transcriber_model_memory_mb', 'Estimated memory held by resident models', (),
+                       lambda: [({}, MODEL_POOL.stats()['memory_used_mb'])])
+METRICS.gauge_callback('transcriber_result_cache_hits_total', 'Uploads answered from the transcript cache', (),
+                       lambda: [({}, RESULT_CACHE.hits)], kind='counter')
+METRICS.gauge_callback('transcriber_result_cache_misses_total', 'Uploads not found in the transcript cache', (),
+                       lambda: [({}, RESULT_CACHE.misses)], kind='counter')
+METRICS.gauge_callback('transcriber_uploads_in_progress', 'Resumable uploads not yet complete', (),
+                       lambda: [({}, UPLOADS.count())])
+METRICS.gauge_callback('transcriber_live_streams', 'Live recordings being transcribed', (),
+                       lambda: [({}, len(streams))])
+
+
+def prewarm_default_model(model: str):
+    """Load the default model ahead of the first job."""
+    try:
+        if MLX_AVAILABLE:
+            # mlx-whisper keeps its most recently used model cached internally
+            import mlx.core as mx
+            from mlx_whisper.transcribe import ModelHolder
+            with STAGE_SECONDS.time(stage='model_load', backend='mlx'):
+                ModelHolder.get_model(MLX_MODELS.get(model, model), mx.float16)
+        elif FASTER_WHISPER_AVAILABLE:
+            name = FASTER_WHISPER_MODELS.get(model, model)
+            device, compute_type = get_faster_whisper_settings(name)
+            MODEL_POOL.get(name, device, compute_type)
+        else:
+            return
+        print(f"Pre-warmed model: {model}")
+    except Exception as e:
+        print(f"Model pre-warm failed ({model}): {e}")
+
+
+def autotune_model(model: str):
+    """
+    Tune faster-whisper settings for a model on this machine.
+    Only run before the scheduler starts: the sweep saturates the CPU and
+    would slow down, and be skewed by, any job served alongside it.
+    """
+    device = faster_whisper_device()
+    try:
+        config = AUTOTUNE.run(model, device)
+        print(f"Tuned {model} on {device}: {config['compute_type']}, {config['cpu_threads'] or 'default'} threads, "
+              f"{config['num_workers']} workers (RTF {config['rtf']:.3f})")
+    except Exception as e:
+        print(f"Autotune failed ({model}): {e}")
 
 
 def allowed_file(filename):
@@ -107,77 +324,284 @@ def compute_file_hash(file_path: str) -> str:
     return sha256.hexdigest()
 
 
-def speed_up_audio(input_path: str, output_path: str, speed: float = 1.5) -> bool:
-    """Speed up audio using FFmpeg atempo filter."""
-    filters = []
-    remaining_speed = speed
-    while remaining_speed > 2.0:
-        filters.append("atempo=2.0")
-        remaining_speed /= 2.0
-    while remaining_speed < 0.5:
-        filters.append("atempo=0.5")
-        remaining_speed /= 0.5
-    filters.append(f"atempo={remaining_speed}")
-    filter_str = ",".join(filters)
-
-    cmd = [
-        'ffmpeg', '-y', '-i', input_path,
-        '-af', filter_str,
-        '-c:a', 'libmp3lame', '-b:a', '128k',
-        output_path
-    ]
+def update_job(job_id: str, **kwargs):
+    """Update job status and publish the changed fields to subscribers."""
+    job = jobs.get(job_id)
+    if job is None:
+        return
+
+    changes = {k: v for k, v in kwargs.items() if job.get(k) != v}
+    job.update(kwargs)
+    job['updated_at'] = time.time()
+    JOB_STORE.update(job)
+
+    if 'status' in changes and job['status'] in TERMINAL_STATUSES:
+        JOBS_FINISHED.inc(backend=job.get('backend'), status=job['status'])
+
+    delta = {k: v for k, v in changes.items() if k not in STREAM_ONLY_FIELDS}
+    if delta:
+        delta['updated_at'] = job['updated_at']
+        job_events.publish(job_id, 'update', delta, final=job['status'] in TERMINAL_STATUSES)
+
+
+def find_job(job_id: str) -> Optional[dict]:
+    """Live job if it is still in memory, otherwise from the persistent store."""
+    job = jobs.get(job_id)
+    if job is not None:
+        return job
+    return JOB_STORE.get(job_id)
+
+
+def sweep_jobs():
+    """Release finished jobs from memory and expire old results from the store."""
+    now = time.time()
+    for job_id, stream in list(streams.items()):
+        if stream.idle_seconds > STREAM_IDLE_SECONDS:
+            finish_stream(job_id)
+
+    for job_id, job in list(jobs.items()):
+        if job['status'] in TERMINAL_STATUSES and now - job['updated_at'] > FINISHED_JOB_MEMORY_SECONDS:
+            jobs.pop(job_id, None)
+            job_events.discard(job_id)
+
+    for job_id in JOB_STORE.evict(JOB_RETENTION_DAYS * 86400):
+        jobs.pop(job_id, None)
+        job_events.discard(job_id)
+
+    for upload_id in UPLOADS.expire(UPLOAD_EXPIRE_SECONDS):
+        discard_decoder(upload_id)
+
+
+def job_sweeper():
+    """Background thread running sweep_jobs periodically."""
+    while True:
+        try:
+            sweep_jobs()
+        except Exception as e:
+            print(f"Job sweep failed: {e}")
+        time.sleep(JOB_SWEEP_INTERVAL_SECONDS)
+
+
+def recover_jobs():
+    """Re-queue jobs that were queued or running when the server last stopped."""
+    for job, file_path, options in JOB_STORE.unfinished():
+        job_id = job['id']
+        backend = resolve_backend(options.get('method', 'auto'))
+
+        if not file_path or not os.path.exists(file_path) or backend is None:
+            jobs[job_id] = job
+            reason = ('live stream interrupted' if options.get('live') else
+                      'upload missing' if backend else 'backend unavailable')
+            update_job(job_id, status='error', progress=0,
+                       message=f'Lost during restart ({reason})', error=f'Lost during restart ({reason})')
+            continue
+
+        job.pop('batch_id', None)  # batches are not reassembled; members re-run one by one
+        jobs[job_id] = job
+        try:
+            if requeue_job(job_id, backend, file_path, options, 'Re-queued after restart'):
+                print(f"Re-queued job {job_id} ({job.get('filename')})")
+        except Exception as e:
+            # One bad row must not keep the server from starting
+            error = f'Lost during restart ({e})'
+            update_job(job_id, status='error', progress=0, message=error, error=error)
+            print(f"Could not re-queue job {job_id}: {e}")
+
+
+def requeue_job(job_id: str, backend: str, file_path: str, options: dict, message: str) -> bool:
+    """
+    Queue a job again from the start (after a restart or preemption).
+    Returns False, with the job marked failed, if it could not be queued.
+    """
+    job = jobs[job_id]
+    JOB_STORE.clear_segments(job_id)
+    job.pop('segments', None)
+    job.pop('partial_transcript', None)
+    update_job(job_id, status='queued', progress=0, backend=backend, message=message)
 
     try:
-        subprocess.run(cmd, capture_output=True, check=True)
+        get_scheduler().submit(
+            job_id, backend,
+            args=(file_path, options),
+            duration=options.get('duration') or 0.0,
+            priority=job.get('priority', 0),
+            estimate=estimate_processing_time(backend, options.get('duration') or 0.0, options)
+        )
         return True
-    except subprocess.CalledProcessError:
+    except QueueFullError as e:
+        update_job(job_id, status='error', progress=0, message=str(e), error=str(e))
+        return False
+    except KeyError as e:
+        # No worker pool for the backend (e.g. it is not installed on this host)
+        error = e.args[0] if e.args else str(e)
+        update_job(job_id, status='error', progress=0, message=error, error=error)
         return False
 
 
-def update_job(job_id: str, **kwargs):
-    """Update job status."""
-    if job_id in jobs:
-        jobs[job_id].update(kwargs)
-        jobs[job_id]['updated_at'] = time.time()
+def check_cancelled(job_id: str):
+    """Raise JobCancelled if the job (or batch) has been cancelled."""
+    token = cancel_tokens.get(job_id)
+    if token is not None:
+        token.check()
+
+
+def is_cancelled(job_id: str) -> bool:
+    token = cancel_tokens.get(job_id)
+    return token is not None and token.cancelled
+
+
+def preempt_for(backend: str, priority: int):
+    """
+    If every local worker is busy with lower-priority jobs, stop the one that
+    loses least work so a new job of this priority starts now. The displaced
+    job goes back in the queue and restarts from the beginning.
+    """
+    if not PREEMPTION or backend == 'openai':
+        return  # API requests can't be interrupted and are paid for
+    scheduler = get_scheduler()
+    for victim in scheduler.preemption_candidates(backend, priority):
+        token = cancel_tokens.get(victim)
+        if victim not in jobs or token is None:
+            continue  # batches run to completion
+        token.cancel('preempted')
+        scheduler.release(victim)
+        update_job(victim, message=f'Paused for a priority {priority} job')
+        return
+
+
+def audio_duration(audio) -> float:
+    """Duration of a decoded sample array or an audio file, in seconds."""
+    if isinstance(audio, (str, Path)):
+        return get_audio_duration(str(audio))
+    return len(audio) / SAMPLE_RATE
+
+
+def record_segment(job_id: str, segment: dict, duration: float, label: str = ''):
+    """
+    Append a decoded segment to the job and derive progress from its end time.
 
+    Called between segments by every backend, so it is also where a cancelled
+    job stops decoding: JobCancelled propagates out of the decode loop.
+    """
+    check_cancelled(job_id)
+    job = jobs.get(job_id)
+    if job is None:
+        return
+    # Progress follows the audio the model sees; published times follow the recording
+    fraction = min(1.0, segment['end'] / duration) if duration > 0 else 0
+    speech_map = speech_maps.get(job_id)
+    if speech_map is not None:
+        segment = speech_map.remap_segment(segment)
+    total = job.get('duration') or duration
+    append_segment(job, segment)
+
+    update_job(job_id,
+        progress=max(job.get('progress', 0), int(10 + fraction * 85)),
+        message=f'Transcribing{label}... {segment["end"]/60:.1f} of {total/60:.1f} min'
+    )
+
+
+def append_segment(job: dict, segment: dict):
+    """Add a segment to a job's transcript, persist it and publish it to subscribers."""
+    segments = job.setdefault('segments', [])
+    segments.append(segment)
+    job['partial_transcript'] = (job.get('partial_transcript', '') + ' ' + segment['text'].strip()).strip()
+    JOB_STORE.add_segment(job['id'], len(segments) - 1, segment)
+    job_events.publish(job['id'], 'segment', {'index': len(segments) - 1, **segment})
+
+
+class SegmentLogRouter:
+    """
+    Stdout proxy that turns mlx-whisper's verbose segment lines into callbacks.
+    mlx-whisper has no segment callback, but with verbose=True it prints
+    "[mm:ss.mmm --> mm:ss.mmm] text" as each segment decodes. Writes from
+    registered threads are parsed; everything else passes through untouched.
+    """
 
-def transcribe_with_mlx_progress(audio_path: str, model: str, job_id: str) -> dict:
-    """Transcribe with MLX Whisper, updating job progress."""
+    LINE_RE = re.compile(r'^\[((?:\d+:)?\d+:\d+\.\d+) --> ((?:\d+:)?\d+:\d+\.\d+)\]\s?(.*)$')
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.callbacks = {}  # thread ident -> callback(segment)
+        self.buffers = {}
+
+    @staticmethod
+    def parse_timestamp(value: str) -> float:
+        seconds = 0.0
+        for part in value.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+
+    def write(self, text):
+        ident = threading.get_ident()
+        callback = self.callbacks.get(ident)
+        if callback is None:
+            return self.stream.write(text)
+
+        buffer = self.buffers.get(ident, '') + text
+        *lines, self.buffers[ident] = buffer.split('\n')
+        for line in lines:
+            match = self.LINE_RE.match(line.strip())
+            if match:
+                callback({
+                    'start': self.parse_timestamp(match.group(1)),
+                    'end': self.parse_timestamp(match.group(2)),
+                    'text': match.group(3)
+                })
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def register(self, callback):
+        self.callbacks[threading.get_ident()] = callback
+
+    def unregister(self):
+        ident = threading.get_ident()
+        self.callbacks.pop(ident, None)
+        self.buffers.pop(ident, None)
+
+
+_segment_router = None
+_segment_router_lock = threading.Lock()
+
+
+def get_segment_router() -> SegmentLogRouter:
+    """Install the stdout router once per process."""
+    global _segment_router
+    with _segment_router_lock:
+        if _segment_router is None:
+            _segment_router = SegmentLogRouter(sys.stdout)
+            sys.stdout = _segment_router
+    return _segment_router
+
+
+def transcribe_with_mlx_progress(audio, model: str, job_id: str) -> dict:
+    """Transcribe with MLX Whisper, updating job progress as segments decode."""
     if not MLX_AVAILABLE:
         raise RuntimeError("mlx-whisper not available on this platform")
 
     update_job(job_id, status='transcribing', message=f'Loading model: {model}', progress=5)
 
     start_time = time.time()
-    duration = get_audio_duration(audio_path)
+    duration = audio_duration(audio)
 
-    # MLX Whisper doesn't have a built-in progress callback, but we can estimate
-    # based on time elapsed vs expected time
-    expected_time = duration * 0.1  # ~10x realtime for large-v3
-
-    def progress_thread():
-        """Background thread to estimate and update progress."""
-        while job_id in jobs and jobs[job_id]['status'] == 'transcribing':
-            elapsed = time.time() - start_time
-            # Progress from 10% to 95% based on elapsed/expected time
-            estimated_progress = min(95, 10 + (elapsed / expected_time) * 85)
-            update_job(job_id,
-                progress=int(estimated_progress),
-                message=f'Transcribing... {int(elapsed)}s elapsed'
-            )
-            time.sleep(2)
-
-    # Start progress estimation thread
-    progress_estimator = threading.Thread(target=progress_thread, daemon=True)
-    progress_estimator.start()
+    router = get_segment_router()
+    router.register(lambda segment: record_segment(job_id, segment, duration))
 
     # Run transcription
     import mlx_whisper
-    result = mlx_whisper.transcribe(
-        audio_path,
-        path_or_hf_repo=model,
-        verbose=False
-    )
+    try:
+        result = mlx_whisper.transcribe(
+            audio,
+            path_or_hf_repo=model,
+            verbose=True
+        )
+    finally:
+        router.unregister()
 
     elapsed = time.time() - start_time
 
@@ -192,66 +616,47 @@ def transcribe_with_mlx_progress(audio_path: str, model: str, job_id: str) -> di
     }
 
 
-def transcribe_with_faster_whisper_progress(audio_path: str, model: str, job_id: str) -> dict:
-    """Transcribe with faster-whisper (CUDA/CPU), updating job progress."""
+def transcribe_with_faster_whisper_progress(audio, model: str, job_id: str) -> dict:
+    """Transcribe with faster-whisper (CUDA/CPU), updating progress per decoded segment."""
     if not FASTER_WHISPER_AVAILABLE:
         raise RuntimeError("faster-whisper not installed")
 
-    from faster_whisper import WhisperModel
-
-    update_job(job_id, status='transcribing', message=f'Loading model: {model}', progress=5)
-
-    start_time = time.time()
-    duration = get_audio_duration(audio_path)
+    duration = audio_duration(audio)
 
     # Determine compute device and type
-    if GPU_AVAILABLE:
-        device = "cuda"
-        compute_type = "float16"
-        update_job(job_id, message=f'Loading model on GPU: {model}', progress=8)
-    else:
-        device = "cpu"
-        compute_type = "int8"
-        update_job(job_id, message=f'Loading model on CPU: {model}', progress=8)
+    device, compute_type = get_faster_whisper_settings(model)
+    target = "GPU" if device == "cuda" else "CPU"
 
-    # Load model
-    whisper_model = WhisperModel(model, device=device, compute_type=compute_type)
+    if device == 'cpu' and CHUNK_WORKERS > 1 and duration >= LONG_AUDIO_SECONDS and not isinstance(audio, (str, Path)):
+        return transcribe_chunked_progress(audio, model, job_id, compute_type)
 
-    # Expected transcription speed
-    if GPU_AVAILABLE:
-        expected_time = duration * 0.05  # ~20x realtime with GPU
+    if MODEL_POOL.is_loaded(model, device, compute_type):
+        update_job(job_id, status='transcribing', message=f'Using resident model on {target}: {model}', progress=8)
     else:
-        expected_time = duration * 0.3   # ~3x realtime on CPU
-
-    def progress_thread():
-        """Background thread to estimate and update progress."""
-        while job_id in jobs and jobs[job_id]['status'] == 'transcribing':
-            elapsed = time.time() - start_time
-            estimated_progress = min(95, 10 + (elapsed / expected_time) * 85)
-            gpu_status = " (GPU)" if GPU_AVAILABLE else " (CPU)"
-            update_job(job_id,
-                progress=int(estimated_progress),
-                message=f'Transcribing{gpu_status}... {int(elapsed)}s elapsed'
-            )
-            time.sleep(2)
-
-    # Start progress estimation thread
-    progress_estimator = threading.Thread(target=progress_thread, daemon=True)
-    progress_estimator.start()
+        update_job(job_id, status='transcribing', message=f'Loading model on {target}: {model}', progress=8)
 
-    # Run transcription
-    segments, info = whisper_model.transcribe(audio_path, beam_size=5)
-
-    # Collect all segments
     all_segments = []
     full_text = []
-    for segment in segments:
-        all_segments.append({
-            'start': segment.start,
-            'end': segment.end,
-            'text': segment.text
-        })
-        full_text.append(segment.text)
+
+    # Model stays pinned in the pool until all segments are consumed
+    with MODEL_POOL.acquire(model, device, compute_type) as whisper_model:
+        check_cancelled(job_id)
+        start_time = time.time()  # decode time only; loading is measured by the pool loader
+
+        # Segments are yielded lazily as they decode
+        segments, info = whisper_model.transcribe(audio, beam_size=5)
+        total = info.duration or duration
+        update_job(job_id, progress=10, message=f'Transcribing ({target})...')
+
+        for segment in segments:
+            seg = {
+                'start': segment.start,
+                'end': segment.end,
+                'text': segment.text
+            }
+            all_segments.append(seg)
+            full_text.append(segment.text)
+            record_segment(job_id, seg, total, f' ({target})')
 
     elapsed = time.time() - start_time
 
@@ -267,6 +672,46 @@ def transcribe_with_faster_whisper_progress(audio_path: str, model: str, job_id:
     }
 
 
+def transcribe_chunked_progress(audio, model: str, job_id: str, compute_type: str) -> dict:
+    """Transcribe a long CPU job as parallel chunks across CHUNK_WORKERS model replicas."""
+    start_time = time.time()
+    duration = audio_duration(audio)
+    update_job(job_id, status='transcribing', progress=8,
+               message=f'Transcribing {duration/60:.0f} min in parallel chunks ({CHUNK_WORKERS} workers)...')
+
+    def on_segment(segment):
+        record_segment(job_id, segment, duration, f' ({CHUNK_WORKERS} CPU workers)')
+
+    def on_progress(fraction):
+        # Chunks can finish out of order; only move progress forward
+        progress = int(10 + fraction * 85)
+        if progress > jobs.get(job_id, {}).get('progress', 0):
+            update_job(job_id, progress=progress)
+
+    result = transcribe_parallel(
+        audio,
+        model=model,
+        workers=CHUNK_WORKERS,
+        compute_type=compute_type,
+        on_segment=on_segment,
+        on_progress=on_progress,
+        cancel=cancel_tokens.get(job_id),
+        model_pool=MODEL_POOL
+    )
+
+    return {
+        'text': result['text'],
+        'segments': result['segments'],
+        'language': result['language'],
+        'duration': duration,
+        'transcription_time': time.time() - start_time,
+        'model': model,
+        'method': 'faster_whisper_chunked',
+        'device': 'cpu',
+        'chunks': result['chunks']
+    }
+
+
 def transcribe_with_openai_progress(audio_path: str, model: str, job_id: str) -> dict:
     """Transcribe with OpenAI API, updating job progress."""
     api_key = os.getenv('OPENAI_API_KEY')
@@ -284,14 +729,29 @@ def transcribe_with_openai_progress(audio_path: str, model: str, job_id: str) ->
     update_job(job_id, status='transcribing', message='Uploading to OpenAI...', progress=20)
 
     start_time = time.time()
+    expected = ESTIMATOR.estimate(duration, 0.0, **estimator_key('openai', model))
+    done = threading.Event()
 
-    with open(audio_path, 'rb') as audio_file:
-        update_job(job_id, message='Processing with OpenAI...', progress=50)
-        response = client.audio.transcriptions.create(
-            model=model,
-            file=audio_file,
-            response_format="verbose_json"
-        )
+    def advance():
+        # The API reports nothing until it answers; move along the expected time
+        while not done.wait(2):
+            elapsed = time.time() - start_time
+            fraction = min(0.95, elapsed / expected) if expected > 0 else 0
+            update_job(job_id, progress=max(jobs.get(job_id, {}).get('progress', 0), int(20 + fraction * 75)),
+                       message=f'Processing with OpenAI... about {max(0, expected - elapsed):.0f}s left')
+
+    threading.Thread(target=advance, daemon=True).start()
+    try:
+        with open(audio_path, 'rb') as audio_file:
+            response = client.audio.transcriptions.create(
+                model=model,
+                file=audio_file,
+                response_format="verbose_json"
+            )
+    finally:
+        done.set()
+    # The request itself can't be interrupted; drop the answer of a cancelled job
+    check_cancelled(job_id)
 
     elapsed = time.time() - start_time
     cost = (duration / 60) * 0.006
@@ -309,13 +769,200 @@ def transcribe_with_openai_progress(audio_path: str, model: str, job_id: str) ->
     }
 
 
+def resolve_backend(method: str) -> Optional[str]:
+    """Map a requested method onto the backend that will run it (None if it is not installed here)."""
+    if method == 'openai':
+        return 'openai'
+    if method in ('mlx', 'auto') and MLX_AVAILABLE:
+        return 'mlx'
+    if method in ('faster-whisper', 'auto') and FASTER_WHISPER_AVAILABLE:
+        return 'faster-whisper'
+    return None
+
+
+def no_backend_error(method: str) -> str:
+    """Why resolve_backend() found nothing for a method."""
+    if method in ('mlx', 'faster-whisper'):
+        return f'Backend {method} is not available on this server.'
+    return 'No transcription backend available. Install mlx-whisper or faster-whisper.'
+
+
+def estimator_key(backend: str, model: str, batched: bool = False) -> dict:
+    """What a backend's timings are recorded under: method, model, device and compute type."""
+    if backend == 'openai':
+        return {'method': 'openai', 'model': 'whisper-1', 'device': 'cloud'}
+    if backend == 'mlx':
+        return {'method': 'mlx', 'model': model, 'device': 'mlx', 'compute_type': 'float16'}
+    device, compute_type = get_faster_whisper_settings(FASTER_WHISPER_MODELS.get(model, model))
+    method = 'faster-whisper-batched' if batched else 'faster-whisper'
+    return {'method': method, 'model': model, 'device': device, 'compute_type': compute_type}
+
+
+def estimate_processing_time(backend: str, duration: float, options: Optional[dict] = None,
+                             batched: bool = False) -> float:
+    """
+    Expected seconds for a job on a backend, used for queue ETAs and progress.
+
+    Learned from this server's finished jobs; the speed-up shortens the audio
+    and, with silence removal on, the backend's usual silence share is assumed.
+    """
+    options = options or {}
+    speed = options.get('speed') or 1.0
+    silence_ratio = None if options.get('remove_silence', True) else 0.0
+    return ESTIMATOR.estimate(duration / speed, silence_ratio,
+                              **estimator_key(backend, options.get('model', DEFAULT_MODEL), batched))
+
+
+def record_processing_time(backend: str, options: dict, preprocess_stats: dict, seconds: float,
+                           batched: bool = False):
+    """Feed a finished job's preprocessing and decode time back into the estimator."""
+    speed = preprocess_stats.get('speed_applied') or 1.0
+    vad = preprocess_stats.get('vad') or {}
+    silence_ratio = 1 - vad['speech_ratio'] if vad.get('speech_ratio') is not None else 0.0
+    ESTIMATOR.record(preprocess_stats['original_duration'] / speed, seconds, silence_ratio,
+                     **estimator_key(backend, options.get('model', DEFAULT_MODEL), batched))
+
+
+def get_scheduler() -> JobScheduler:
+    """Create the worker pools on first use."""
+    global scheduler
+    if scheduler is None:
+        workers = {'openai': OPENAI_WORKERS}
+        if MLX_AVAILABLE:
+            workers['mlx'] = TRANSCRIBE_WORKERS
+        if FASTER_WHISPER_AVAILABLE:
+            workers['faster-whisper'] = TRANSCRIBE_WORKERS
+        scheduler = JobScheduler(
+            process_transcription,
+            workers=workers,
+            max_queue=MAX_QUEUE,
+            estimator=estimate_processing_time
+        )
+    return scheduler
+
+
+def job_with_queue_info(job: dict) -> dict:
+    """Job dict plus its live queue position and ETA."""
+    if job['status'] in TERMINAL_STATUSES:
+        return job
+    # Members of a batch share the batch's queue entry
+    return {**job, **get_scheduler().queue_info(job.get('batch_id') or job['id'])}
+
+
+def base_preprocess_stats(options: dict, original_duration: float) -> dict:
+    """Preprocessing summary before FFmpeg adds its measurements."""
+    return {
+        'original_duration': original_duration,
+        'speed_applied': options.get('speed', 1.0),
+        'silence_removed': options.get('remove_silence', True),
+        'compressed': options.get('compress', True)
+    }
+
+
+def record_decode_metrics(backend: str, model: str, result: dict, audio_seconds: float):
+    """Observe decode time and real-time factor for a finished transcription."""
+    decode_seconds = result.get('transcription_time', 0)
+    STAGE_SECONDS.observe(decode_seconds, stage='decode', backend=backend)
+    if audio_seconds:
+        device = result.get('device') or ('cloud' if backend == 'openai' else backend)
+        REAL_TIME_FACTOR.observe(decode_seconds / audio_seconds, model=model, device=device)
+
+
+def complete_job(job_id: str, options: dict, result: dict, preprocess_stats: dict) -> dict:
+    """Build the final result from a backend's output, cache it and mark the job completed."""
+    check_cancelled(job_id)
+    postprocess_start = time.time()
+    transcript_text = result.get('text', '').strip()
+    word_count = len(transcript_text.split())
+
+    segments = result.get('segments', [])
+    speech_map = speech_maps.pop(job_id, None)
+    if speech_map is not None:
+        segments = speech_map.remap_segments(segments)
+
+    final_result = {
+        'success': True,
+        'filename': options.get('filename', 'audio'),
+        'transcript': transcript_text,
+        'file_hash': options.get('file_hash'),
+        'segments': [{'start': seg['start'], 'end': seg['end'], 'text': seg['text']}
+                     for seg in segments],
+        'word_count': word_count,
+        'duration_seconds': preprocess_stats['original_duration'],
+        'transcription_time_seconds': result.get('transcription_time', 0),
+        'method': options.get('method', 'auto'),
+        'model': options.get('model', DEFAULT_MODEL),
+        'cost_usd': result.get('cost_usd', 0),
+        'preprocessing': preprocess_stats,
+        'language': result.get('language', 'en'),
+        'timestamp': datetime.now().isoformat()
+    }
+
+    if options.get('file_hash'):
+        RESULT_CACHE.put(options['file_hash'], options, final_result)
+    STAGE_SECONDS.observe(time.time() - postprocess_start, stage='postprocess', backend=jobs.get(job_id, {}).get('backend'))
+
+    update_job(job_id,
+        status='completed',
+        message='Transcription complete!',
+        progress=100,
+        result=final_result
+    )
+    return final_result
+
+
+def notify(message: str):
+    """Send a macOS notification (ignored elsewhere)."""
+    try:
+        subprocess.run([
+            'osascript', '-e',
+            f'display notification "{message}" with title "Voice Memo Transcriber"'
+        ], capture_output=True)
+    except:
+        pass
+
+
+def prepare_speech(job_id: str, audio, speed: float, remove_silence: bool, preprocess_stats: dict):
+    """
+    Cut silence from decoded audio with VAD and register the map that puts
+    segment timestamps back on the recording's timeline (undoing any speed-up).
+
+    Returns:
+        Samples to hand to the model
+    """
+    total = audio_duration(audio)
+    speech_map = detect_speech(audio, method=VAD_METHOD, scale=speed) if remove_silence else None
+    if speech_map is not None and speech_map.intervals:
+        audio = extract_speech(audio, speech_map)
+        preprocess_stats['vad'] = speech_map.stats()
+    else:
+        # Nothing to cut (or no speech found): transcribe everything, still rescale times
+        speech_map = SpeechMap([(0.0, total)], total, scale=speed, method='none')
+
+    speech_maps[job_id] = speech_map
+    preprocess_stats['silence_removed'] = remove_silence
+    preprocess_stats['final_duration'] = audio_duration(audio)
+    return audio
+
+
+def discard_decoder(job_id: str):
+    """Stop and drop the streaming decoder of an upload, if any."""
+    decoder = stream_decoders.pop(job_id, None)
+    if decoder is not None:
+        decoder.abort()
+
+
 def process_transcription(job_id: str, file_path: str, options: dict):
     """Background worker for transcription."""
     temp_files = [file_path]
+    token = cancel_tokens.setdefault(job_id, CancelToken())
+    backend = None
+    requeued = False
 
     try:
+        token.check()
         current_file = file_path
-        original_duration = get_audio_duration(current_file)
+        original_duration = options.get('duration') or get_audio_duration(current_file)
 
         update_job(job_id,
             status='preprocessing',
@@ -324,92 +971,101 @@ def process_transcription(job_id: str, file_path: str, options: dict):
             duration=original_duration
         )
 
-        preprocess_stats = {
-            'original_duration': original_duration,
-            'speed_applied': options.get('speed', 1.0),
-            'silence_removed': options.get('remove_silence', True),
-            'compressed': options.get('compress', True)
-        }
+        preprocess_stats = base_preprocess_stats(options, original_duration)
+        preprocess_start = time.time()
 
-        # Speed up if requested
         speed = options.get('speed', 1.0)
-        if speed != 1.0:
-            update_job(job_id, message=f'Speeding up audio ({speed}x)...', progress=3)
-            sped_up_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-            sped_up_file.close()
-            temp_files.append(sped_up_file.name)
-            if speed_up_audio(current_file, sped_up_file.name, speed):
-                current_file = sped_up_file.name
-
-        # Preprocess (silence removal + compression)
         remove_silence = options.get('remove_silence', True)
         compress = options.get('compress', True)
-
-        if remove_silence or compress:
-            update_job(job_id, message='Removing silence & compressing...', progress=5)
-            preprocessed_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            preprocessed_file.close()
-            temp_files.append(preprocessed_file.name)
-
-            current_file, pp_stats = preprocess_audio(
-                current_file,
-                preprocessed_file.name,
-                remove_silence_enabled=remove_silence,
-                compress_enabled=compress
-            )
+        method = options.get('method', 'auto')
+        model = options.get('model', DEFAULT_MODEL)
+        backend = resolve_backend(method)
+
+        if backend == 'openai':
+            # The API needs a file: a compact 16 kHz mono mp3
+            audio = current_file
+            if remove_silence:
+                update_job(job_id, message='Detecting speech...', progress=5)
+                preprocessed_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
+                preprocessed_file.close()
+                temp_files.append(preprocessed_file.name)
+                samples, pp_stats = decode_audio(current_file, speed=speed, remove_silence_enabled=False,
+                                                 cancel=token)
+                preprocess_stats.update(pp_stats)
+                samples = prepare_speech(job_id, samples, speed, True, preprocess_stats)
+                audio = encode_audio(samples, preprocessed_file.name, cancel=token)
+            elif speed != 1.0 or compress:
+                update_job(job_id, message='Preprocessing audio...', progress=5)
+                preprocessed_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
+                preprocessed_file.close()
+                temp_files.append(preprocessed_file.name)
+                audio, pp_stats = preprocess_audio(
+                    current_file,
+                    preprocessed_file.name,
+                    remove_silence_enabled=False,
+                    compress_enabled=compress,
+                    speed=speed,
+                    cancel=token
+                )
+                preprocess_stats.update(pp_stats)
+                speech_maps[job_id] = SpeechMap([(0.0, pp_stats['final_duration'])], pp_stats['final_duration'],
+                                                scale=speed, method='none')
+        else:
+            # Local models take samples directly: decode, speed up and resample in
+            # a single FFmpeg pass with no temp files, then cut silence with VAD
+            steps = [f'{speed}x speed'] if speed != 1.0 else []
+            if remove_silence:
+                steps.append('silence removal')
+            decoder = stream_decoders.pop(job_id, None)
+            decoded = decoder.finish() if decoder else None
+            if decoded is not None:
+                update_job(job_id, message='Using audio decoded during upload...', progress=5)
+                audio, pp_stats = decoded
+            else:
+                update_job(job_id, message=f'Decoding audio ({", ".join(steps + ["16 kHz mono"])})...', progress=5)
+                audio, pp_stats = decode_audio(
+                    current_file,
+                    speed=speed,
+                    remove_silence_enabled=False,
+                    cancel=token
+                )
             preprocess_stats.update(pp_stats)
+            audio = prepare_speech(job_id, audio, speed, remove_silence, preprocess_stats)
 
-        # Transcribe
-        method = options.get('method', 'auto')
-        model = options.get('model', 'large-v3')
+        token.check()
+        preprocess_seconds = time.time() - preprocess_start
+        STAGE_SECONDS.observe(preprocess_seconds, stage='preprocess', backend=backend)
 
+        # Transcribe
         update_job(job_id, status='transcribing', message='Starting transcription...', progress=10)
 
-        if method == 'openai':
-            result = transcribe_with_openai_progress(current_file, 'whisper-1', job_id)
-        elif method == 'mlx' or (method == 'auto' and MLX_AVAILABLE):
+        if backend == 'openai':
+            result = transcribe_with_openai_progress(audio, 'whisper-1', job_id)
+        elif backend == 'mlx':
             mlx_model = MLX_MODELS.get(model, model)
-            result = transcribe_with_mlx_progress(current_file, mlx_model, job_id)
-        elif method == 'faster-whisper' or (method == 'auto' and FASTER_WHISPER_AVAILABLE):
+            result = transcribe_with_mlx_progress(audio, mlx_model, job_id)
+        elif backend == 'faster-whisper':
             fw_model = FASTER_WHISPER_MODELS.get(model, model)
-            result = transcribe_with_faster_whisper_progress(current_file, fw_model, job_id)
+            result = transcribe_with_faster_whisper_progress(audio, fw_model, job_id)
         else:
             raise RuntimeError("No transcription backend available. Install mlx-whisper or faster-whisper.")
 
-        # Build final result
-        transcript_text = result.get('text', '').strip()
-        word_count = len(transcript_text.split())
-
-        final_result = {
-            'success': True,
-            'filename': options.get('filename', 'audio'),
-            'transcript': transcript_text,
-            'word_count': word_count,
-            'duration_seconds': original_duration,
-            'transcription_time_seconds': result.get('transcription_time', 0),
-            'method': method,
-            'model': model,
-            'cost_usd': result.get('cost_usd', 0),
-            'preprocessing': preprocess_stats,
-            'language': result.get('language', 'en'),
-            'timestamp': datetime.now().isoformat()
-        }
-
-        update_job(job_id,
-            status='completed',
-            message='Transcription complete!',
-            progress=100,
-            result=final_result
-        )
-
-        # Send macOS notification
-        try:
-            subprocess.run([
-                'osascript', '-e',
-                f'display notification "Transcription complete: {word_count} words" with title "Voice Memo Transcriber"'
-            ], capture_output=True)
-        except:
-            pass
+        record_decode_metrics(backend, model, result,
+                              preprocess_stats.get('final_duration') or original_duration)
+        record_processing_time(backend, options, preprocess_stats,
+                               preprocess_seconds + result.get('transcription_time', 0))
+        final_result = complete_job(job_id, options, result, preprocess_stats)
+        notify(f"Transcription complete: {final_result['word_count']} words")
+
+    except JobCancelled as e:
+        if cancel_tokens.get(job_id) is token:
+            cancel_tokens.pop(job_id)
+        if e.reason == 'preempted' and backend and requeue_job(
+                job_id, backend, file_path, options, 'Re-queued after a higher-priority job'):
+            temp_files.remove(file_path)  # the upload is needed for the rerun
+            requeued = True
+        else:
+            update_job(job_id, status='cancelled', message='Cancelled')
 
     except Exception as e:
         update_job(job_id,
@@ -420,6 +1076,13 @@ def process_transcription(job_id: str, file_path: str, options: dict):
         )
 
     finally:
+        if cancel_tokens.get(job_id) is token:
+            cancel_tokens.pop(job_id)
+        # Once requeued, a free worker may already be running the job again;
+        # its speech map and decoder are under the same job_id
+        if not requeued:
+            discard_decoder(job_id)
+            speech_maps.pop(job_id, None)
         # Clean up temp files
         for temp_file in temp_files:
             try:
@@ -429,6 +1092,113 @@ def process_transcription(job_id: str, file_path: str, options: dict):
                 pass
 
 
+def process_batch(batch_id: str, members: list):
+    """
+    Background worker for a group of short clips decoded as shared batches.
+
+    Args:
+        batch_id: Queue entry the group runs under
+        members: List of (job_id, file_path, options), one per clip
+
+    Members cancelled on their own are skipped; the batch as a whole stops
+    when its own token is cancelled.
+    """
+    clips = []
+    decoded = []  # (job_id, options, preprocess_stats) for each clip in clips
+    token = cancel_tokens.setdefault(batch_id, CancelToken())
+
+    try:
+        preprocess_start = time.time()
+        for job_id, file_path, options in members:
+            token.check()
+            if is_cancelled(job_id):
+                continue
+            original_duration = options.get('duration') or get_audio_duration(file_path)
+            update_job(job_id,
+                status='preprocessing',
+                message=f'Decoding audio (batch {batch_id})...',
+                progress=5,
+                duration=original_duration
+            )
+            try:
+                audio, pp_stats = decode_audio(
+                    file_path,
+                    speed=options.get('speed', 1.0),
+                    remove_silence_enabled=False,
+                    cancel=token
+                )
+                preprocess_stats = base_preprocess_stats(options, original_duration)
+                preprocess_stats.update(pp_stats)
+                audio = prepare_speech(job_id, audio, options.get('speed', 1.0),
+                                       options.get('remove_silence', True), preprocess_stats)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                update_job(job_id, status='error', message=str(e), progress=0, error=str(e))
+                continue
+            clips.append(audio)
+            decoded.append((job_id, options, preprocess_stats))
+
+        if not decoded:
+            return
+        preprocess_seconds = time.time() - preprocess_start
+        STAGE_SECONDS.observe(preprocess_seconds, stage='preprocess', backend='faster-whisper')
+
+        model = decoded[0][1].get('model', DEFAULT_MODEL)
+        fw_model = FASTER_WHISPER_MODELS.get(model, model)
+        device, compute_type = get_faster_whisper_settings(fw_model)
+        target = "GPU" if device == "cuda" else "CPU"
+        for job_id, _, _ in decoded:
+            update_job(job_id, status='transcribing', progress=10,
+                       message=f'Transcribing in a batch of {len(decoded)} clips ({target})...')
+
+        durations = [audio_duration(clip) for clip in clips]
+
+        def on_segment(index, segment):
+            token.check()
+            if not is_cancelled(decoded[index][0]):
+                record_segment(decoded[index][0], segment, durations[index], f' (batch, {target})')
+
+        with MODEL_POOL.acquire(fw_model, device, compute_type) as whisper_model:
+            start_time = time.time()
+            results = transcribe_clips(whisper_model, clips, batch_size=BATCH_SIZE, on_segment=on_segment)
+            elapsed = time.time() - start_time
+
+        # Attribute the shared decode time by each clip's share of the audio
+        total = sum(durations) or 1.0
+        record_decode_metrics('faster-whisper', model, {'transcription_time': elapsed, 'device': device}, total)
+        for (job_id, options, preprocess_stats), result, duration in zip(decoded, results, durations):
+            if is_cancelled(job_id):
+                continue
+            result['transcription_time'] = elapsed * duration / total
+            record_processing_time('faster-whisper', options, preprocess_stats,
+                                   (preprocess_seconds + elapsed) * duration / total, batched=True)
+            complete_job(job_id, options, result, preprocess_stats)
+
+        notify(f"Batch complete: {len(decoded)} files")
+
+    except JobCancelled:
+        for job_id, _, _ in members:
+            if jobs.get(job_id, {}).get('status') not in TERMINAL_STATUSES:
+                update_job(job_id, status='cancelled', message='Cancelled')
+
+    except Exception as e:
+        for job_id, _, _ in members:
+            if jobs.get(job_id, {}).get('status') not in TERMINAL_STATUSES:
+                update_job(job_id, status='error', message=str(e), progress=0, error=str(e))
+
+    finally:
+        cancel_tokens.pop(batch_id, None)
+        for job_id, file_path, _ in members:
+            cancel_tokens.pop(job_id, None)
+            speech_maps.pop(job_id, None)
+            try:
+                if os.path.exists(file_path):
+                    os.unlink(file_path)
+            except:
+                pass
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -450,16 +1220,137 @@ def health_check():
         'faster_whisper_available': FASTER_WHISPER_AVAILABLE,
         'gpu_available': GPU_AVAILABLE,
         'openai_available': bool(os.getenv('OPENAI_API_KEY')),
-        'active_jobs': len([j for j in jobs.values() if j['status'] in ('preprocessing', 'transcribing')])
+        'active_jobs': len([j for j in jobs.values() if j['status'] in ('preprocessing', 'transcribing')]),
+        'queued_jobs': len([j for j in jobs.values() if j['status'] == 'queued']),
+        'queue': get_scheduler().stats(),
+        'default_model': DEFAULT_MODEL,
+        'models': MODEL_POOL.stats(),
+        'cache': RESULT_CACHE.stats(),
+        'uploads_in_progress': UPLOADS.count(),
+        'estimator': ESTIMATOR.summary(),
+        'autotune': AUTOTUNE.describe(faster_whisper_device()) if FASTER_WHISPER_AVAILABLE else None,
+        'streaming': {
+            'active': len(streams),
+            'max_streams': MAX_STREAMS,
+            'model': STREAM_MODEL,
+            'websocket': SOCK_AVAILABLE
+        }
     })
 
 
+@app.route('/estimate', methods=['GET'])
+def get_estimate():
+    """
+    Expected processing time for a recording, plus the wait before it would start.
+
+    Query parameters: duration (seconds, required), method, model, speed and
+    remove_silence as for /transcribe. Clients use this to pick the backend
+    that will finish soonest.
+    """
+    try:
+        duration = float(request.args['duration'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'duration (seconds) is required'}), 400
+
+    method = request.args.get('method', 'auto')
+    backend = resolve_backend(method)
+    if backend is None:
+        return jsonify({'error': 'No transcription backend available'}), 503
+
+    options = request_options(method, request.args)
+    key = estimator_key(backend, options['model'])
+    fitted = ESTIMATOR.describe(**key)
+    seconds = estimate_processing_time(backend, duration, options)
+    queue_wait = get_scheduler().stats().get(backend, {}).get('backlog_seconds', 0.0)
+
+    return jsonify({
+        'backend': backend,
+        **key,
+        'duration_seconds': duration,
+        'estimated_seconds': round(seconds, 1),
+        'queue_wait_seconds': queue_wait,
+        'estimated_completion_seconds': round(queue_wait + seconds, 1),
+        'rtf': fitted['rtf'],
+        'samples': fitted['samples']
+    })
+
+
+def request_options(method: str, values: Optional[dict] = None) -> dict:
+    """Transcription options from the submitted form (or upload metadata)."""
+    values = request.form if values is None else values
+    return {
+        'method': method,
+        'model': values.get('model', DEFAULT_MODEL),
+        'speed': float(values.get('speed', 1.0)),
+        'remove_silence': values.get('remove_silence', 'true').lower() == 'true',
+        'compress': values.get('compress', 'true').lower() == 'true'
+    }
+
+
+def create_job(job_id: str, filename: str, backend: str, priority: int, file_hash: str) -> dict:
+    """Register a new queued job in memory."""
+    jobs[job_id] = {
+        'id': job_id,
+        'filename': filename,
+        'status': 'queued',
+        'progress': 0,
+        'message': 'Queued',
+        'result': None,
+        'error': None,
+        'backend': backend,
+        'priority': priority,
+        'file_hash': file_hash,
+        'created_at': time.time(),
+        'updated_at': time.time()
+    }
+    return jobs[job_id]
+
+
+def source_hash(values, file_hash: str) -> tuple[str, Optional[str]]:
+    """
+    Hash a job's result is cached under: the original recording's SHA-256
+    when the client sent a copy re-encoded with one of TRANSFER_CODECS
+    (source_sha256 and source_codec), otherwise that of the bytes received.
+
+    Returns:
+        Tuple of (hash, transfer codec or None). A claimed hash is only taken
+        together with its codec, which keeps the result apart from one
+        computed from the original bytes.
+    """
+    claimed = (values.get('source_sha256') or '').lower()
+    codec = values.get('source_codec')
+    if codec in TRANSFER_CODECS and re.fullmatch(r'[0-9a-f]{64}', claimed):
+        return claimed, codec
+    return file_hash, None
+
+
+def complete_from_cache(job_id: str, upload_path: Path, options: dict) -> bool:
+    """Finish a job from the result cache if possible. Returns True on a hit."""
+    cached = RESULT_CACHE.get(options['file_hash'], options)
+    if cached is None:
+        return False
+
+    upload_path.unlink(missing_ok=True)
+    JOB_STORE.create(jobs[job_id], options=options)
+    update_job(job_id,
+        status='completed',
+        message='Transcription complete (cached)',
+        progress=100,
+        duration=cached.get('duration_seconds'),
+        cache_hit=True,
+        result={**cached, 'filename': options['filename']}
+    )
+    return True
+
+
 @app.route('/transcribe', methods=['POST'])
 def transcribe():
     """
-    Start transcription job. Returns job_id immediately.
+    Queue a transcription job. Returns job_id immediately.
     Poll /job/<job_id> or subscribe to /progress/<job_id> for updates.
+    Responds 429 when the backend's queue is full.
     """
+    upload_start = time.time()
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
 
@@ -470,85 +1361,826 @@ def transcribe():
     if not allowed_file(file.filename):
         return jsonify({'error': f'Invalid file type'}), 400
 
+    method = request.form.get('method', 'auto')
+    backend = resolve_backend(method)
+    if backend is None:
+        return jsonify({'error': no_backend_error(method)}), 400
+
+    try:
+        priority = int(request.form.get('priority', 0))
+    except ValueError:
+        return jsonify({'error': 'priority must be an integer'}), 400
+
+    # Reject before writing a large upload to disk
+    try:
+        get_scheduler().check_admission(backend)
+    except QueueFullError as e:
+        return queue_full_response(e)
+
     # Create job
     job_id = str(uuid.uuid4())[:8]
     filename = secure_filename(file.filename)
+    options = {**request_options(method), 'filename': filename}
 
     # Save uploaded file
     upload_path = UPLOAD_FOLDER / f"{job_id}_{filename}"
     file.save(str(upload_path))
+    options['file_hash'], options['transfer_codec'] = source_hash(request.form, compute_file_hash(str(upload_path)))
+    STAGE_SECONDS.observe(time.time() - upload_start, stage='upload', backend=backend)
+    create_job(job_id, filename, backend, priority, options['file_hash'])
 
-    # Initialize job
-    jobs[job_id] = {
-        'id': job_id,
-        'filename': filename,
-        'status': 'queued',
-        'progress': 0,
-        'message': 'Starting...',
-        'result': None,
-        'error': None,
-        'created_at': time.time(),
-        'updated_at': time.time()
-    }
+    # Same audio with the same options was already transcribed: skip all work
+    if complete_from_cache(job_id, upload_path, options):
+        return cached_response(job_id, options)
 
-    # Get options
-    options = {
-        'method': request.form.get('method', 'mlx'),
-        'model': request.form.get('model', 'large-v3'),
-        'speed': float(request.form.get('speed', 1.0)),
-        'remove_silence': request.form.get('remove_silence', 'true').lower() == 'true',
-        'compress': request.form.get('compress', 'true').lower() == 'true',
-        'filename': filename
-    }
+    return enqueue_job(job_id, backend, upload_path, options, priority)
 
-    # Start background processing
-    thread = threading.Thread(
-        target=process_transcription,
-        args=(job_id, str(upload_path), options),
-        daemon=True
-    )
-    thread.start()
 
+def cached_response(job_id: str, options: dict):
+    """Response for a job that was completed from the result cache."""
     return jsonify({
         'job_id': job_id,
-        'filename': filename,
+        'filename': options['filename'],
+        'status': 'completed',
+        'message': 'Cached result',
+        'cache_hit': True,
+        'file_hash': options['file_hash']
+    })
+
+
+def enqueue_job(job_id: str, backend: str, upload_path: Path, options: dict, priority: int):
+    """Probe the upload, persist the job and queue it. Returns the response to send."""
+    with STAGE_SECONDS.time(stage='probe', backend=backend):
+        duration = get_audio_duration(str(upload_path))
+    options['duration'] = duration
+    jobs[job_id]['duration'] = duration
+    JOB_STORE.create(jobs[job_id], file_path=str(upload_path), options=options)
+
+    try:
+        get_scheduler().submit(
+            job_id, backend,
+            args=(str(upload_path), options),
+            duration=duration,
+            priority=priority,
+            estimate=estimate_processing_time(backend, duration, options)
+        )
+    except QueueFullError as e:
+        jobs.pop(job_id, None)
+        JOB_STORE.delete(job_id)
+        upload_path.unlink(missing_ok=True)
+        discard_decoder(job_id)
+        return queue_full_response(e)
+    except KeyError as e:
+        # The backend has no worker pool here; fail the job rather than leave it queued
+        error = e.args[0] if e.args else str(e)
+        update_job(job_id, status='error', progress=0, message=error, error=error)
+        upload_path.unlink(missing_ok=True)
+        discard_decoder(job_id)
+        return jsonify({'job_id': job_id, 'status': 'error', 'error': error}), 400
+
+    preempt_for(backend, priority)
+    queue_info = get_scheduler().queue_info(job_id)
+
+    return jsonify({
+        'job_id': job_id,
+        'filename': options['filename'],
         'status': 'queued',
-        'message': 'Transcription started'
+        'message': 'Transcription queued',
+        'queue_position': queue_info.get('queue_position', 0),
+        'eta_seconds': queue_info.get('eta_seconds')
     })
 
 
+@app.route('/transcribe/batch', methods=['POST'])
+def transcribe_batch():
+    """
+    Queue many files at once (multipart field 'files'). Returns one job per file.
+
+    On faster-whisper, short clips are grouped and each group runs as a single
+    queue entry through batched inference; longer files, and files for other
+    backends, are queued as ordinary jobs. Options apply to every file.
+    Responds 429 when the backend's queue cannot take the whole request.
+    """
+    upload_start = time.time()
+    files = [f for f in request.files.getlist('files') if f.filename]
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+
+    method = request.form.get('method', 'auto')
+    backend = resolve_backend(method)
+    if backend is None:
+        return jsonify({'error': no_backend_error(method)}), 400
+
+    try:
+        priority = int(request.form.get('priority', 0))
+    except ValueError:
+        return jsonify({'error': 'priority must be an integer'}), 400
+
+    try:
+        get_scheduler().check_admission(backend)
+    except QueueFullError as e:
+        return queue_full_response(e)
+
+    options = request_options(method)
+    results = []
+    pending = []  # (job_id, upload_path, options) still to transcribe
+
+    for file in files:
+        filename = secure_filename(file.filename)
+        if not allowed_file(file.filename):
+            results.append({'filename': filename, 'status': 'error', 'error': 'Invalid file type'})
+            continue
+
+        job_id = str(uuid.uuid4())[:8]
+        file_options = {**options, 'filename': filename}
+        upload_path = UPLOAD_FOLDER / f"{job_id}_{filename}"
+        file.save(str(upload_path))
+        file_options['file_hash'] = compute_file_hash(str(upload_path))
+        create_job(job_id, filename, backend, priority, file_options['file_hash'])
+
+        if complete_from_cache(job_id, upload_path, file_options):
+            results.append({'job_id': job_id, 'filename': filename, 'status': 'completed',
+                            'cache_hit': True, 'file_hash': file_options['file_hash']})
+            continue
+
+        with STAGE_SECONDS.time(stage='probe', backend=backend):
+            file_options['duration'] = get_audio_duration(str(upload_path))
+        jobs[job_id]['duration'] = file_options['duration']
+        pending.append((job_id, str(upload_path), file_options))
+        results.append({'job_id': job_id, 'filename': filename, 'status': 'queued'})
+
+    STAGE_SECONDS.observe(time.time() - upload_start, stage='upload', backend=backend)
+
+    if backend == 'faster-whisper':
+        groups, singles = plan_groups([o['duration'] for _, _, o in pending],
+                                      BATCH_CLIP_SECONDS, BATCH_GROUP_SECONDS)
+    else:
+        groups, singles = [], list(range(len(pending)))
+
+    try:
+        get_scheduler().check_admission(backend, entries=len(groups) + len(singles))
+    except QueueFullError as e:
+        for job_id, upload_path, _ in pending:
+            jobs.pop(job_id, None)
+            Path(upload_path).unlink(missing_ok=True)
+        return queue_full_response(e)
+
+    batch_of = {}
+    for group in groups:
+        batch_id = str(uuid.uuid4())[:8]
+        members = [pending[i] for i in group]
+        for job_id, upload_path, file_options in members:
+            jobs[job_id]['batch_id'] = batch_of[job_id] = batch_id
+            JOB_STORE.create(jobs[job_id], file_path=upload_path, options=file_options)
+        submit_or_fail(batch_id, backend, members,
+                       args=(members,),
+                       duration=sum(m[2]['duration'] for m in members),
+                       priority=priority,
+                       handler=process_batch,
+                       estimate=sum(estimate_processing_time(backend, m[2]['duration'], m[2], batched=True)
+                                    for m in members))
+
+    for i in singles:
+        job_id, upload_path, file_options = pending[i]
+        JOB_STORE.create(jobs[job_id], file_path=upload_path, options=file_options)
+        submit_or_fail(job_id, backend, [pending[i]],
+                       args=(upload_path, file_options),
+                       duration=file_options['duration'],
+                       priority=priority,
+                       estimate=estimate_processing_time(backend, file_options['duration'], file_options))
+
+    preempt_for(backend, priority)
+
+    for entry in results:
+        job_id = entry.get('job_id')
+        if job_id in batch_of:
+            entry['batch_id'] = batch_of[job_id]
+        if job_id and entry['status'] == 'queued':
+            job = jobs.get(job_id)
+            if job is None or job['status'] == 'error':
+                entry.update(status='error', error=job['error'] if job else 'Queue full')
+            else:
+                entry.update({k: v for k, v in job_with_queue_info(job).items()
+                              if k in ('queue_position', 'eta_seconds')})
+
+    return jsonify({
+        'jobs': results,
+        'batches': len(groups),
+        'queued': sum(1 for r in results if r['status'] == 'queued'),
+        'cached': sum(1 for r in results if r.get('cache_hit'))
+    })
+
+
+def submit_or_fail(entry_id: str, backend: str, members: list, **kwargs):
+    """Submit a queue entry; if the queue filled up meanwhile, fail its jobs instead."""
+    try:
+        get_scheduler().submit(entry_id, backend, **kwargs)
+    except (QueueFullError, KeyError) as e:
+        error = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+        for job_id, upload_path, _ in members:
+            update_job(job_id, status='error', message=error, progress=0, error=error)
+            Path(upload_path).unlink(missing_ok=True)
+
+
+TUS_HEADERS = {'Tus-Resumable': '1.0.0'}
+
+
+def tus_response(body: Optional[dict] = None, status: int = 204, **headers):
+    """Upload protocol response with the tus version header."""
+    response = jsonify(body) if body is not None else Response(status=status)
+    response.status_code = status
+    response.headers.update(TUS_HEADERS)
+    for name, value in headers.items():
+        response.headers[name.replace('_', '-')] = str(value)
+    return response
+
+
+@app.route('/uploads', methods=['OPTIONS'])
+def upload_options():
+    """Advertise the supported upload protocol."""
+    return tus_response(Tus_Version='1.0.0', Tus_Max_Size=MAX_CONTENT_LENGTH,
+                        Tus_Extension='creation,creation-defer-length,termination')
+
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    """
+    Start a resumable upload (tus 1.0 core with creation and termination).
+
+    Headers:
+        Upload-Length: Total size in bytes, or Upload-Defer-Length: 1 when the
+            client is still producing the file (e.g. encoding it); the length
+            is then sent with a later PATCH
+        Upload-Metadata: tus key/value pairs: filename (required), sha256,
+            method, model, speed, remove_silence, compress, priority
+
+    When sha256 is given and a transcript for it is cached, the job completes
+    immediately and no audio has to be sent. Otherwise responds 201 with the
+    upload's Location; send the bytes with PATCH and resume after a dropped
+    connection from the offset HEAD reports. The PATCH that delivers the last
+    byte queues the job and returns it like /transcribe.
+    """
+    try:
+        if request.headers.get('Upload-Defer-Length') == '1' and 'Upload-Length' not in request.headers:
+            length = None
+        else:
+            length = int(request.headers.get('Upload-Length', ''))
+        metadata = parse_metadata(request.headers.get('Upload-Metadata'))
+    except ValueError:
+        return tus_response({'error': 'Upload-Length or Upload-Defer-Length header required'}, 400)
+    except UploadError as e:
+        return tus_response({'error': str(e)}, e.status)
+
+    filename = secure_filename(metadata.get('filename', ''))
+    if not filename or not allowed_file(filename):
+        return tus_response({'error': 'Invalid file type'}, 400)
+
+    method = metadata.get('method', 'auto')
+    backend = resolve_backend(method)
+    if backend is None:
+        return tus_response({'error': no_backend_error(method)}, 400)
+
+    try:
+        int(metadata.get('priority', 0))
+        options = {**request_options(method, metadata), 'filename': filename}
+    except ValueError:
+        return tus_response({'error': 'priority and speed must be numbers'}, 400)
+
+    try:
+        get_scheduler().check_admission(backend)
+    except QueueFullError as e:
+        return queue_full_response(e)
+
+    job_id = str(uuid.uuid4())[:8]
+
+    # The client already knows the hash: answer from the cache before any bytes move
+    claimed_hash, transfer_codec = source_hash(metadata, metadata.get('sha256', '').lower())
+    if re.fullmatch(r'[0-9a-f]{64}', claimed_hash):
+        options['file_hash'], options['transfer_codec'] = claimed_hash, transfer_codec
+        create_job(job_id, filename, backend, int(metadata.get('priority', 0)), claimed_hash)
+        if complete_from_cache(job_id, UPLOAD_FOLDER / f"{job_id}_{filename}", options):
+            return tus_response(cached_response(job_id, options).get_json(), 200)
+        jobs.pop(job_id, None)
+
+    try:
+        UPLOADS.create(job_id, filename, length, metadata)
+    except UploadError as e:
+        return tus_response({'error': str(e)}, e.status)
+
+    if backend != 'openai':
+        try:
+            stream_decoders[job_id] = StreamingDecoder(
+                speed=options['speed'],
+                remove_silence_enabled=False,
+                max_seconds=STREAM_DECODE_MAX_SECONDS
+            )
+        except OSError as e:
+            print(f"Streaming decode unavailable: {e}")
+
+    return tus_response({'upload_id': job_id, 'offset': 0, 'length': length}, 201,
+                        Location=f"/uploads/{job_id}", Upload_Offset=0)
+
+
+@app.route('/uploads/<upload_id>', methods=['HEAD'])
+def upload_status(upload_id):
+    """Current offset of an upload, for resuming."""
+    upload = UPLOADS.get(upload_id)
+    if upload is None:
+        return tus_response(status=404)
+    if upload.length is None:
+        return tus_response(status=200, Upload_Offset=upload.offset, Upload_Defer_Length=1,
+                            Cache_Control='no-store')
+    return tus_response(status=200, Upload_Offset=upload.offset, Upload_Length=upload.length,
+                        Cache_Control='no-store')
+
+
+@app.route('/uploads/<upload_id>', methods=['PATCH'])
+def upload_chunk(upload_id):
+    """
+    Append bytes at Upload-Offset (Content-Type: application/offset+octet-stream).
+    Uploads created with a deferred length take Upload-Length on any PATCH,
+    normally the last. Responds 204 with the new offset, or with the queued
+    job once complete.
+    """
+    if request.content_type != 'application/offset+octet-stream':
+        return tus_response({'error': 'Content-Type must be application/offset+octet-stream'}, 415)
+
+    upload = UPLOADS.get(upload_id)
+    if upload is None:
+        return tus_response({'error': 'Upload not found'}, 404)
+
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return tus_response({'error': 'Upload-Offset header required'}, 400)
+
+    if 'Upload-Length' in request.headers:
+        try:
+            UPLOADS.set_length(upload, int(request.headers['Upload-Length']))
+        except ValueError:
+            return tus_response({'error': 'Upload-Length must be an integer'}, 400)
+        except UploadError as e:
+            return tus_response({'error': str(e)}, e.status, Upload_Offset=upload.offset)
+
+    decoder = stream_decoders.get(upload_id)
+    try:
+        UPLOADS.append(upload, offset, request.stream, on_data=decoder.feed if decoder else None)
+    except UploadError as e:
+        return tus_response({'error': str(e)}, e.status, Upload_Offset=upload.offset)
+
+    if not upload.complete:
+        return tus_response(Upload_Offset=upload.offset)
+
+    response = finish_upload(upload)
+    response.headers.update(TUS_HEADERS)
+    response.headers['Upload-Offset'] = str(upload.offset)
+    return response
+
+
+def finish_upload(upload):
+    """Turn a fully received upload into a job, short-circuiting to the cache when possible."""
+    job_id = upload.id
+    file_hash = UPLOADS.finish(upload)
+    metadata = upload.metadata
+    STAGE_SECONDS.observe(time.time() - upload.created_at, stage='upload',
+                          backend=resolve_backend(metadata.get('method', 'auto')))
+
+    claimed_hash = metadata.get('sha256', '').lower()
+    if claimed_hash and claimed_hash != file_hash:
+        upload.path.unlink(missing_ok=True)
+        discard_decoder(job_id)
+        response = jsonify({'error': 'Checksum mismatch', 'file_hash': file_hash})
+        response.status_code = 460
+        return response
+
+    method = metadata.get('method', 'auto')
+    backend = resolve_backend(method)
+    priority = int(metadata.get('priority', 0))
+    filename = secure_filename(metadata['filename'])
+    # A transcoded upload is cached under the original recording's hash
+    file_hash, transfer_codec = source_hash(metadata, file_hash)
+    options = {**request_options(method, metadata), 'filename': filename, 'file_hash': file_hash,
+               'transfer_codec': transfer_codec}
+    create_job(job_id, filename, backend, priority, file_hash)
+
+    if complete_from_cache(job_id, upload.path, options):
+        discard_decoder(job_id)
+        return cached_response(job_id, options)
+
+    if job_id in stream_decoders:
+        stream_decoders[job_id].close()
+    return enqueue_job(job_id, backend, upload.path, options, priority)
+
+
+@app.route('/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """Abandon an upload and delete the partial file."""
+    upload = UPLOADS.get(upload_id)
+    if upload is None:
+        return tus_response({'error': 'Upload not found'}, 404)
+    UPLOADS.delete(upload)
+    discard_decoder(upload_id)
+    return tus_response()
+
+
+@app.route('/cache/<file_hash>', methods=['GET'])
+def cache_lookup(file_hash):
+    """
+    Look up cached results by audio SHA-256. HEAD answers 200/404 without a body,
+    so clients can skip uploading audio that has already been transcribed.
+
+    With any of model/speed/remove_silence/compress as query parameters the exact
+    variant is looked up and returned; otherwise all cached variants are listed.
+    Only results from the original bytes are returned unless codec names the
+    transfer codec the caller would re-encode with.
+    """
+    file_hash = file_hash.lower()
+    if not re.fullmatch(r'[0-9a-f]{64}', file_hash):
+        return jsonify({'error': 'Expected a full SHA-256 hex digest'}), 400
+
+    codec = request.args.get('codec')
+    if codec is not None and codec not in TRANSFER_CODECS:
+        return jsonify({'error': f"codec must be one of: {', '.join(TRANSFER_CODECS)}"}), 400
+
+    if any(k in request.args for k in ('model', 'speed', 'remove_silence', 'compress', 'codec')):
+        options = {
+            'model': request.args.get('model', DEFAULT_MODEL),
+            'speed': float(request.args.get('speed', 1.0)),
+            'remove_silence': request.args.get('remove_silence', 'true').lower() == 'true',
+            'compress': request.args.get('compress', 'true').lower() == 'true',
+            'transfer_codec': codec
+        }
+        result = RESULT_CACHE.get(file_hash, options)
+        if result is None:
+            return jsonify({'file_hash': file_hash, 'cached': False}), 404
+        return jsonify({'file_hash': file_hash, 'cached': True, 'result': result})
+
+    entries = RESULT_CACHE.entries_for_hash(file_hash)
+    if not entries:
+        return jsonify({'file_hash': file_hash, 'cached': False}), 404
+    return jsonify({'file_hash': file_hash, 'cached': True, 'entries': entries})
+
+
+def queue_full_response(error: QueueFullError):
+    """429 response telling the client when to retry."""
+    retry_after = max(1, int(error.retry_after))
+    response = jsonify({
+        'error': str(error),
+        'backend': error.backend,
+        'queued': error.depth,
+        'retry_after_seconds': retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/job/<job_id>', methods=['GET'])
 def get_job(job_id):
     """Get job status."""
-    if job_id not in jobs:
+    job = find_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_with_queue_info(job))
+
+
+@app.route('/job/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancel a job.
+
+    A queued job is removed before it starts. A running job has its FFmpeg
+    process killed, stops before its next segment and gives up its worker
+    slot at once, so the next job starts without waiting for it to wind down.
+    A clip in a batch is dropped from the batch; the batch itself stops once
+    all of its clips are cancelled.
+    """
+    job = find_job(job_id)
+    if job is None:
         return jsonify({'error': 'Job not found'}), 404
-    return jsonify(jobs[job_id])
+    if job['status'] in TERMINAL_STATUSES:
+        return jsonify({'error': f"Job already {job['status']}", 'status': job['status']}), 409
+    if job_id not in jobs:
+        return jsonify({'error': 'Job is not active on this server', 'status': job['status']}), 409
+
+    cancel_tokens.setdefault(job_id, CancelToken()).cancel()
+    update_job(job_id, status='cancelled', message='Cancelled')
+    if abort_stream(job_id):
+        return jsonify({'job_id': job_id, 'status': 'cancelled'})
+
+    entry_id = job.get('batch_id') or job_id
+    if entry_id != job_id:
+        siblings = [j for j in jobs.values() if j.get('batch_id') == entry_id]
+        if any(j['status'] not in TERMINAL_STATUSES for j in siblings):
+            return jsonify({'job_id': job_id, 'status': 'cancelled', 'batch_id': entry_id})
+    else:
+        siblings = [job]
+
+    scheduler = get_scheduler()
+    if scheduler.cancel(entry_id):
+        # Never started: nothing will clean up after it but us
+        for sibling in siblings:
+            cancel_tokens.pop(sibling['id'], None)
+            discard_decoder(sibling['id'])
+            file_path = JOB_STORE.file_path(sibling['id'])
+            if file_path:
+                Path(file_path).unlink(missing_ok=True)
+    else:
+        cancel_tokens.setdefault(entry_id, CancelToken()).cancel()
+        scheduler.release(entry_id)
+
+    return jsonify({'job_id': job_id, 'status': 'cancelled'})
+
+
+def stream_decode_fn(backend: str, model: str):
+    """Model call used by a live stream's StreamingTranscriber."""
+    if backend == 'mlx':
+        import mlx_whisper
+        repo = MLX_MODELS.get(model, model)
+
+        def decode(audio, prompt, language):
+            result = mlx_whisper.transcribe(audio, path_or_hf_repo=repo, word_timestamps=True,
+                                            initial_prompt=prompt or None, language=language,
+                                            condition_on_previous_text=False)
+            words = [{'start': w['start'], 'end': w['end'], 'text': w['word']}
+                     for seg in result.get('segments', []) for w in seg.get('words', [])]
+            return words, result.get('language')
+        return decode
+
+    name = FASTER_WHISPER_MODELS.get(model, model)
+    device, compute_type = get_faster_whisper_settings(name)
+
+    def decode(audio, prompt, language):
+        with MODEL_POOL.acquire(name, device, compute_type) as whisper_model:
+            # Greedy: every pass is redone a second later with more audio anyway
+            segments, info = whisper_model.transcribe(audio, beam_size=1, word_timestamps=True,
+                                                      initial_prompt=prompt or None, language=language,
+                                                      condition_on_previous_text=False)
+            words = [{'start': w.start, 'end': w.end, 'text': w.word}
+                     for seg in segments for w in (seg.words or [])]
+        return words, info.language
+    return decode
+
+
+def record_stream_event(job_id: str, kind: str, data: dict):
+    """Publish a live stream's committed segments and tentative text."""
+    job = jobs.get(job_id)
+    if job is None or job['status'] in TERMINAL_STATUSES:
+        return
+    if kind == 'partial':
+        job_events.publish(job_id, 'partial', data)
+        return
+    append_segment(job, data)
+    update_job(job_id, duration=data['end'],
+               message=f"Live: {len(job['partial_transcript'].split())} words, {data['end']/60:.1f} min")
+
+
+def finish_stream(job_id: str) -> Optional[dict]:
+    """End a live recording and complete its job with the committed transcript."""
+    with streams_lock:
+        entry = streams.pop(job_id, None)
+    if entry is None:
+        return None
+
+    options = entry['options']
+    try:
+        update_job(job_id, message='Finishing live transcript...')
+        result = entry['stream'].finish()
+        result['model'] = options['model']
+        update_job(job_id, duration=result['duration'])
+        return complete_job(job_id, options, result, base_preprocess_stats(options, result['duration']))
+    except JobCancelled:
+        update_job(job_id, status='cancelled', message='Cancelled')
+    except Exception as e:
+        update_job(job_id, status='error', message=str(e), progress=0, error=str(e))
+    finally:
+        cancel_tokens.pop(job_id, None)
+    return None
+
+
+def abort_stream(job_id: str) -> bool:
+    """Stop a live recording without completing it. Returns False if it is not live."""
+    with streams_lock:
+        entry = streams.pop(job_id, None)
+    if entry is None:
+        return False
+    entry['stream'].abort()
+    cancel_tokens.pop(job_id, None)
+    return True
+
+
+@app.route('/stream', methods=['POST'])
+def create_stream():
+    """
+    Start transcribing a live recording.
+
+    Parameters (JSON body or form): format (pcm_s16le, pcm_f32le, webm, ogg
+    or opus), sample_rate and channels for raw PCM, model, filename.
+
+    Send audio as it is recorded, either as binary messages on the WebSocket
+    /stream/<job_id>/ws or as POSTs to /stream/<job_id>/audio (one long
+    chunked request works), and end the recording with an "end" message or
+    POST /stream/<job_id>/end. Committed text arrives as segment events and
+    the tentative remainder as partial events, on /progress/<job_id> and on
+    the WebSocket.
+    """
+    values = request.get_json(silent=True) or request.values
+    fmt = values.get('format', 'pcm_s16le')
+    if fmt not in STREAM_FORMATS:
+        return jsonify({'error': f"Unsupported format: {fmt}", 'formats': sorted(STREAM_FORMATS)}), 400
+    try:
+        sample_rate = int(values.get('sample_rate', SAMPLE_RATE))
+        channels = int(values.get('channels', 1))
+    except ValueError:
+        return jsonify({'error': 'sample_rate and channels must be integers'}), 400
+
+    backend = resolve_backend('auto')
+    if backend is None:
+        return jsonify({'error': 'Live transcription needs a local backend (mlx-whisper or faster-whisper)'}), 503
+
+    with streams_lock:
+        if len(streams) >= MAX_STREAMS:
+            return jsonify({'error': f'{MAX_STREAMS} live streams already running', 'max_streams': MAX_STREAMS}), 429
+
+        job_id = str(uuid.uuid4())
+        options = {
+            'method': backend,
+            'model': values.get('model', STREAM_MODEL),
+            'speed': 1.0,
+            'remove_silence': False,
+            'compress': False,
+            'live': True,
+            'filename': values.get('filename') or f"Live recording {datetime.now():%Y-%m-%d %H:%M}",
+        }
+        job = create_job(job_id, options['filename'], backend, 0, None)
+        job.update(status='transcribing', progress=10, message='Listening...', live=True)
+        JOB_STORE.create(job, options=options)
+        token = cancel_tokens[job_id] = CancelToken()
+        streams[job_id] = {
+            'options': options,
+            'stream': LiveStream(stream_decode_fn(backend, options['model']),
+                                 lambda kind, data: record_stream_event(job_id, kind, data),
+                                 fmt=fmt, sample_rate=sample_rate, channels=channels,
+                                 vad_method=VAD_METHOD, cancel=token),
+        }
+
+    return jsonify({
+        'job_id': job_id,
+        'filename': options['filename'],
+        'model': options['model'],
+        'status': 'transcribing',
+        'audio_url': f'/stream/{job_id}/audio',
+        'websocket_url': f'/stream/{job_id}/ws' if SOCK_AVAILABLE else None,
+        'progress_url': f'/progress/{job_id}'
+    }), 201
+
+
+@app.route('/stream/<job_id>/audio', methods=['POST'])
+def stream_audio(job_id):
+    """Append recorded audio to a live stream; the body is read as it arrives."""
+    entry = streams.get(job_id)
+    if entry is None:
+        return jsonify({'error': 'No live stream with this id'}), 404
+
+    stream = entry['stream']
+    try:
+        for data in iter(lambda: request.stream.read(4096), b''):
+            stream.write(data)
+    except JobCancelled:
+        return jsonify({'error': 'Stream cancelled', 'status': 'cancelled'}), 409
+    except RuntimeError as e:
+        abort_stream(job_id)
+        update_job(job_id, status='error', message=str(e), progress=0, error=str(e))
+        return jsonify({'error': str(e)}), 422
+
+    return jsonify({'job_id': job_id, 'received_seconds': round(stream.transcriber.received_seconds, 2)})
+
+
+@app.route('/stream/<job_id>/end', methods=['POST'])
+def end_stream(job_id):
+    """Finish a live recording; returns the completed job."""
+    if job_id not in streams:
+        return jsonify({'error': 'No live stream with this id'}), 404
+    finish_stream(job_id)
+    return jsonify(find_job(job_id))
+
+
+if sock is not None:
+    @sock.route('/stream/<job_id>/ws')
+    def stream_socket(ws, job_id):
+        """
+        WebSocket transport for a live stream. Binary messages carry audio and
+        a text message "end" finishes the recording. Every job event is sent
+        back as JSON ({"event", "id", "data"}), then the final job as a
+        "result" event. A dropped connection ends the recording too.
+        """
+        entry = streams.get(job_id)
+        if entry is None:
+            ws.send(json.dumps({'event': 'error', 'data': {'error': 'No live stream with this id'}}))
+            return
+
+        last_id = job_events.last_event_id(job_id)
+
+        def send_events():
+            nonlocal last_id
+            for event_id, event_type, data in job_events.wait(job_id, last_id, timeout=0) or []:
+                last_id = event_id
+                ws.send(json.dumps({'event': event_type, 'id': event_id, 'data': data}))
+
+        try:
+            while job_id in streams:
+                message = ws.receive(timeout=0.05)
+                if isinstance(message, (bytes, bytearray)):
+                    try:
+                        entry['stream'].write(bytes(message))
+                    except (JobCancelled, RuntimeError):
+                        break
+                elif message is not None and message.strip() == 'end':
+                    finish_stream(job_id)
+                send_events()
+        finally:
+            finish_stream(job_id)
+
+        send_events()
+        ws.send(json.dumps({'event': 'result', 'data': find_job(job_id)}))
+
+
+def format_sse(event_type: str, data: dict, event_id: Optional[int] = None) -> str:
+    """Serialize one Server-Sent Event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
 
 
 @app.route('/progress/<job_id>', methods=['GET'])
 def progress_stream(job_id):
-    """Server-Sent Events stream for real-time progress updates."""
+    """
+    Server-Sent Events stream for real-time progress updates.
+
+    Events:
+        snapshot: full job state, sent on connect (or when resume is impossible)
+        update:   changed job fields only
+        segment:  one newly decoded transcript segment
+
+    Reconnecting clients send Last-Event-ID to receive only missed events.
+    A comment heartbeat keeps idle connections alive.
+    """
+    try:
+        resume_from = int(request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or -1)
+    except ValueError:
+        resume_from = -1
+
     def generate():
-        if job_id not in jobs:
-            yield f"data: {json.dumps({'error': 'Job not found'})}\n\n"
+        job = find_job(job_id)
+        if job is None:
+            yield format_sse('error', {'error': 'Job not found'})
+            return
+
+        if job['status'] in TERMINAL_STATUSES and job_id not in jobs:
+            # Swept from memory: its events are gone and no more will come
+            yield format_sse('snapshot', job, 0)
             return
 
-        last_update = 0
+        last_id = resume_from
+        if last_id < 0 or last_id > job_events.last_event_id(job_id):
+            # Take the event id before the snapshot so nothing published in between is lost.
+            # Replayed segment events carry their index, so duplicates are harmless.
+            last_id = job_events.last_event_id(job_id)
+            yield format_sse('snapshot', job_with_queue_info(job), last_id)
+
         while True:
-            job = jobs.get(job_id)
-            if not job:
+            # Stop once the final event has been delivered
+            job = find_job(job_id)
+            if job is None or (job['status'] in TERMINAL_STATUSES
+                               and job_events.is_closed(job_id)
+                               and last_id >= job_events.last_event_id(job_id)):
                 break
 
-            # Send update if changed
-            if job['updated_at'] > last_update:
-                last_update = job['updated_at']
-                yield f"data: {json.dumps(job)}\n\n"
+            events = job_events.wait(job_id, last_id, timeout=SSE_HEARTBEAT_SECONDS)
 
-            # Stop if completed or errored
-            if job['status'] in ('completed', 'error'):
-                break
+            if events is None:
+                # Client is too far behind the replay buffer; resynchronize
+                last_id = job_events.last_event_id(job_id)
+                job = find_job(job_id)
+                if job is None:
+                    break
+                yield format_sse('snapshot', job_with_queue_info(job), last_id)
+                events = []
+            elif not events:
+                yield ": heartbeat\n\n"
 
-            time.sleep(0.5)
+            for event_id, event_type, data in events:
+                last_id = event_id
+                yield format_sse(event_type, data, event_id)
 
     return Response(
         generate(),
@@ -556,6 +2188,7 @@ def progress_stream(job_id):
         headers={
             'Cache-Control': 'no-cache',
             'Connection': 'keep-alive',
+            'X-Accel-Buffering': 'no',
             'Access-Control-Allow-Origin': '*'
         }
     )
@@ -563,10 +2196,88 @@ def progress_stream(job_id):
 
 @app.route('/jobs', methods=['GET'])
 def list_jobs():
-    """List all jobs."""
+    """
+    List jobs newest first, paginated.
+
+    Query params:
+        status: Only jobs with this status
+        limit: Page size (default 50, max 500)
+        offset: Number of jobs to skip
+    """
+    try:
+        limit = min(500, max(1, int(request.args.get('limit', 50))))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+
+    page, total = JOB_STORE.list(status=request.args.get('status'), limit=limit, offset=offset)
+    counts = JOB_STORE.count_by_status()
+
     return jsonify({
-        'jobs': list(jobs.values()),
-        'active': len([j for j in jobs.values() if j['status'] in ('queued', 'preprocessing', 'transcribing')])
+        'jobs': [job_with_queue_info(jobs.get(j['id'], j)) for j in page],
+        'total': total,
+        'limit': limit,
+        'offset': offset,
+        'active': sum(counts.get(s, 0) for s in ('queued', 'preprocessing', 'transcribing')),
+        'counts': counts,
+        'queue': get_scheduler().stats()
+    })
+
+
+@app.route('/jobs/wait', methods=['GET'])
+def wait_for_jobs():
+    """
+    Long-poll any number of jobs in one request.
+
+    Query params:
+        ids: Comma-separated job ids
+        cursor: Comma-separated job_id:event_id pairs from the previous
+            response (jobs without one count as changed)
+        terminal: 1 to answer only once one of the jobs has finished
+        timeout: Seconds to hold the request (default 25, max 60)
+
+    Answers as soon as a job changed since its cursor (or, with terminal=1,
+    has finished), otherwise when the timeout passes. Clients keep one
+    connection open and call again with the returned cursors, so completion
+    is seen immediately without polling. Jobs that do not exist are null.
+    """
+    ids = [i for i in request.args.get('ids', '').split(',') if i]
+    if not ids:
+        return jsonify({'error': 'ids is required'}), 400
+    if len(ids) > LONG_POLL_MAX_JOBS:
+        return jsonify({'error': f'At most {LONG_POLL_MAX_JOBS} jobs per request'}), 400
+    try:
+        timeout = min(LONG_POLL_MAX_SECONDS, max(0.0, float(request.args.get('timeout', 25))))
+    except ValueError:
+        return jsonify({'error': 'timeout must be a number'}), 400
+    terminal_only = request.args.get('terminal', '').lower() in ('1', 'true')
+
+    cursors = {}
+    for pair in request.args.get('cursor', '').split(','):
+        job_id, _, event_id = pair.partition(':')
+        if job_id in ids and event_id.isdigit():
+            cursors[job_id] = int(event_id)
+
+    deadline = time.time() + timeout
+    while True:
+        # Event ids first: anything published after this wakes the wait below
+        seen = {job_id: job_events.last_event_id(job_id) for job_id in ids}
+        found = {job_id: find_job(job_id) for job_id in ids}
+        finished = [j for j, job in found.items() if job is None or job['status'] in TERMINAL_STATUSES]
+        changed = [j for j in ids if seen[j] != cursors.get(j)]
+        remaining = deadline - time.time()
+        if finished or (changed and not terminal_only) or remaining <= 0:
+            break
+        job_events.wait_any(seen, remaining)
+
+    return jsonify({
+        'jobs': {
+            job_id: ({k: v for k, v in job_with_queue_info(job).items() if k not in ('segments', 'partial_transcript')}
+                     if job is not None else None)
+            for job_id, job in found.items()
+        },
+        'cursors': seen,
+        'finished': finished
     })
 
 
@@ -580,9 +2291,17 @@ def get_models():
             {'id': 'medium', 'name': 'Medium (Balanced)', 'speed': '~7x realtime'},
             {'id': 'small', 'name': 'Small (Quick)', 'speed': '~12x realtime'},
         ],
+        'faster-whisper': [
+            {'id': 'large-v3', 'name': 'Large V3 (Best quality)', 'speed': '~20x realtime (GPU)'},
+            {'id': 'large-v3-turbo', 'name': 'Large V3 Turbo (Fast)', 'speed': '~30x realtime (GPU)'},
+            {'id': 'medium', 'name': 'Medium (Balanced)', 'speed': '~3x realtime (CPU)'},
+            {'id': 'small', 'name': 'Small (Quick)', 'speed': '~8x realtime (CPU)'},
+        ],
         'openai': [
             {'id': 'whisper-1', 'name': 'Whisper (Cloud)', 'cost': '$0.006/min'}
-        ]
+        ],
+        'default_model': DEFAULT_MODEL,
+        'loaded': MODEL_POOL.stats()
     })
 
 
@@ -592,8 +2311,48 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Voice Memo Transcriber Server')
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to')
     parser.add_argument('--port', type=int, default=5111, help='Port to listen on')
+    parser.add_argument('--default-model', default=DEFAULT_MODEL,
+                        help=f'Model to pre-warm at startup (default: {DEFAULT_MODEL})')
+    parser.add_argument('--model-ram-mb', type=float, default=MODEL_RAM_BUDGET_MB,
+                        help=f'Memory budget for resident models in MB (default: {MODEL_RAM_BUDGET_MB:.0f})')
+    parser.add_argument('--no-prewarm', action='store_true',
+                        help='Do not load the default model at startup')
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f'Concurrent local transcriptions (default: {TRANSCRIBE_WORKERS}, or the tuned worker count)')
+    parser.add_argument('--autotune', action='store_true',
+                        help='Re-tune compute type, threads and workers for the default model before serving')
+    parser.add_argument('--cache-mb', type=float, default=RESULT_CACHE.max_size_mb,
+                        help=f'Size cap for cached transcripts in MB (default: {RESULT_CACHE.max_size_mb:.0f})')
+    parser.add_argument('--retention-days', type=float, default=JOB_RETENTION_DAYS,
+                        help=f'Days to keep finished jobs and transcripts (default: {JOB_RETENTION_DAYS:g})')
+    parser.add_argument('--chunk-workers', type=int, default=CHUNK_WORKERS,
+                        help=f'Model replicas for parallel long-audio transcription on CPU (default: {CHUNK_WORKERS})')
+    parser.add_argument('--long-audio-minutes', type=float, default=LONG_AUDIO_SECONDS / 60,
+                        help=f'Use parallel chunks on CPU for audio at least this long (default: {LONG_AUDIO_SECONDS / 60:g})')
+    parser.add_argument('--max-queue', type=int, default=MAX_QUEUE,
+                        help=f'Waiting jobs per backend before rejecting with 429 (default: {MAX_QUEUE})')
     args = parser.parse_args()
 
+    RESULT_CACHE.max_size_mb = args.cache_mb
+    JOB_RETENTION_DAYS = args.retention_days
+    CHUNK_WORKERS = args.chunk_workers
+    LONG_AUDIO_SECONDS = args.long_audio_minutes * 60
+    MAX_QUEUE = args.max_queue
+
+    DEFAULT_MODEL = args.default_model
+    MODEL_POOL.budget_mb = args.model_ram_mb
+
+    if FASTER_WHISPER_AVAILABLE:
+        tuned_model = FASTER_WHISPER_MODELS.get(DEFAULT_MODEL, DEFAULT_MODEL)
+        if args.autotune:
+            autotune_model(tuned_model)
+        tuned = AUTOTUNE.get(tuned_model, faster_whisper_device())
+        # Parallel decoding only pays off if the probe measured it; explicit settings win
+        if tuned is not None and args.workers is None and 'TRANSCRIBE_WORKERS' not in os.environ:
+            TRANSCRIBE_WORKERS = max(TRANSCRIBE_WORKERS, tuned['num_workers'])
+    if args.workers is not None:
+        TRANSCRIBE_WORKERS = args.workers
+
     print("\n" + "="*60)
     print("Voice Memo Transcriber - Local Server")
     print("="*60)
@@ -608,7 +2367,22 @@ if __name__ == '__main__':
         print(f"Backend: None available (install mlx-whisper or faster-whisper)")
 
     print(f"OpenAI API: {'Configured' if os.getenv('OPENAI_API_KEY') else 'Not configured'}")
+    print(f"Default model: {DEFAULT_MODEL} (RAM budget: {MODEL_POOL.budget_mb:.0f} MB)")
+    if FASTER_WHISPER_AVAILABLE:
+        device, compute_type = get_faster_whisper_settings(tuned_model)
+        print(f"faster-whisper settings: {compute_type}"
+              + (f", {tuned['cpu_threads'] or 'default'} threads, {tuned['num_workers']} workers (tuned)" if tuned else " (not tuned yet)"))
+    print(f"Workers: {TRANSCRIBE_WORKERS} local, {OPENAI_WORKERS} OpenAI (max queue: {MAX_QUEUE})")
+    get_scheduler()
+    recover_jobs()
+    threading.Thread(target=job_sweeper, daemon=True).start()
+
+    if not args.no_prewarm:
+        # Load in the background so /health answers while the model loads
+        threading.Thread(target=prewarm_default_model, args=(DEFAULT_MODEL,), daemon=True).start()
     print(f"\nServer running at: http://{args.host}:{args.port}")
     print("="*60 + "\n")
 
+    # HTTP/1.1 keeps client connections open between requests (long-polls, uploads)
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
     app.run(host=args.host, port=args.port, debug=False, threaded=True)